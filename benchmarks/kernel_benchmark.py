@@ -0,0 +1,104 @@
+# compares the generic firing code of Net with the compiled successor kernels on a large sparse net
+# usage: python benchmarks/kernel_benchmark.py [--components 100] [--length 5] [--states 1000]
+
+import argparse
+import os.path
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from petrimodules.petrinet import Arc, Net, Place, Transition
+
+
+def createSparseNet(components, length):
+    # a ring of cyclic processes, every transition moves one token and every process shares
+    # a lock place with its neighbour, so each transition touches at most 3 of all the places
+    net = Net()
+    arcCount = 0
+
+    def addArc(source, destination):
+        nonlocal arcCount
+        net.addArc(Arc(f"a{arcCount}", source, destination, "1"))
+        arcCount += 1
+
+    for c in range(components):
+        net.addPlace(Place(f"lock{c}", f"lock{c:04}", 1))
+        for i in range(length):
+            net.addPlace(Place(f"p{c}_{i}", f"p{c:04}_{i}", 1 if i == 0 else 0))
+            net.addTransition(Transition(f"t{c}_{i}", f"t{c:04}_{i}"))
+    for c in range(components):
+        for i in range(length):
+            addArc(f"p{c}_{i}", f"t{c}_{i}")
+            addArc(f"t{c}_{i}", f"p{c}_{(i + 1) % length}")
+        # the first step of a process takes the lock of its neighbour, the last one gives it back
+        lock = f"lock{(c + 1) % components}"
+        addArc(lock, f"t{c}_0")
+        addArc(f"t{c}_{length - 1}", lock)
+    net.sortPlaces()
+    net.sortTransitions()
+    net.buildMatrices()
+    return net
+
+
+def getGenericSuccessors(net, omega=False):
+    transitions = net.getTransitions()
+    if omega:
+        return lambda state: [(i, net.runTransition_Omega(t, state)) for i, t in enumerate(transitions) if net.isTransitionRunnableFromState_Omega(t, state)]
+    return lambda state: [(i, net.runTransition(t, state)) for i, t in enumerate(transitions) if net.isTransitionRunnableFromState(t, state)]
+
+
+def explore(successors, initialState, maxStates):
+    # breadth-first search over the first maxStates states, returns the states in visiting order and the firing count
+    states = [list(initialState)]
+    seen = {tuple(initialState)}
+    firings = 0
+    current = 0
+    while current < len(states) and len(states) < maxStates:
+        for transIndex, newState in successors(states[current]):
+            firings += 1
+            if tuple(newState) not in seen:
+                seen.add(tuple(newState))
+                states.append(newState)
+        current += 1
+    return states, firings
+
+
+def runBenchmark(net, maxStates, omega):
+    name = "omega" if omega else "plain"
+    initialState = net.getGraphState()
+
+    start = time.perf_counter()
+    genericStates, genericFirings = explore(getGenericSuccessors(net, omega), initialState, maxStates)
+    genericTime = time.perf_counter() - start
+
+    net.kernels = dict()
+    start = time.perf_counter()
+    kernel = net.getSuccessorKernel(omega)
+    compileTime = time.perf_counter() - start
+    start = time.perf_counter()
+    kernelStates, kernelFirings = explore(kernel, initialState, maxStates)
+    kernelTime = time.perf_counter() - start
+
+    if genericStates != kernelStates or genericFirings != kernelFirings:
+        raise RuntimeError(f"The {name} kernel explored different states than the generic code")
+    print(f"{name:<6}{len(kernelStates):>8}{kernelFirings:>10}{genericTime:>12.4f}{kernelTime:>12.4f}{compileTime:>12.4f}{genericTime / kernelTime:>10.1f}x")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmark of the compiled successor kernels.")
+    parser.add_argument("--components", type=int, default=100, help="number of processes in the ring (default: 100)")
+    parser.add_argument("--length", type=int, default=5, help="places per process (default: 5)")
+    parser.add_argument("--states", type=int, default=1000, help="states explored per run (default: 1000)")
+    args = parser.parse_args(argv)
+
+    net = createSparseNet(args.components, args.length)
+    print(f"Net: {len(net.getPlaces())} places, {len(net.getTransitions())} transitions, {len(net.getArcs())} arcs")
+    print(f"{'mode':<6}{'states':>8}{'firings':>10}{'generic s':>12}{'kernel s':>12}{'compile s':>12}{'speedup':>11}")
+    runBenchmark(net, args.states, omega=False)
+    runBenchmark(net, args.states, omega=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,169 @@
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from multiprocessing import connection
+
+# imported up front so forked workers don't pay for it again
+from petrimodules import builders
+from petrimodules import petrinet
+
+
+NET_FILE_EXTENSIONS = (".xml", ".pflow")
+
+
+def findNetFiles(paths):
+    # directories are searched recursively, anything else is treated as a glob pattern
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files.extend(os.path.join(root, name) for name in sorted(names) if name.lower().endswith(NET_FILE_EXTENSIONS))
+        else:
+            files.extend(sorted(glob.glob(path, recursive=True)))
+    return files
+
+
+def getMaxMemoryMB():
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on linux, in bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def setMemoryLimit(memoryLimitMB):
+    try:
+        import resource
+    except ImportError:
+        return
+    limit = memoryLimitMB * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def analyzeNet(file):
+    result = {"file": file}
+    times = dict()
+
+    start = time.perf_counter()
+    net = petrinet.loadNet(file)
+    net.sortPlaces()
+    net.sortTransitions()
+    net.buildMatrices()
+    times["parse"] = time.perf_counter() - start
+    result["places"] = len(net.getPlaces())
+    result["transitions"] = len(net.getTransitions())
+    result["arcs"] = len(net.getArcs())
+
+    start = time.perf_counter()
+    reach_petrigraph, reach_stategraph = builders.buildReachabilityGraph(net)
+    times["reachability"] = time.perf_counter() - start
+    if reach_stategraph is not None:
+        result["reachabilityNodes"] = reach_stategraph.getNodeCount()
+        result["reachabilityEdges"] = reach_stategraph.getEdgeCount()
+        result["deadlock"] = len(reach_stategraph.getDeadlockNodes()) > 0
+    else:
+        result["reachabilityNodes"] = None
+        result["reachabilityEdges"] = None
+        # deadlock freedom can't be decided from an infinite graph
+        result["deadlock"] = None
+
+    start = time.perf_counter()
+    cover_petritree, cover_stategraph = builders.buildCoverabilityTree(net)
+    times["coverability"] = time.perf_counter() - start
+    result["coverabilityNodes"] = cover_stategraph.getNodeCount()
+    result["coverabilityEdges"] = cover_stategraph.getEdgeCount()
+    result["bounded"] = not any(petrinet.CONST_OMEGA_CHAR in node.state for node in cover_petritree.nodes)
+
+    result["times"] = {key: round(value, 6) for key, value in times.items()}
+    return result
+
+
+def runWorker(file, conn, memoryLimitMB):
+    try:
+        if memoryLimitMB:
+            setMemoryLimit(memoryLimitMB)
+        result = analyzeNet(file)
+        result["status"] = "ok"
+    except MemoryError:
+        result = {"file": file, "status": "memory", "error": "memory limit exceeded"}
+    except Exception as err:
+        result = {"file": file, "status": "error", "error": f"{type(err).__name__}: {err}"}
+    result["maxMemoryMB"] = getMaxMemoryMB()
+    conn.send(result)
+    conn.close()
+
+
+class BatchRunner:
+    # every net runs in its own worker process, at most 'jobs' of them at once,
+    # a worker that runs out of time is killed so it can't stall the rest of the batch
+    def __init__(self, jobs=None, timeLimit=60.0, memoryLimitMB=1024):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.timeLimit = timeLimit
+        self.memoryLimitMB = memoryLimitMB
+        self.running = dict()
+
+    def startWorker(self, file):
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=runWorker, args=(file, sender, self.memoryLimitMB), daemon=True)
+        process.start()
+        sender.close()
+        self.running[receiver] = (process, file, time.perf_counter())
+
+    def finishWorker(self, receiver, result):
+        process, file, startTime = self.running.pop(receiver)
+        if result is None:
+            process.kill()
+        process.join()
+        receiver.close()
+        if result is None:
+            result = {"file": file, "status": "crashed", "error": f"worker exited with code {process.exitcode}"}
+        result["time"] = round(time.perf_counter() - startTime, 6)
+        return result
+
+    def run(self, files):
+        # yields one result dict per net, in order of completion
+        pending = list(reversed(files))
+        while pending or self.running:
+            while pending and len(self.running) < self.jobs:
+                self.startWorker(pending.pop())
+
+            now = time.perf_counter()
+            deadline = min(startTime for process, file, startTime in self.running.values()) + self.timeLimit if self.timeLimit else None
+            timeout = max(0.0, deadline - now) if deadline is not None else None
+            for receiver in connection.wait(list(self.running.keys()), timeout):
+                try:
+                    result = receiver.recv()
+                except EOFError:
+                    result = None
+                yield self.finishWorker(receiver, result)
+
+            if self.timeLimit:
+                now = time.perf_counter()
+                for receiver, (process, file, startTime) in list(self.running.items()):
+                    if now - startTime >= self.timeLimit:
+                        result = self.finishWorker(receiver, None)
+                        result["status"] = "timeout"
+                        result["error"] = f"time limit of {self.timeLimit}s exceeded"
+                        yield result
+
+
+def runBatch(paths, output, jobs=None, timeLimit=60.0, memoryLimitMB=1024):
+    files = findNetFiles(paths)
+    print(f"Analyzing {len(files)} nets with {jobs or os.cpu_count()} workers", file=sys.stderr)
+
+    statusCounts = dict()
+    runner = BatchRunner(jobs, timeLimit, memoryLimitMB)
+    for done, result in enumerate(runner.run(files), 1):
+        output.write(json.dumps(result, ensure_ascii=False) + "\n")
+        output.flush()
+        statusCounts[result["status"]] = statusCounts.get(result["status"], 0) + 1
+        print(f"[{done}/{len(files)}] {result['status']}: {result['file']}", file=sys.stderr)
+
+    print("Finished:", ", ".join(f"{count} {status}" for status, count in sorted(statusCounts.items())) or "no nets found", file=sys.stderr)
+    return statusCounts
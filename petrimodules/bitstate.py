@@ -0,0 +1,174 @@
+import hashlib
+import time
+from array import array
+
+
+class BitstateTable:
+    # supertrace visited set (Holzmann): a fixed size bit array and k hash functions (double hashing),
+    # the states themselves are never stored, so two states can collide and one of them is then skipped
+    def __init__(self, bits=27, hashCount=3):
+        if bits < 3:
+            raise ValueError("The bit array needs at least 2^3 bits")
+        if hashCount < 1:
+            raise ValueError("At least one hash function is needed")
+        self.bits = bits
+        self.size = 1 << bits
+        self.mask = self.size - 1
+        self.hashCount = hashCount
+        self.table = bytearray(self.size >> 3)
+        self.setBits = 0
+        self.stored = 0
+        # expected number of new states wrongly taken as visited, summed over all stored states
+        self.expectedOmissions = 0.0
+
+    def getMemoryUsage(self):
+        return len(self.table)
+
+    def getFillRatio(self):
+        return self.setBits / self.size
+
+    def getHashFactor(self):
+        # bits per stored state, Holzmann considers values above 100 safe
+        return self.size / self.stored if self.stored else float("inf")
+
+    def getOmissionProbability(self):
+        # probability that the next new state is wrongly taken as visited
+        return self.getFillRatio() ** self.hashCount
+
+    def getEstimatedCoverage(self):
+        # omitted states also hide their successors, so this is an upper bound of the real coverage
+        if not self.stored:
+            return 1.0
+        return self.stored / (self.stored + self.expectedOmissions)
+
+    def add(self, state):
+        # returns True if the state wasn't seen before (or doesn't collide with what was seen)
+        digest = hashlib.blake2b(array("q", state).tobytes(), digest_size=16).digest()
+        hash1 = int.from_bytes(digest[:8], "little")
+        hash2 = int.from_bytes(digest[8:], "little") | 1
+        omissionProbability = self.getOmissionProbability()
+
+        isNew = False
+        for i in range(self.hashCount):
+            index = (hash1 + i * hash2) & self.mask
+            bit = 1 << (index & 7)
+            if not self.table[index >> 3] & bit:
+                self.table[index >> 3] |= bit
+                self.setBits += 1
+                isNew = True
+        if isNew:
+            self.stored += 1
+            # every stored state stands for 1 / (1 - p) lookups of new states, p of them were lost
+            if omissionProbability < 1.0:
+                self.expectedOmissions += omissionProbability / (1.0 - omissionProbability)
+        return isNew
+
+
+class BitstateRun:
+    # statistics of one depth-first search
+    def __init__(self, depthLimit, table):
+        self.depthLimit = depthLimit
+        self.table = table
+        self.transitionsFired = 0
+        self.maxDepthReached = 0
+        # True if some state wasn't expanded because of the depth limit
+        self.isTruncated = False
+        # (state, firing sequence) of every found deadlock
+        self.deadlocks = []
+        self.deadlockCount = 0
+        self.searchTime = None
+
+    def getStateCount(self):
+        return self.table.stored
+
+
+class BitstateSearch:
+    # depth-first exploration of the reachability graph with a bitstate visited set,
+    # memory use is the bit array plus the current DFS path
+    def __init__(self, petri_net, bits=27, hashCount=3, maxDeadlocks=10, stopAtDeadlock=False):
+        self.net = petri_net
+        self.bits = bits
+        self.hashCount = hashCount
+        self.maxDeadlocks = maxDeadlocks
+        self.stopAtDeadlock = stopAtDeadlock
+        self.initialState = [int(tokens) for tokens in petri_net.getGraphState()]
+        self.successors = petri_net.getSuccessorKernel()
+
+    def getFiringSequence(self, path):
+        return [self.net.getTransitions()[transIndex].getLabel() for transIndex in path]
+
+    def search(self, depthLimit=None):
+        # a state first seen close to the depth limit hides its successors when it is reached again by a shorter path,
+        # iterative deepening reduces these losses
+        start = time.perf_counter()
+        table = BitstateTable(self.bits, self.hashCount)
+        run = BitstateRun(depthLimit, table)
+
+        table.add(self.initialState)
+        # [state, successors, position of the next successor], path holds the fired transitions
+        stack = [[self.initialState, None, 0]]
+        path = []
+        while stack:
+            entry = stack[-1]
+            if entry[1] is None:
+                entry[1] = self.successors(entry[0])
+                if not entry[1]:
+                    run.deadlockCount += 1
+                    if len(run.deadlocks) < self.maxDeadlocks:
+                        run.deadlocks.append((entry[0], self.getFiringSequence(path)))
+                    if self.stopAtDeadlock:
+                        break
+                elif depthLimit is not None and len(path) >= depthLimit:
+                    run.isTruncated = True
+                    entry[1] = []
+
+            if entry[2] == len(entry[1]):
+                stack.pop()
+                if path:
+                    path.pop()
+                continue
+
+            transIndex, newState = entry[1][entry[2]]
+            entry[2] += 1
+            run.transitionsFired += 1
+            if table.add(newState):
+                path.append(transIndex)
+                stack.append([newState, None, 0])
+                run.maxDepthReached = max(run.maxDepthReached, len(path))
+
+        run.searchTime = time.perf_counter() - start
+        return run
+
+    def iterativeDeepening(self, initialDepth=16, maxDepth=None):
+        # repeats the search with a fresh bit array and a doubled depth limit until the search isn't cut
+        # by the limit anymore, a deadlock is found (if wanted) or maxDepth is reached, an unbounded net is always
+        # cut by the limit, so maxDepth is required
+        if maxDepth is None:
+            raise ValueError("Iterative deepening needs a maximum depth")
+        if initialDepth < 1 or maxDepth < 1:
+            raise ValueError("Depth limits must be positive")
+        runs = []
+        depthLimit = min(initialDepth, maxDepth)
+        while True:
+            run = self.search(depthLimit)
+            runs.append(run)
+            if not run.isTruncated or (self.stopAtDeadlock and run.deadlocks):
+                break
+            if depthLimit >= maxDepth:
+                break
+            depthLimit = min(depthLimit * 2, maxDepth)
+        return runs
+
+
+def printBitstateRun(petri_net, run):
+    table = run.table
+    limit = "no depth limit" if run.depthLimit is None else f"depth limit {run.depthLimit}"
+    print(f"\nSearch with {limit}: {run.getStateCount()} states stored, {run.transitionsFired} transitions fired, "
+          f"max depth {run.maxDepthReached}, {run.searchTime:.3f} s" + (", cut by the depth limit" if run.isTruncated else ""))
+    print(f"Fill ratio {table.getFillRatio():.6f}, hash factor {table.getHashFactor():.1f}, "
+          f"omission probability {table.getOmissionProbability():.3e}, estimated coverage {100 * table.getEstimatedCoverage():.4f}%")
+    print(f"Deadlocks found: {run.deadlockCount}")
+    placeLabels = [place.getLabel() for place in petri_net.getPlaces()]
+    for state, sequence in run.deadlocks:
+        marking = ", ".join(f"{label}={tokens}" for label, tokens in zip(placeLabels, state) if tokens)
+        print(f"- [{marking}] reached by " + (" ".join(sequence) or "the empty sequence"))
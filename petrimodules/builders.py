@@ -0,0 +1,294 @@
+import numpy as np
+
+from petrimodules import petrigraph
+from petrimodules import stategraph
+from petrimodules.petrinet import CONST_OMEGA_CHAR
+
+
+# ω is stored as the largest int64, so it compares greater than any token count
+OMEGA_VALUE = np.iinfo(np.int64).max
+
+
+def encodeState(state):
+    return [OMEGA_VALUE if tokens == CONST_OMEGA_CHAR else tokens for tokens in state]
+
+
+def decodeState(row):
+    return [CONST_OMEGA_CHAR if tokens == OMEGA_VALUE else int(tokens) for tokens in row]
+
+
+class StateBlock:
+    # states of all nodes as rows of one contiguous array (row = node id), the ancestors of a node
+    # are gathered through its predcessor links and compared with a new state in one go
+    def __init__(self, placeCount):
+        self.states = np.zeros((64, placeCount), dtype=np.int64)
+
+    def setState(self, nodeId, state):
+        if nodeId >= len(self.states):
+            grown = np.zeros((max(2 * len(self.states), nodeId + 1), self.states.shape[1]), dtype=np.int64)
+            grown[:len(self.states)] = self.states
+            self.states = grown
+        self.states[nodeId] = encodeState(state)
+
+    def getAncestors(self, node):
+        # states of the node and all its predcessors, in node id order
+        ids = [predcessor.id for predcessor in node.getAllPredcessorNodes()] + [node.id]
+        return self.states[np.sort(np.array(ids, dtype=np.int64))]
+
+
+def hasDominatedAncestor(ancestors, state):
+    # same as any(net.isState2GreaterThan1(ancestor, state) for ancestor in ancestors)
+    state = np.array(state, dtype=np.int64)
+    return bool(((ancestors <= state).all(axis=1) & (ancestors != state).any(axis=1)).any())
+
+
+def hasEqualAncestor(ancestors, state):
+    return bool((ancestors == np.array(encodeState(state), dtype=np.int64)).all(axis=1).any())
+
+
+def accelerateToOmega(ancestors, state):
+    # same as applying isState2GreaterThan1_Omega and transformState2ToOmega to the ancestors one by one,
+    # only a dominated ancestor which really adds an ω changes the state, so the first one of them is applied
+    # and the search continues behind it with the new state, there are at most as many rounds as places
+    state = np.array(encodeState(state), dtype=np.int64)
+    start = 0
+    while start < len(ancestors):
+        rest = ancestors[start:]
+        grows = (rest < state) & (state != OMEGA_VALUE)
+        dominated = np.flatnonzero((rest <= state).all(axis=1) & grows.any(axis=1))
+        if not len(dominated):
+            break
+        state[grows[dominated[0]]] = OMEGA_VALUE
+        start += int(dominated[0]) + 1
+    return decodeState(state)
+
+
+def buildReachabilityGraph(net):
+    # returns the nodes and the edges of the reachability graph, edges are None if the graph is infinite
+    reach_edges = stategraph.StateGraphBuilder()
+    reach_petrigraph = petrigraph.Graph()
+    reach_states = StateBlock(len(net.getPlaces()))
+    # node of every state, instead of searching all nodes for it
+    reach_nodes = dict()
+    successors = net.getSuccessorKernel()
+
+    # add first node manually
+    baseNode = reach_petrigraph.addNode(net.getGraphState())
+    reach_states.setState(baseNode.id, baseNode.state)
+    reach_nodes[tuple(baseNode.state)] = baseNode
+
+    # variable to check whether or not the reachability graph is infinite
+    isInfinite = False
+    while True:
+        allChecked = True
+        for curNode in reach_petrigraph.nodes:
+            if not curNode.isChecked:
+                allChecked = False
+                break
+
+        # if all nodes are checked or graph is infinite, stop
+        if allChecked or isInfinite:
+            break
+
+        for curNode in reach_petrigraph.nodes:
+            if isInfinite:
+                break
+            if not curNode.isChecked:
+                # the predcessors of the current node don't change while its successors are added
+                ancestors = reach_states.getAncestors(curNode)
+                for transIndex, newState in successors(curNode.state):
+                    # only check predcessors
+                    if hasDominatedAncestor(ancestors, newState):
+                        isInfinite = True
+                        break
+
+                    newNode = reach_nodes.get(tuple(newState))
+                    if newNode is not None:
+                        if newNode != curNode:
+                            newNode.mergePredcessorNodesFrom(curNode)
+                    else:
+                        newNode = reach_petrigraph.addNode(newState, curNode)
+                        reach_states.setState(newNode.id, newState)
+                        reach_nodes[tuple(newState)] = newNode
+
+                    reach_edges.addEdge(curNode.id, newNode.id, transIndex)
+                curNode.isChecked = True
+
+    if isInfinite:
+        return reach_petrigraph, None
+    return reach_petrigraph, reach_edges.build(reach_petrigraph.nodeCount)
+
+
+def buildStateSpace(net):
+    # hashed breadth-first search which keeps only the states (node id order) and the edges, for analyses such as
+    # the Markov chain which don't need the petrigraph nodes, edges are None if the state space is infinite
+    successors = net.getSuccessorKernel()
+    initialState = [int(tokens) for tokens in net.getGraphState()]
+    states = [initialState]
+    stateIndices = {tuple(initialState): 0}
+    # parent in the search tree, a new state which strictly covers a state on its path makes the net unbounded
+    parents = [-1]
+    block = StateBlock(len(initialState))
+    block.setState(0, initialState)
+    edges = stategraph.StateGraphBuilder()
+
+    current = 0
+    while current < len(states):
+        for transIndex, newState in successors(states[current]):
+            node = stateIndices.get(tuple(newState))
+            if node is None:
+                path = []
+                ancestor = current
+                while ancestor != -1:
+                    path.append(ancestor)
+                    ancestor = parents[ancestor]
+                if hasDominatedAncestor(block.states[path], newState):
+                    return states, None
+                node = len(states)
+                states.append(newState)
+                stateIndices[tuple(newState)] = node
+                parents.append(current)
+                block.setState(node, newState)
+            edges.addEdge(current, node, transIndex)
+        current += 1
+    return states, edges.build(len(states))
+
+
+def buildCoverabilityTreeOld(net):
+    # COVERABILITY TREE (old one, needed for coverability graph) (refactor this some day :P)
+    cover_edges_old = stategraph.StateGraphBuilder()
+    cover_petritree_old = petrigraph.Graph()
+    cover_states_old = StateBlock(len(net.getPlaces()))
+    successors = net.getSuccessorKernel(omega=True)
+
+    # add first node manually
+    baseNode = cover_petritree_old.addNode(net.getGraphState())
+    baseNode.designationChar = "v"
+    cover_states_old.setState(baseNode.id, baseNode.state)
+
+    while True:
+        allChecked = True
+        for curNode in cover_petritree_old.nodes:
+            if not curNode.isChecked:
+                allChecked = False
+                break
+
+        # if all nodes are checked, stop
+        if allChecked:
+            break
+
+        for curNode in cover_petritree_old.nodes:
+            if not curNode.isChecked:
+                for transIndex, newState in successors(curNode.state):
+                    shouldSkip = False
+
+                    newNode = None
+                    if cover_petritree_old.hasNodeWithState(newState):
+                        newNode = cover_petritree_old.addNode(newState, curNode)
+                        newNode.isChecked = True
+                        shouldSkip = True
+                    else:
+                        newNode = cover_petritree_old.addNode(newState, curNode)
+
+                    newNode.designationChar = "v"
+
+                    if not shouldSkip:
+                        # only check predcessors, all of them (not just the first valid one)
+                        newNode.state = accelerateToOmega(cover_states_old.getAncestors(curNode), newState)
+                    cover_states_old.setState(newNode.id, newNode.state)
+
+                    cover_edges_old.addEdge(curNode.id, newNode.id, transIndex)
+                curNode.isChecked = True
+
+    return cover_petritree_old, cover_edges_old.build(cover_petritree_old.nodeCount)
+
+
+def buildCoverabilityTree(net):
+    # COVERABILITY TREE (new, good)
+    cover_edges = stategraph.StateGraphBuilder()
+    cover_petritree = petrigraph.Graph()
+    cover_states = StateBlock(len(net.getPlaces()))
+    successors = net.getSuccessorKernel(omega=True)
+
+    # add first node manually
+    baseNode = cover_petritree.addNode(net.getGraphState())
+    baseNode.designationChar = "v"
+    cover_states.setState(baseNode.id, baseNode.state)
+
+    while True:
+        allChecked = True
+        for curNode in cover_petritree.nodes:
+            if not curNode.isChecked:
+                allChecked = False
+                break
+
+        # if all nodes are checked, stop
+        if allChecked:
+            break
+
+        for curNode in cover_petritree.nodes:
+            if not curNode.isChecked:
+                for transIndex, newState in successors(curNode.state):
+                    shouldSkip = False
+
+                    newNode = cover_petritree.addNode(newState, curNode)
+                    newNode.designationChar = "v"
+
+                    # the predcessors of the new node are the current node and its predcessors
+                    ancestors = cover_states.getAncestors(curNode)
+                    if hasEqualAncestor(ancestors, newState):
+                        newNode.isChecked = True
+                        shouldSkip = True
+
+                    if not shouldSkip:
+                        # only check predcessors, all of them (not just the first valid one)
+                        newNode.state = accelerateToOmega(ancestors, newState)
+                    cover_states.setState(newNode.id, newNode.state)
+
+                    cover_edges.addEdge(curNode.id, newNode.id, transIndex)
+                curNode.isChecked = True
+
+    return cover_petritree, cover_edges.build(cover_petritree.nodeCount)
+
+
+def getCoverabilityGraphNodeMerges(net, cover_petritree_old):
+    # edit old coverability tree to make coverability graph
+    nodeStates = net.getGraphStatesOccurenceCount(cover_petritree_old)
+    nodeMergeDict = dict()
+    for nodeData in reversed(cover_petritree_old.nodes): # traverse all nodes, not just leaf nodes :P
+        node = nodeData.getName()
+        nodeState = str(nodeData.state)
+        # if there is more than 1 node with this state, we will merge them
+        if nodeState in nodeStates.keys() and nodeStates[nodeState] > 1:
+            # take this node and find the first node in graph with the same state
+            for cycleNodeData in cover_petritree_old.nodes:
+                cycleNode = cycleNodeData.getName()
+                cycleNodeState = str(cycleNodeData.state)
+                # if we found a node with same state, but only if it isn't the same node (aka don't merge to itself)
+                # if it's the same node, break and move on without doing anything
+                if cycleNodeState == nodeState and cycleNode == node:
+                    break
+                if cycleNodeState == nodeState:
+                    nodeMergeDict[node] = cycleNode
+                    break
+    return nodeMergeDict
+
+
+def buildCoverabilityGraph(cover_petritree_old, graph, nodeMergeDict):
+    # coverability graph as its own nodes and edges, merged nodes are left out and their edges rerouted
+    cover_petrigraph = petrigraph.Graph()
+    nodeIndices = dict()
+    for node in cover_petritree_old.nodes:
+        if node.getName() not in nodeMergeDict:
+            nodeIndices[node.getName()] = len(cover_petrigraph.nodes)
+            cover_petrigraph.nodes.append(node)
+    cover_petrigraph.nodeCount = len(cover_petrigraph.nodes)
+
+    def getIndex(nodeIndex):
+        name = cover_petritree_old.nodes[nodeIndex].getName()
+        return nodeIndices[nodeMergeDict.get(name, name)]
+
+    cover_edges = stategraph.StateGraphBuilder()
+    for source, target, transIndex in graph.iterEdges():
+        cover_edges.addEdge(getIndex(source), getIndex(target), transIndex)
+    return cover_petrigraph, cover_edges.build(cover_petrigraph.nodeCount)
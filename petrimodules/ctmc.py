@@ -0,0 +1,179 @@
+import math
+
+import numpy as np
+
+
+class CTMC:
+    # continuous time Markov chain of a stochastic Petri net, built from the edges of its reachability graph
+    # (states in node id order, state 0 is the initial marking), the generator matrix is only formed densely
+    # for small closed classes in the steady state solver, all other products work directly on the CSR edge arrays
+    def __init__(self, petri_net, states, graph):
+        self.net = petri_net
+        self.graph = graph
+        self.stateCount = graph.getNodeCount()
+        self.transitionCount = len(petri_net.getTransitions())
+        self.rates = np.array([t.getRate() for t in petri_net.getTransitions()], dtype=np.float64)
+        self.markings = np.array(states, dtype=np.int64).reshape(self.stateCount, -1)
+
+        self.edgeRates = self.rates[graph.transitions]
+        # self loops fire but don't change the state, they only count for the throughput
+        moving = graph.sources != graph.targets
+        self.sources = graph.sources[moving]
+        self.targets = graph.targets[moving]
+        self.movingRates = self.edgeRates[moving]
+        self.exitRates = np.bincount(self.sources, weights=self.movingRates, minlength=self.stateCount)
+        # uniformization rate, slightly above the largest exit rate so the uniformized chain is aperiodic
+        self.uniformizationRate = max(float(self.exitRates.max(initial=0.0)) * 1.02, 1e-12)
+
+    def getInitialDistribution(self):
+        distribution = np.zeros(self.stateCount, dtype=np.float64)
+        distribution[0] = 1.0
+        return distribution
+
+    def multiplyGenerator(self, distribution):
+        # distribution * Q
+        inflow = np.bincount(self.targets, weights=distribution[self.sources] * self.movingRates, minlength=self.stateCount)
+        return inflow - distribution * self.exitRates
+
+    def multiplyUniformized(self, distribution):
+        # distribution * P with P = I + Q / uniformizationRate
+        return distribution + self.multiplyGenerator(distribution) / self.uniformizationRate
+
+    def solveJacobi(self, size, sources, targets, weights, constant, normalize, tolerance, maxIterations):
+        # x = x W + constant over local state numbers, W is given by its edges, with normalize the system is singular
+        # (constant = 0) and the solution with sum 1 is wanted, every iteration is one product with W over the edge
+        # arrays and stops when the residual x W + constant - x is below tolerance. W of a closed class is the jump
+        # chain, which can be periodic (a queue alternates between even and odd lengths), so then only half of the
+        # step is taken, which doesn't change the solution but makes the iteration aperiodic
+        relaxation = 0.5 if normalize else 1.0
+        x = np.full(size, 1.0 / size) if normalize else constant.astype(np.float64)
+        for iteration in range(1, maxIterations + 1):
+            residual = np.bincount(targets, weights=x[sources] * weights, minlength=size) + constant - x
+            if np.abs(residual).sum() <= tolerance * np.abs(x).sum():
+                return x, iteration, True
+            x = x + relaxation * residual
+            if normalize:
+                x /= x.sum()
+        return x, maxIterations, False
+
+    def getStationaryDistribution(self, size, sources, targets, rates, tolerance, maxIterations, denseLimit):
+        # pi Q = 0 with sum 1 for an irreducible class, returns (distribution, iterations, converged),
+        # every equation is divided by the exit rate of its state, so the residual of stiff chains (rates of very
+        # different size) is measured in the same scale for all states
+        if size == 1:
+            return np.ones(1), 0, True
+        if size > denseLimit:
+            exitRates = np.bincount(sources, weights=rates, minlength=size)
+            return self.solveJacobi(size, sources, targets, rates / exitRates[targets], np.zeros(size), True, tolerance, maxIterations)
+
+        # small classes: state reduction of Grassmann, Taksar and Heyman, it never subtracts, so even
+        # rates which differ by many orders of magnitude lose no precision
+        matrix = np.zeros((size, size))
+        np.add.at(matrix, (sources, targets), rates)
+        for k in range(size - 1, 0, -1):
+            exitRate = matrix[k, :k].sum()
+            matrix[:k, :k] += np.outer(matrix[:k, k], matrix[k, :k] / exitRate)
+            matrix[:k, k] /= exitRate
+        distribution = np.zeros(size)
+        distribution[0] = 1.0
+        for k in range(1, size):
+            distribution[k] = distribution[:k] @ matrix[:k, k]
+        return distribution / distribution.sum(), 0, True
+
+    def getExpectedVisits(self, size, sources, targets, probabilities, start, tolerance, maxIterations, denseLimit):
+        # expected number of visits of the transient states by the embedded jump chain started in start: v = e_start + v P
+        constant = np.zeros(size)
+        constant[start] = 1.0
+        if size > denseLimit:
+            return self.solveJacobi(size, sources, targets, probabilities, constant, False, tolerance, maxIterations)
+        system = np.eye(size)
+        np.subtract.at(system, (targets, sources), probabilities)
+        return np.linalg.solve(system, constant), 0, True
+
+    def getSteadyState(self, tolerance=1e-10, maxIterations=1000000, denseLimit=500):
+        # long run distribution reached from the initial marking: the chain ends in one of the closed classes
+        # (terminal components of the graph) with its absorption probability and then follows the stationary
+        # distribution of that class, classes up to denseLimit states are solved directly, larger ones
+        # with Jacobi iterations, returns (distribution, Jacobi iterations, converged)
+        distribution = np.zeros(self.stateCount, dtype=np.float64)
+        components, componentCount = self.graph.getStronglyConnectedComponents()
+        isTerminal = np.zeros(self.stateCount, dtype=bool)
+        for terminal in self.graph.getTerminalComponents():
+            isTerminal[terminal] = True
+
+        local = np.zeros(self.stateCount, dtype=np.int64)
+        iterations = 0
+        converged = True
+        if isTerminal[0]:
+            absorption = {int(components[0]): 1.0}
+        else:
+            transient = np.flatnonzero(~isTerminal)
+            local[transient] = np.arange(len(transient))
+            inside = ~isTerminal[self.sources] & ~isTerminal[self.targets]
+            probabilities = self.movingRates / self.exitRates[self.sources]
+            visits, steps, done = self.getExpectedVisits(len(transient), local[self.sources[inside]], local[self.targets[inside]],
+                                                         probabilities[inside], local[0], tolerance, maxIterations, denseLimit)
+            iterations += steps
+            converged &= done
+            entering = ~isTerminal[self.sources] & isTerminal[self.targets]
+            flow = visits[local[self.sources[entering]]] * probabilities[entering]
+            absorption = dict()
+            for component, probability in zip(components[self.targets[entering]].tolist(), flow.tolist()):
+                absorption[component] = absorption.get(component, 0.0) + probability
+
+        for component, probability in absorption.items():
+            members = np.flatnonzero(components == component)
+            local[members] = np.arange(len(members))
+            inside = components[self.sources] == component
+            stationary, steps, done = self.getStationaryDistribution(len(members), local[self.sources[inside]], local[self.targets[inside]],
+                                                                     self.movingRates[inside], tolerance, maxIterations, denseLimit)
+            iterations += steps
+            converged &= done
+            distribution[members] += probability * stationary
+        return distribution / distribution.sum(), iterations, converged
+
+    def getTransient(self, time, epsilon=1e-10):
+        # uniformization, poisson weights are computed in log space so large rate * time doesn't underflow
+        if time <= 0:
+            return self.getInitialDistribution()
+        mean = self.uniformizationRate * time
+        lastTerm = int(mean + 10 * math.sqrt(mean) + 20)
+        firstTerm = max(0, int(mean - 10 * math.sqrt(mean) - 20))
+
+        distribution = self.getInitialDistribution()
+        result = np.zeros(self.stateCount, dtype=np.float64)
+        totalWeight = 0.0
+        for k in range(lastTerm + 1):
+            if k >= firstTerm:
+                weight = math.exp(-mean + k * math.log(mean) - math.lgamma(k + 1))
+                result += weight * distribution
+                totalWeight += weight
+                if totalWeight >= 1.0 - epsilon:
+                    break
+            distribution = self.multiplyUniformized(distribution)
+        return result / totalWeight
+
+    def getExpectedTokens(self, distribution):
+        return distribution @ self.markings
+
+    def getMarkedProbabilities(self, distribution):
+        return distribution @ (self.markings > 0)
+
+    def getThroughputs(self, distribution):
+        return np.bincount(self.graph.transitions, weights=distribution[self.graph.sources] * self.edgeRates, minlength=self.transitionCount)
+
+    def getEnabledProbabilities(self, distribution):
+        # a state has at most one edge per transition, so this is the probability that the transition is enabled
+        return np.bincount(self.graph.transitions, weights=distribution[self.graph.sources], minlength=self.transitionCount)
+
+
+def printDistributionSummary(chain, distribution, heading):
+    petri_net = chain.net
+    print(f"\n{heading}")
+    print(f"{'place':<16}{'E[tokens]':>12}{'P(marked)':>12}")
+    for place, tokens, marked in zip(petri_net.getPlaces(), chain.getExpectedTokens(distribution), chain.getMarkedProbabilities(distribution)):
+        print(f"{place.getLabel():<16}{tokens:>12.6f}{marked:>12.6f}")
+
+    print(f"{'transition':<16}{'rate':>12}{'throughput':>12}{'P(enabled)':>12}")
+    for transition, throughput, enabled in zip(petri_net.getTransitions(), chain.getThroughputs(distribution), chain.getEnabledProbabilities(distribution)):
+        print(f"{transition.getLabel():<16}{transition.getRate():>12g}{throughput:>12.6f}{enabled:>12.6f}")
@@ -0,0 +1,57 @@
+import json
+import os.path
+
+
+EXPORT_FORMATS = ["html", "json", "dot", "graphml"]
+
+
+def getGraphData(petri_net, petrigraph, graph):
+    return {
+        "places": [place.getLabel() for place in petri_net.getPlaces()],
+        "transitions": [transition.getLabel() for transition in petri_net.getTransitions()],
+        "nodes": [{"name": node.getName(), "state": node.state, "predcessors": node.getAllPredcessorNames()} for node in petrigraph.nodes],
+        "edges": [{"from": petrigraph.nodes[source].getName(), "to": petrigraph.nodes[target].getName(), "transition": petri_net.getTransitions()[transIndex].getLabel()}
+                  for source, target, transIndex in graph.iterEdges()],
+    }
+
+
+def writeJson(petri_net, petrigraph, graph, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(getGraphData(petri_net, petrigraph, graph), f, ensure_ascii=False, indent=1)
+
+
+def escapeDot(text):
+    # a quoted dot string ends at an unescaped " and \ starts an escape sequence, so both are escaped in labels
+    # (the graphml writer escapes xml the same way)
+    return str(text).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def writeDot(petri_net, petrigraph, graph, path):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("digraph G {\n")
+        for node in petrigraph.nodes:
+            label = f"{escapeDot(node.getName())}\\n{escapeDot(node.state)}"
+            f.write(f'  "{escapeDot(node.getName())}" [shape=box, label="{label}"];\n')
+        for nodeData, edgeLabel in petri_net.createEdgeDictFromGraph(graph, petrigraph).items():
+            nodes = nodeData.split(" ")
+            f.write(f'  "{escapeDot(nodes[0])}" -> "{escapeDot(nodes[1])}" [label="{escapeDot(edgeLabel)}"];\n')
+        f.write("}\n")
+
+
+def writeGraphml(petri_net, petrigraph, graph, path):
+    import networkx as nx
+
+    nxgraph = graph.toNetworkx([node.getName() for node in petrigraph.nodes], [t.getLabel() for t in petri_net.getTransitions()])
+    for node in petrigraph.nodes:
+        nxgraph.nodes[node.getName()]["state"] = str(node.state)
+    nx.write_graphml(nxgraph, path)
+
+
+def exportGraph(petri_net, petrigraph, graph, basename, formats, outputDir=""):
+    # html is handled by the plotting module, since it needs pyvis
+    writers = {"json": writeJson, "dot": writeDot, "graphml": writeGraphml}
+    for fmt in formats:
+        if fmt in writers:
+            path = os.path.join(outputDir, f"{basename}.{fmt}")
+            print(f"Saving the result to '{path}'")
+            writers[fmt](petri_net, petrigraph, graph, path)
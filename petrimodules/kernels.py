@@ -0,0 +1,45 @@
+from petrimodules.petrinet import CONST_OMEGA_CHAR
+
+
+def getTransitionArcs(petri_net, transIndex):
+    # (place, required tokens) of the preset and (place, change) of every place whose tokens change
+    inputColumn = petri_net.inputMatrix[:, transIndex]
+    incidenceColumn = petri_net.incidenceMatrix[:, transIndex]
+    preset = [(place, int(required)) for place, required in enumerate(inputColumn) if required > 0]
+    changes = [(place, int(change)) for place, change in enumerate(incidenceColumn) if change != 0]
+    return preset, changes
+
+
+def generateKernelSource(petri_net, omega=False):
+    # one unrolled block per transition, only preset places are checked and only changed places are updated,
+    # with omega semantics ω places enable every transition and never change
+    lines = ["def successors(state):", "    result = []"]
+    for transIndex in range(len(petri_net.getTransitions())):
+        preset, changes = getTransitionArcs(petri_net, transIndex)
+        if omega:
+            conditions = [f"(state[{place}] == OMEGA or state[{place}] >= {required})" for place, required in preset]
+        else:
+            conditions = [f"state[{place}] >= {required}" for place, required in preset]
+        indent = "    "
+        if conditions:
+            lines.append(f"    if {' and '.join(conditions)}:")
+            indent = "        "
+        lines.append(f"{indent}newState = list(state)")
+        for place, change in changes:
+            update = f"newState[{place}] += {change}" if change > 0 else f"newState[{place}] -= {-change}"
+            if omega:
+                lines.append(f"{indent}if newState[{place}] != OMEGA:")
+                lines.append(f"{indent}    {update}")
+            else:
+                lines.append(f"{indent}{update}")
+        lines.append(f"{indent}result.append(({transIndex}, newState))")
+    lines.append("    return result")
+    return "\n".join(lines) + "\n"
+
+
+def compileSuccessorKernel(petri_net, omega=False):
+    # returns successors(state) -> [(transition index, new state), ...] in transition order,
+    # the same as isTransitionRunnableFromState(_Omega) and runTransition(_Omega) over all transitions
+    namespace = {"OMEGA": CONST_OMEGA_CHAR}
+    exec(compile(generateKernelSource(petri_net, omega), "<successor kernel>", "exec"), namespace)
+    return namespace["successors"]
@@ -0,0 +1,489 @@
+import math
+import xml.etree.ElementTree as et
+
+
+CONST_OMEGA_CHAR = "ω"
+
+
+class Place:
+    def __init__(self, id, label, tokens=0, static=False):
+        self.id = id
+        self.label = label
+        self.tokens = tokens
+        self.static = static
+
+    def getId(self):
+        return self.id
+
+    def getLabel(self):
+        return self.label
+
+    def getTokens(self):
+        return self.tokens
+
+    def isStatic(self):
+        return self.static
+
+
+class Transition:
+    def __init__(self, id, label, rate=1.0):
+        self.id = id
+        self.label = label
+        # exponential firing rate, only used by the stochastic analyses
+        self.rate = rate
+
+    def getId(self):
+        return self.id
+
+    def getLabel(self):
+        return self.label
+
+    def getRate(self):
+        return self.rate
+
+
+class Arc:
+    def __init__(self, id, sourceId, destinationId, multiplicity=1):
+        self.id = id
+        self.sourceId = sourceId
+        self.destinationId = destinationId
+        self.multiplicity = multiplicity
+        self.source = None
+        self.destination = None
+
+    def getId(self):
+        return self.id
+
+    def getSourceId(self):
+        return self.sourceId
+
+    def getDestinationId(self):
+        return self.destinationId
+
+    def getMultiplicity(self):
+        return self.multiplicity
+
+
+class Net:
+    def __init__(self):
+        self.places = []
+        self.transitions = []
+        self.arcs = []
+        self.inputMatrix = None
+        self.outputMatrix = None
+        self.incidenceMatrix = None
+        # compiled successor functions, rebuilt with the matrices
+        self.kernels = dict()
+
+    def __getstate__(self):
+        # compiled kernels can't be pickled, they are compiled again when needed
+        state = self.__dict__.copy()
+        state["kernels"] = dict()
+        return state
+
+    def addPlace(self, place):
+        self.places.append(place)
+
+    def addTransition(self, transition):
+        self.transitions.append(transition)
+
+    def setPlaces(self, places):
+        self.places = places
+
+    def setTransitions(self, transitions):
+        self.transitions = transitions
+
+    def addArc(self, arc):
+        self.arcs.append(arc)
+
+    def getPlaces(self):
+        return self.places
+
+    def getTransitions(self):
+        return self.transitions
+
+    def getArcs(self):
+        return self.arcs
+
+    def getPlaceById(self, id):
+        for obj in self.getPlaces():
+            if obj.getId() == id:
+                return obj
+        return None
+
+    def getTransitionById(self, id):
+        for obj in self.getTransitions():
+            if obj.getId() == id:
+                return obj
+        return None
+
+    def getPlaceByLabel(self, label):
+        for obj in self.getPlaces():
+            if obj.getLabel() == label:
+                return obj
+        return None
+
+    def getTransitionByLabel(self, label):
+        for obj in self.getTransitions():
+            if obj.getLabel() == label:
+                return obj
+        return None
+
+    def sortObjectsByLabel(self, arr):
+        n = len(arr)
+        for i in range(n - 1):
+            for j in range(0, n - i - 1):
+                if arr[j].getLabel() > arr[j + 1].getLabel():
+                    arr[j], arr[j + 1] = arr[j + 1], arr[j]
+
+    # def sortObjectsByLabel(self, arr):
+    #     arr = sorted(arr, key=lambda item: item.getLabel(), reverse=True)
+
+    def sortPlacesByPattern(self, pattern):
+        newObjects = []
+        places = list(self.getPlaces()) # deep copy
+        for label in pattern.split(" "):
+            try:
+                newObjects.append(places.pop(places.index(self.getPlaceByLabel(label))))
+            except ValueError:
+                print("Invalid place label specified, not sorting!")
+                return
+        if len(self.getPlaces()) != len(newObjects):
+            print("New place count does not match the old one, not sorting!")
+        else:
+            self.setPlaces(newObjects)
+
+    def sortTransitionsByPattern(self, pattern):
+        newObjects = []
+        transitions = list(self.getTransitions()) # deep copy
+        for label in pattern.split(" "):
+            try:
+                newObjects.append(transitions.pop(transitions.index(self.getTransitionByLabel(label))))
+            except ValueError:
+                print("Invalid transition label specified, not sorting!")
+                return
+        if len(self.getTransitions()) != len(newObjects):
+            print("New transition count does not match the old one, not sorting!")
+        else:
+            self.setTransitions(newObjects)
+
+    def sortPlaces(self):
+        self.sortObjectsByLabel(self.places)
+
+    def sortTransitions(self):
+        self.sortObjectsByLabel(self.transitions)
+
+    def printOrderedPlacesTransitions(self):
+        print("   ", end="")
+        for transition in self.getTransitions():
+            print(transition.getLabel(), end=" ")
+        print()
+        for place in self.getPlaces():
+            print(place.getLabel())
+
+    def printCurrentPlaceOrder(self):
+        print("Current place order: ", end="")
+        for place in self.getPlaces():
+            print(place.getLabel(), end=" ")
+        print()
+
+    def printCurrentTransitionOrder(self):
+        print("Current transition order: ", end="")
+        for transition in self.getTransitions():
+            print(transition.getLabel(), end=" ")
+        print()
+
+    def buildMatrices(self):
+        import numpy as np
+
+        nRows = len(self.getPlaces())
+        nColumns = len(self.getTransitions())
+
+        inputMatrix = np.array([[0 for i in range(nColumns)] for j in range(nRows)])
+        outputMatrix = np.array([[0 for i in range(nColumns)] for j in range(nRows)])
+
+        # fill each matrix with the proper data
+        for arc in self.getArcs():
+            sourceId = arc.getSourceId()
+            destinationId = arc.getDestinationId()
+
+            source = None
+            destination = None
+
+            if (self.getPlaceById(sourceId) is not None) and (self.getTransitionById(destinationId) is not None):
+                source = self.getPlaceById(sourceId)
+                destination = self.getTransitionById(destinationId)
+            elif (self.getTransitionById(sourceId) is not None) and (self.getPlaceById(destinationId) is not None):
+                source = self.getTransitionById(sourceId)
+                destination = self.getPlaceById(destinationId)
+
+            sourceIdInNetList = None
+            destinationIdInNetList = None
+
+            if type(source) == Place:
+                sourceIdInNetList = self.getPlaces().index(source)
+                destinationIdInNetList = self.getTransitions().index(destination)
+                inputMatrix[sourceIdInNetList, destinationIdInNetList] = arc.getMultiplicity()
+
+            if type(source) == Transition:
+                sourceIdInNetList = self.getTransitions().index(source)
+                destinationIdInNetList = self.getPlaces().index(destination)
+                outputMatrix[destinationIdInNetList, sourceIdInNetList] = arc.getMultiplicity()
+
+        # calculate incidence matrix and set matrices attributes for the net itself
+        self.inputMatrix = inputMatrix
+        self.outputMatrix = outputMatrix
+        self.incidenceMatrix = outputMatrix - inputMatrix
+        self.kernels = dict()
+
+    def getSuccessorKernel(self, omega=False):
+        # specialized successor function of this net, compiled once per matrices
+        if omega not in self.kernels:
+            from petrimodules import kernels
+            self.kernels[omega] = kernels.compileSuccessorKernel(self, omega)
+        return self.kernels[omega]
+
+    def printMatrices(self):
+        print("\nInput matrix I:")
+        print(self.inputMatrix)
+
+        print("\nOutput matrix O:")
+        print(self.outputMatrix)
+
+        print("\nIncidence matrix C = O - I:")
+        print(self.incidenceMatrix)
+
+    def getGraphState(self):
+        graphState = []
+        for p in self.getPlaces():
+            graphState.append(p.getTokens())
+        return graphState
+
+    def isTransitionRunnableFromState(self, transition, graphState):
+        transitionIndex = self.getTransitions().index(transition)
+        inputColumn = self.inputMatrix[:, transitionIndex]
+        curGraphState = graphState
+
+        isRunnable = True
+        for i in range(len(curGraphState)):
+            available = int(curGraphState[i])
+            required = int(inputColumn[i])
+            if available < required:
+                isRunnable = False
+                break
+        return isRunnable
+
+    def isTransitionRunnableFromState_Omega(self, transition, graphState):
+        transitionIndex = self.getTransitions().index(transition)
+        inputColumn = self.inputMatrix[:, transitionIndex]
+        curGraphState = graphState
+
+        isRunnable = True
+        for i in range(len(curGraphState)):
+            available_char = curGraphState[i]
+            required = int(inputColumn[i])
+
+            # only check runnability if it isnt omega, if its omega it counts as always runnable
+            if available_char != CONST_OMEGA_CHAR:
+                available = int(curGraphState[i])
+                if available < required:
+                    isRunnable = False
+                    break
+        return isRunnable
+
+    def isState2GreaterThan1(self, state1, state2):
+        # returns True if state2 is greater, otherwise returns False
+        if state1 == state2:
+            return False
+        for i in range(len(state1)):
+            if state1[i] > state2[i]:
+                return False
+        return True
+
+    def isState2GreaterThan1_Omega(self, state1, state2):
+        # returns True if state2 is greater, otherwise returns False
+        if state1 == state2:
+            return False
+        for i in range(len(state1)):
+            s1 = state1[i]
+            s2 = state2[i]
+            # if they are not omegas, do regular check
+            # if s1 is omega and s2 is not, s1 has to be greater
+            # otherwise s2 has to be greater
+            if s1 != CONST_OMEGA_CHAR and s2 != CONST_OMEGA_CHAR and s1 > s2:
+                return False
+            if s1 == CONST_OMEGA_CHAR and s2 != CONST_OMEGA_CHAR:
+                return False
+        return True
+
+    def transformState2ToOmega(self, state1, state2):
+        for i in range(len(state1)):
+            s1 = state1[i]
+            s2 = state2[i]
+
+            if s1 != CONST_OMEGA_CHAR and s2 != CONST_OMEGA_CHAR and s2 > s1:
+                state2[i] = CONST_OMEGA_CHAR
+        return state2
+
+    def runTransition(self, transition, graphState):
+        transitionIndex = self.getTransitions().index(transition)
+        incidenceColumn = self.incidenceMatrix[:, transitionIndex]
+
+        newGraphState = list(graphState)
+        for place in self.getPlaces():
+            placeIndex = self.getPlaces().index(place)
+            newGraphState[placeIndex] += int(incidenceColumn[placeIndex])
+        return newGraphState
+
+    def runTransition_Omega(self, transition, graphState):
+        transitionIndex = self.getTransitions().index(transition)
+        incidenceColumn = self.incidenceMatrix[:, transitionIndex]
+
+        newGraphState = list(graphState)
+        for place in self.getPlaces():
+            placeIndex = self.getPlaces().index(place)
+            # only change tokens if we arent omega
+            if newGraphState[placeIndex] != CONST_OMEGA_CHAR:
+                newGraphState[placeIndex] += int(incidenceColumn[placeIndex])
+        return newGraphState
+
+    def getWorkflowStateFromState(self, state):
+        newState = []
+        for place in self.getPlaces():
+            placeIndex = self.getPlaces().index(place)
+            if not place.isStatic():
+                tokens = state[placeIndex]
+                finalTokens = "" if tokens == 1 else str(tokens)
+                text = f"{finalTokens}{place.getLabel()}"
+                if tokens > 0:
+                    newState.append(text)
+        return " + ".join(newState)
+
+    def createEdgeDictFromGraph(self, graph, petrigraph):
+        edgeDict = dict()
+        for source, target, transitionIndex in graph.iterEdges():
+            edgeLabel = self.getTransitions()[transitionIndex].getLabel()
+            entryName = petrigraph.nodes[source].getName() + " " + petrigraph.nodes[target].getName()
+            if entryName not in edgeDict.keys():
+                edgeDict[entryName] = edgeLabel
+            else:
+                edgeDict[entryName] = edgeDict[entryName] + ", " + edgeLabel
+        return edgeDict
+
+    def updateMultiEdgesForPyvisgraph(self, graph):
+        edgeDict = dict()
+        for edge in graph.get_edges():
+            edgeLabel = edge["label"]
+            entryName = edge["from"] + " " + edge["to"]
+            if entryName not in edgeDict.keys():
+                edgeDict[entryName] = edgeLabel
+            else:
+                edgeDict[entryName] = edgeDict[entryName] + ", " + edgeLabel
+        # delete old edges, add new ones
+        graph.edges = []
+        for key, value in edgeDict.items():
+            nodeData = key.split(" ")
+            nodeFrom = nodeData[0]
+            nodeTo = nodeData[1]
+            edgeLabel = value
+            graph.add_edge(nodeFrom, nodeTo, label=edgeLabel, color="black", title=edgeLabel)
+
+    def printTransitionPreset(self, transition):
+        transitionIndex = self.getTransitions().index(transition)
+        inputColumn = self.inputMatrix[:, transitionIndex]
+
+        placeList = []
+        for place in self.getPlaces():
+            placeIndex = self.getPlaces().index(place)
+            if inputColumn[placeIndex] > 0:
+                placeList.append(place.getLabel())
+        print("•", transition.getLabel(), end=" = {", sep="")
+        print(", ".join(placeList), end="}\n")
+
+    def printTransitionPostset(self, transition):
+        transitionIndex = self.getTransitions().index(transition)
+        inputColumn = self.outputMatrix[:, transitionIndex]
+
+        placeList = []
+        for place in self.getPlaces():
+            placeIndex = self.getPlaces().index(place)
+            if inputColumn[placeIndex] > 0:
+                placeList.append(place.getLabel())
+        print(transition.getLabel(), "•", end=" = {", sep="")
+        print(", ".join(placeList), end="}\n")
+
+    def printAllTransitionsPresets(self):
+        print("\nTransitions presets:")
+        for t in self.getTransitions():
+            self.printTransitionPreset(t)
+
+    def printAllTransitionsPostsets(self):
+        print("\nTransitions postsets:")
+        for t in self.getTransitions():
+            self.printTransitionPostset(t)
+
+    def printGraphAnalysis(self, graph, petrigraph):
+        transitionCount = len(self.getTransitions())
+        components, componentCount = graph.getStronglyConnectedComponents()
+        terminalComponents = graph.getTerminalComponents()
+        deadlocks = self.getLeafNodesFromGraph(graph, petrigraph)
+        liveTransitions = graph.getLiveTransitions(transitionCount)
+        deadTransitions = graph.getDeadTransitions(transitionCount)
+
+        print(f"Nodes: {graph.getNodeCount()}, edges: {graph.getEdgeCount()}")
+        print(f"Strongly connected components: {componentCount} ({len(terminalComponents)} terminal)")
+        print("Deadlocks:", ", ".join(deadlocks) if deadlocks else "none")
+        print("Live transitions:", ", ".join(t.getLabel() for t, live in zip(self.getTransitions(), liveTransitions) if live) or "none")
+        print("Dead transitions:", ", ".join(t.getLabel() for t, dead in zip(self.getTransitions(), deadTransitions) if dead) or "none")
+
+    def getLeafNodesFromGraph(self, graph, petrigraph):
+        return [petrigraph.nodes[node].getName() for node in graph.getDeadlockNodes()]
+
+    def getGraphStatesOccurenceCount(self, petrigraph):
+        nodeStates = dict()
+        for nodeData in petrigraph.nodes:
+            nodeState = str(nodeData.state)
+            if nodeState not in nodeStates:
+                nodeStates[nodeState] = 1
+            else:
+                nodeStates[nodeState] += 1
+        return nodeStates
+
+
+def loadNet(file):
+    tree = et.parse(file)
+    root = tree.getroot()
+
+    # check if file is xml or pflow (pflow has data encapsulated in extra subnet block, otherwise it's identical to xml)
+    isPflowFormat = root.find("subnet") is not None
+
+    prefix = "subnet/" if isPflowFormat else ""
+
+    # filling the net with data
+    net = Net()
+
+    for type_tag in root.findall(prefix + "place"):
+        id = type_tag.find('id').text
+        label = type_tag.find('label').text
+        tokens = int(type_tag.find('tokens').text)
+        static = True if type_tag.find('static').text == "true" else False
+        net.addPlace(Place(id, label, tokens, static))
+
+    for type_tag in root.findall(prefix + "transition"):
+        id = type_tag.find('id').text
+        label = type_tag.find('label').text
+        rate_tag = type_tag.find('rate')
+        rate = float(rate_tag.text) if rate_tag is not None and rate_tag.text else 1.0
+        # nan and inf would pass a plain rate <= 0 check
+        if not (math.isfinite(rate) and rate > 0):
+            raise ValueError(f"Transition '{label}' has an invalid rate {rate}, rates must be positive and finite")
+        net.addTransition(Transition(id, label, rate))
+
+    for type_tag in root.findall(prefix + "arc"):
+        id = type_tag.find('id').text
+        sourceId = type_tag.find('sourceId').text
+        destinationId = type_tag.find('destinationId').text
+        multiplicity = type_tag.find('multiplicity').text
+        net.addArc(Arc(id, sourceId, destinationId, multiplicity))
+
+    return net
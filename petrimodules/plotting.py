@@ -0,0 +1,119 @@
+import os.path
+
+from pyvis import network as pvnet
+
+
+NODECOLOR_FIRST = "#7FFF8C"
+NODECOLOR_GENERIC = "#8CCFFF"
+NODECOLOR_LAST = "#FFC97F"
+
+
+def getPyvisOptions():
+    opts = '''
+        var options = {
+          "physics": {
+            "enabled": false
+          },
+          "interaction": {
+            "dragNodes": true,
+            "hideEdgesOnDrag": false,
+            "hideNodesOnDrag": false
+        },
+        "edges": {
+            "smooth": {
+                "enabled": true,
+                "type": "continuous"
+            }
+        }
+        }
+    '''
+    return opts
+
+
+def saveGraph(pyvisgraph, filename, outputDir):
+    path = os.path.join(outputDir, filename)
+    print(f"Saving the result to '{path}'")
+    pyvisgraph.set_options(getPyvisOptions())
+    pyvisgraph.save_graph(path)
+
+
+def plotReachabilityGraphs(petri_net, reach_petrigraph, reach_stategraph, width, height, outputDir=""):
+    print("\nPlotting Reachability Graphs...")
+
+    reach_pyvisgraph = pvnet.Network(directed=True, width=width, height=height, heading="Reachability graph")
+    reach_pyvisgraph_workflow = pvnet.Network(directed=True, width=width, height=height, heading="Reachability graph (Workflow)")
+    for nodeData in reach_petrigraph.nodes:
+        nodeName = nodeData.getName()
+        nodeLabel = nodeData.getGraphLabel()
+        nodeColor = NODECOLOR_FIRST if nodeData == reach_petrigraph.nodes[0] else NODECOLOR_GENERIC
+        nodeColor = NODECOLOR_LAST if nodeData == reach_petrigraph.nodes[-1] else nodeColor
+        reach_pyvisgraph.add_node(nodeName, label=nodeLabel, shape="box", color=nodeColor, title=nodeName)
+        # label for workflow graph (place names (but no static places), and no predcessors to reduce visual clutter)
+        # predcessors are still available upon mouse hover over node
+        nodeLabelWorkflow = nodeData.getGraphLabelCustom(petri_net.getWorkflowStateFromState(nodeData.state), "")
+        nodeTitleWorkflow = "Predcessors: " + " ".join(nodeData.getAllPredcessorNames())
+        reach_pyvisgraph_workflow.add_node(nodeName, label=nodeLabelWorkflow, shape="box", color=nodeColor, title=nodeTitleWorkflow)
+
+    for nodeData, edgeLabel in petri_net.createEdgeDictFromGraph(reach_stategraph, reach_petrigraph).items():
+        nodes = nodeData.split(" ")
+        reach_pyvisgraph.add_edge(nodes[0], nodes[1], label=edgeLabel, color="black", title=edgeLabel)
+        reach_pyvisgraph_workflow.add_edge(nodes[0], nodes[1], label=edgeLabel, color="black", title=edgeLabel)
+
+    saveGraph(reach_pyvisgraph, "reachability_graph.html", outputDir)
+    saveGraph(reach_pyvisgraph_workflow, "workflow_reachability_graph.html", outputDir)
+
+
+def plotCoverabilityTree(petri_net, cover_petritree, cover_stategraph, width, height, outputDir=""):
+    print("\nPlotting Coverability Tree...")
+    cover_pyvistree = pvnet.Network(directed=True, width=width, height=height, heading="Coverability tree")
+    for nodeData in cover_petritree.nodes:
+        nodeName = nodeData.getName()
+        nodeLabel = nodeData.getGraphLabel()
+        nodeColor = NODECOLOR_FIRST if nodeData == cover_petritree.nodes[0] else NODECOLOR_GENERIC
+        nodeColor = NODECOLOR_LAST if nodeData == cover_petritree.nodes[-1] else nodeColor
+        cover_pyvistree.add_node(nodeName, label=nodeLabel, shape="box", color=nodeColor, title=nodeName)
+
+    for nodeData, edgeLabel in petri_net.createEdgeDictFromGraph(cover_stategraph, cover_petritree).items():
+        nodes = nodeData.split(" ")
+        cover_pyvistree.add_edge(nodes[0], nodes[1], label=edgeLabel, color="black", title=edgeLabel)
+
+    saveGraph(cover_pyvistree, "coverability_tree.html", outputDir)
+
+
+def plotCoverabilityGraph(petri_net, cover_petritree_old, cover_stategraph_old, nodeMergeDict, width, height, outputDir=""):
+    print("\nPlotting Coverability Graph...")
+    cover_pyvisgraph = pvnet.Network(directed=True, width=width, height=height, heading="Coverability graph")
+    for nodeData in cover_petritree_old.nodes:
+        nodeName = nodeData.getName()
+        nodeLabel = nodeData.getGraphLabel()
+        nodeColor = NODECOLOR_FIRST if nodeData == cover_petritree_old.nodes[0] else NODECOLOR_GENERIC
+        nodeColor = NODECOLOR_LAST if nodeData == cover_petritree_old.nodes[-1] else nodeColor
+        cover_pyvisgraph.add_node(nodeName, label=nodeLabel, shape="box", color=nodeColor, title=nodeName)
+
+    for nodeData, edgeLabel in petri_net.createEdgeDictFromGraph(cover_stategraph_old, cover_petritree_old).items():
+        nodes = nodeData.split(" ")
+        cover_pyvisgraph.add_edge(nodes[0], nodes[1], label=edgeLabel, color="black", title=edgeLabel)
+
+    # reroute the edges from old nodes to new nodes
+    nodesToRemove = []
+    for oldNode, newNode in nodeMergeDict.items():
+        for edge in cover_pyvisgraph.get_edges():
+            nodeTo = edge["to"]
+            if oldNode == nodeTo:
+                edge["to"] = newNode
+                nodesToRemove.append(nodeTo)
+
+    # remove the old nodes
+    newNodes = []
+    for node in cover_pyvisgraph.nodes:
+        if node["id"] not in nodesToRemove:
+            nodeLabel = node["label"].split("\n")[1]
+            nodeLabel = "\n"+nodeLabel+"\n"
+            node["label"] = nodeLabel
+            node["title"] = nodeLabel
+            newNodes.append(node)
+    cover_pyvisgraph.nodes = newNodes
+
+    petri_net.updateMultiEdgesForPyvisgraph(cover_pyvisgraph)
+
+    saveGraph(cover_pyvisgraph, "coverability_graph.html", outputDir)
@@ -0,0 +1,214 @@
+from petrimodules.petrinet import Arc, Net, Place, Transition
+
+
+class NetReduction:
+    # classic reduction rules (Murata): fusion of series places/transitions, fusion of parallel places/transitions,
+    # elimination of self-loop places/transitions, applied until none of them matches anymore
+    def __init__(self, petri_net):
+        self.original = petri_net
+        self.places = dict()
+        self.transitions = dict()
+        self.steps = []
+        # reduced place label -> original place labels whose tokens it holds (as a sum)
+        self.placeMap = dict()
+        # reduced transition label -> original transition labels it stands for
+        self.transitionMap = dict()
+        # original label -> (description, original label of the place/transition it now belongs to)
+        self.removedPlaces = dict()
+        self.removedTransitions = dict()
+
+        for place in petri_net.getPlaces():
+            self.places[place.getId()] = {"label": place.getLabel(), "tokens": place.getTokens(), "static": place.isStatic(), "origins": [place.getLabel()]}
+        for transition in petri_net.getTransitions():
+            self.transitions[transition.getId()] = {"label": transition.getLabel(), "rate": transition.getRate(), "pre": dict(), "post": dict(), "origins": [transition.getLabel()]}
+        for arc in petri_net.getArcs():
+            sourceId = arc.getSourceId()
+            destinationId = arc.getDestinationId()
+            if sourceId in self.places and destinationId in self.transitions:
+                self.transitions[destinationId]["pre"][sourceId] = int(arc.getMultiplicity())
+            elif sourceId in self.transitions and destinationId in self.places:
+                self.transitions[sourceId]["post"][destinationId] = int(arc.getMultiplicity())
+
+    def getProducers(self, placeId):
+        return [tid for tid, t in self.transitions.items() if placeId in t["post"]]
+
+    def getConsumers(self, placeId):
+        return [tid for tid, t in self.transitions.items() if placeId in t["pre"]]
+
+    def removePlace(self, placeId):
+        for t in self.transitions.values():
+            t["pre"].pop(placeId, None)
+            t["post"].pop(placeId, None)
+        del self.places[placeId]
+
+    def fuseSeriesPlaces(self):
+        # t moves the only token path from p1 to p2: merge p1 and p2, drop t
+        for tid, t in self.transitions.items():
+            if len(t["pre"]) != 1 or len(t["post"]) != 1:
+                continue
+            (p1, w1), = t["pre"].items()
+            (p2, w2), = t["post"].items()
+            if p1 == p2 or w1 != 1 or w2 != 1 or self.getConsumers(p1) != [tid]:
+                continue
+            place1, place2 = self.places[p1], self.places[p2]
+            for other in self.getProducers(p1):
+                if other != tid:
+                    otherT = self.transitions[other]
+                    otherT["post"][p2] = otherT["post"].get(p2, 0) + otherT["post"].pop(p1)
+            self.steps.append(f"fused series places {place1['label']} and {place2['label']} (removed transition {t['label']})")
+            self.removedTransitions.update({label: ("fused into place", ("place", place2["origins"][0])) for label in t["origins"]})
+            place2["label"] = place1["label"] + "+" + place2["label"]
+            place2["tokens"] += place1["tokens"]
+            place2["static"] = place1["static"] and place2["static"]
+            place2["origins"] = place1["origins"] + place2["origins"]
+            del self.transitions[tid]
+            self.removePlace(p1)
+            return True
+        return False
+
+    def fuseSeriesTransitions(self):
+        # p is only a handover from t1 to t2 and t2 needs nothing else: merge t1 and t2, drop p,
+        # t2 has to put tokens somewhere, otherwise the tokens which pile up in p would vanish with it
+        for pid, p in self.places.items():
+            producers = self.getProducers(pid)
+            consumers = self.getConsumers(pid)
+            if p["tokens"] != 0 or len(producers) != 1 or len(consumers) != 1 or producers == consumers:
+                continue
+            t1, t2 = self.transitions[producers[0]], self.transitions[consumers[0]]
+            if t1["post"][pid] != 1 or t2["pre"] != {pid: 1} or not t2["post"]:
+                continue
+            self.steps.append(f"fused series transitions {t1['label']} and {t2['label']} (removed place {p['label']})")
+            self.removedPlaces.update({label: ("fused into transition", ("transition", t1["origins"][0])) for label in p["origins"]})
+            del t1["post"][pid]
+            for placeId, weight in t2["post"].items():
+                t1["post"][placeId] = t1["post"].get(placeId, 0) + weight
+            t1["label"] = t1["label"] + "." + t2["label"]
+            t1["origins"] = t1["origins"] + t2["origins"]
+            del self.transitions[consumers[0]]
+            del self.places[pid]
+            return True
+        return False
+
+    def fuseParallelPlaces(self):
+        # two places with the same arcs and the same initial tokens always hold the same tokens
+        seen = dict()
+        for pid, p in self.places.items():
+            pre = tuple(sorted((tid, t["post"][pid]) for tid, t in self.transitions.items() if pid in t["post"]))
+            post = tuple(sorted((tid, t["pre"][pid]) for tid, t in self.transitions.items() if pid in t["pre"]))
+            key = (pre, post, p["tokens"])
+            if key in seen and (pre or post):
+                kept = self.places[seen[key]]
+                self.steps.append(f"fused parallel places {kept['label']} and {p['label']}")
+                self.removedPlaces.update({label: ("always holds the same tokens as place", ("place", kept["origins"][0])) for label in p["origins"]})
+                self.removePlace(pid)
+                return True
+            seen[key] = pid
+        return False
+
+    def fuseParallelTransitions(self):
+        # two transitions with the same arcs have the same effect, the fused one fires with the sum of their rates
+        seen = dict()
+        for tid, t in self.transitions.items():
+            key = (tuple(sorted(t["pre"].items())), tuple(sorted(t["post"].items())))
+            if key in seen:
+                kept = self.transitions[seen[key]]
+                self.steps.append(f"fused parallel transitions {kept['label']} and {t['label']}")
+                kept["label"] = kept["label"] + "|" + t["label"]
+                kept["rate"] = kept["rate"] + t["rate"]
+                kept["origins"] = kept["origins"] + t["origins"]
+                del self.transitions[tid]
+                return True
+            seen[key] = tid
+        return False
+
+    def eliminateSelfLoopPlaces(self):
+        # a place which is only read by self loops and always has enough tokens never blocks anything,
+        # it is kept when it is the only input of a transition so no source transitions appear
+        for pid, p in self.places.items():
+            consumers = self.getConsumers(pid)
+            if not consumers or sorted(consumers) != sorted(self.getProducers(pid)):
+                continue
+            if any(len(self.transitions[tid]["pre"]) == 1 for tid in consumers):
+                continue
+            if all(self.transitions[tid]["pre"][pid] == self.transitions[tid]["post"][pid] <= p["tokens"] for tid in consumers):
+                self.steps.append(f"eliminated self-loop place {p['label']}")
+                self.removedPlaces.update({label: (f"constant, {p['tokens']} tokens in total", None) for label in p["origins"]})
+                self.removePlace(pid)
+                return True
+        return False
+
+    def eliminateSelfLoopTransitions(self):
+        # a transition which puts back exactly what it takes doesn't change the marking, it is only removed
+        # if some other transition is enabled whenever it is, otherwise removing it could create deadlocks
+        for tid, t in self.transitions.items():
+            if not t["pre"] or t["pre"] != t["post"]:
+                continue
+            for otherId, other in self.transitions.items():
+                if otherId != tid and all(t["pre"].get(pid, 0) >= weight for pid, weight in other["pre"].items()):
+                    self.steps.append(f"eliminated self-loop transition {t['label']}")
+                    self.removedTransitions.update({label: ("self-loop, doesn't change the marking", None) for label in t["origins"]})
+                    del self.transitions[tid]
+                    return True
+        return False
+
+    def reduce(self):
+        rules = [self.eliminateSelfLoopTransitions, self.eliminateSelfLoopPlaces, self.fuseParallelTransitions,
+                 self.fuseParallelPlaces, self.fuseSeriesPlaces, self.fuseSeriesTransitions]
+        while any(rule() for rule in rules):
+            pass
+
+        self.net = Net()
+        for pid, p in self.places.items():
+            self.net.addPlace(Place(pid, p["label"], p["tokens"], p["static"]))
+            self.placeMap[p["label"]] = p["origins"]
+        arcCount = 0
+        for tid, t in self.transitions.items():
+            self.net.addTransition(Transition(tid, t["label"], t["rate"]))
+            self.transitionMap[t["label"]] = t["origins"]
+            for pid, weight in t["pre"].items():
+                self.net.addArc(Arc(f"reduced_arc{arcCount}", pid, tid, weight))
+                arcCount += 1
+            for pid, weight in t["post"].items():
+                self.net.addArc(Arc(f"reduced_arc{arcCount}", tid, pid, weight))
+                arcCount += 1
+        return self
+
+    def getCurrentLabel(self, reference):
+        # label in the reduced net of the place/transition which contains the given original one
+        kind, origin = reference
+        items = self.places if kind == "place" else self.transitions
+        for item in items.values():
+            if origin in item["origins"]:
+                return item["label"]
+        removed = self.removedPlaces if kind == "place" else self.removedTransitions
+        description, nextReference = removed[origin]
+        return self.getCurrentLabel(nextReference) if nextReference is not None else origin
+
+    def describeRemoved(self, description, reference):
+        return description if reference is None else f"{description} {self.getCurrentLabel(reference)}"
+
+    def getOriginalPlaceLabels(self, label):
+        return self.placeMap[label]
+
+    def getOriginalTransitionLabels(self, label):
+        return self.transitionMap[label]
+
+    def printSummary(self):
+        print(f"\nNet reduction: {len(self.original.getPlaces())} -> {len(self.net.getPlaces())} places, "
+              f"{len(self.original.getTransitions())} -> {len(self.net.getTransitions())} transitions")
+        for step in self.steps:
+            print("-", step)
+        for label, origins in self.placeMap.items():
+            if origins != [label]:
+                print(f"Place {label} holds the tokens of {' + '.join(origins)}")
+        for label, origins in self.transitionMap.items():
+            if len(origins) > 1:
+                print(f"Transition {label} stands for {', '.join(origins)}")
+        for label, (description, reference) in self.removedPlaces.items():
+            print(f"Place {label} removed: {self.describeRemoved(description, reference)}")
+        for label, (description, reference) in self.removedTransitions.items():
+            print(f"Transition {label} removed: {self.describeRemoved(description, reference)}")
+
+
+def reduceNet(petri_net):
+    return NetReduction(petri_net).reduce()
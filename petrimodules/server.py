@@ -0,0 +1,341 @@
+import asyncio
+import hashlib
+import io
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import parse_qs, urlsplit
+
+from petrimodules import builders
+from petrimodules import export
+from petrimodules import petrinet
+
+
+ANALYSES = ["matrices", "reachability", "coverability"]
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+MAX_BODY_SIZE = 64 * 1024 * 1024
+
+
+def encodeMembers(data):
+    # members of a json object without the braces, so cached parts can be joined without encoding them again
+    return json.dumps(data, ensure_ascii=False)[1:-1].encode("utf-8")
+
+
+class CachedAnalysis:
+    # result of one analysis of one net, responses are put together from the cached analyses they ask for
+    def __init__(self, net, graphs, labels, data, times):
+        self.net = net
+        # name -> (petrigraph with the nodes, StateGraph with the edges)
+        self.graphs = graphs
+        # place and transition labels in the requested order, the same for every analysis of the net
+        self.labels = labels
+        self.members = encodeMembers(data)
+        self.times = times
+
+    def getSize(self):
+        size = len(self.members)
+        for name, (petrigraph, graph) in self.graphs.items():
+            if graph is not None:
+                size += graph.getMemoryUsage()
+            # rough per node cost of the python node objects and their state lists
+            size += len(petrigraph.nodes) * (200 + 8 * len(self.net.getPlaces()))
+        return size
+
+
+def buildResponseBody(entries):
+    times = dict()
+    for entry in entries:
+        times.update(entry.times)
+    parts = [encodeMembers(entries[0].labels)] + [entry.members for entry in entries] + [encodeMembers({"times": times})]
+    return b"{" + b", ".join(parts) + b"}"
+
+
+def getGraphSummary(petri_net, petrigraph, graph):
+    data = export.getGraphData(petri_net, petrigraph, graph)
+    del data["places"], data["transitions"]
+    data["deadlocks"] = petri_net.getLeafNodesFromGraph(graph, petrigraph)
+    return data
+
+
+def checkOrder(pattern, labels, kind):
+    # the net only prints a warning for a bad order and keeps the default one, the server rejects it instead
+    ordered = pattern.split(" ")
+    unknown = [label for label in ordered if label not in labels]
+    if unknown:
+        raise ValueError(f"Unknown {kind} labels in the {kind} order: {', '.join(unknown)}")
+    if sorted(ordered) != sorted(labels):
+        raise ValueError(f"The {kind} order has to name every {kind} exactly once")
+
+
+def computeAnalysis(content, placeOrder, transitionOrder, analysis):
+    # runs in a worker process, everything returned here has to be picklable
+    petri_net = petrinet.loadNet(io.BytesIO(content))
+    if placeOrder:
+        checkOrder(placeOrder, [place.getLabel() for place in petri_net.getPlaces()], "place")
+    if transitionOrder:
+        checkOrder(transitionOrder, [transition.getLabel() for transition in petri_net.getTransitions()], "transition")
+    if placeOrder:
+        petri_net.sortPlacesByPattern(placeOrder)
+    else:
+        petri_net.sortPlaces()
+    if transitionOrder:
+        petri_net.sortTransitionsByPattern(transitionOrder)
+    else:
+        petri_net.sortTransitions()
+    petri_net.buildMatrices()
+
+    graphs = dict()
+    labels = {
+        "places": [place.getLabel() for place in petri_net.getPlaces()],
+        "transitions": [transition.getLabel() for transition in petri_net.getTransitions()],
+    }
+    data = dict()
+    times = dict()
+
+    if analysis == "matrices":
+        data["matrices"] = {
+            "input": petri_net.inputMatrix.tolist(),
+            "output": petri_net.outputMatrix.tolist(),
+            "incidence": petri_net.incidenceMatrix.tolist(),
+        }
+
+    if analysis == "reachability":
+        start = time.perf_counter()
+        reach_petrigraph, reach_stategraph = builders.buildReachabilityGraph(petri_net)
+        times["reachability"] = time.perf_counter() - start
+        if reach_stategraph is None:
+            data["reachability"] = {"infinite": True}
+        else:
+            graphs["reachability"] = (reach_petrigraph, reach_stategraph)
+            data["reachability"] = getGraphSummary(petri_net, reach_petrigraph, reach_stategraph)
+            data["reachability"]["infinite"] = False
+            liveTransitions = reach_stategraph.getLiveTransitions(len(petri_net.getTransitions()))
+            data["reachability"]["liveTransitions"] = [t.getLabel() for t, live in zip(petri_net.getTransitions(), liveTransitions) if live]
+
+    if analysis == "coverability":
+        start = time.perf_counter()
+        cover_petritree_old, cover_stategraph_old = builders.buildCoverabilityTreeOld(petri_net)
+        cover_petritree, cover_stategraph = builders.buildCoverabilityTree(petri_net)
+        nodeMergeDict = builders.getCoverabilityGraphNodeMerges(petri_net, cover_petritree_old)
+        cover_petrigraph, cover_graph = builders.buildCoverabilityGraph(cover_petritree_old, cover_stategraph_old, nodeMergeDict)
+        times["coverability"] = time.perf_counter() - start
+        graphs["coverabilityTree"] = (cover_petritree, cover_stategraph)
+        graphs["coverabilityGraph"] = (cover_petrigraph, cover_graph)
+        data["coverabilityTree"] = getGraphSummary(petri_net, cover_petritree, cover_stategraph)
+        data["coverabilityGraph"] = getGraphSummary(petri_net, cover_petrigraph, cover_graph)
+        data["bounded"] = not any(petrinet.CONST_OMEGA_CHAR in node.state for node in cover_petritree.nodes)
+
+    times = {key: round(value, 6) for key, value in times.items()}
+
+    # the nodes link to their predcessors, which is too deep to pickle for large graphs
+    for petrigraph, graph in graphs.values():
+        for node in petrigraph.nodes:
+            node.predcessorNode = None
+            node.predcessors = []
+    return CachedAnalysis(petri_net, graphs, labels, data, times)
+
+
+class AnalysisCache:
+    # LRU cache bounded by the estimated size of its entries
+    def __init__(self, maxBytes):
+        self.maxBytes = maxBytes
+        self.entries = OrderedDict()
+        self.sizes = dict()
+        self.totalBytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        # misses are counted by the caller when it starts a computation, a request which waits for
+        # a computation that is already running isn't a miss
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        size = entry.getSize()
+        if size > self.maxBytes:
+            return
+        if key in self.entries:
+            self.remove(key)
+        self.entries[key] = entry
+        self.sizes[key] = size
+        self.totalBytes += size
+        while self.totalBytes > self.maxBytes:
+            self.remove(next(iter(self.entries)))
+
+    def remove(self, key):
+        del self.entries[key]
+        self.totalBytes -= self.sizes.pop(key)
+
+    def getStats(self):
+        return {"entries": len(self.entries), "bytes": self.totalBytes, "maxBytes": self.maxBytes, "hits": self.hits, "misses": self.misses}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class AnalysisServer:
+    def __init__(self, host="127.0.0.1", port=8765, jobs=None, cacheSizeMB=256):
+        self.host = host
+        self.port = port
+        self.jobs = jobs
+        self.executor = ProcessPoolExecutor(jobs)
+        self.cache = AnalysisCache(cacheSizeMB * 1024 * 1024)
+        # identical requests which are being computed right now, they all wait for the same result
+        self.inflight = dict()
+        self.computations = 0
+        self.coalesced = 0
+
+    async def analyze(self, content, placeOrder, transitionOrder, analyses):
+        # every analysis is cached and computed on its own, so requests for different sets of analyses share them,
+        # the missing ones run in parallel
+        contentHash = hashlib.sha256(content).hexdigest()
+        results = await asyncio.gather(*[self.analyzeOne(content, contentHash, placeOrder, transitionOrder, analysis) for analysis in analyses],
+                                       return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        sources = [source for entry, source in results]
+        if "computed" in sources:
+            source = "computed"
+        elif "coalesced" in sources:
+            source = "coalesced"
+        else:
+            source = "cached"
+        return buildResponseBody([entry for entry, source in results]), source
+
+    async def analyzeOne(self, content, contentHash, placeOrder, transitionOrder, analysis):
+        key = (contentHash, placeOrder, transitionOrder, analysis)
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry, "cached"
+
+        future = self.inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future), "coalesced"
+
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        future = loop.run_in_executor(executor, computeAnalysis, content, placeOrder, transitionOrder, analysis)
+        self.inflight[key] = future
+        self.cache.misses += 1
+        self.computations += 1
+        try:
+            entry = await asyncio.shield(future)
+            self.cache.put(key, entry)
+        except BrokenProcessPool:
+            # a worker died (e.g. killed by the OS when out of memory), the pool refuses all further work,
+            # requests which ran in the same pool see the same error, only the first one replaces it
+            if self.executor is executor:
+                self.executor = ProcessPoolExecutor(self.jobs)
+                executor.shutdown(wait=False)
+            raise
+        finally:
+            del self.inflight[key]
+        return entry, "computed"
+
+    async def handleRequest(self, method, target, body):
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+        if url.path == "/health":
+            return {"status": "ok"}
+
+        if url.path == "/stats":
+            stats = self.cache.getStats()
+            stats.update({"computations": self.computations, "coalesced": self.coalesced, "inflight": len(self.inflight)})
+            return stats
+
+        if url.path == "/analyze":
+            if method != "POST":
+                raise HttpError(405, "POST the net file contents to /analyze")
+            analyses = [name for name in query.get("analyses", ",".join(ANALYSES)).split(",") if name]
+            unknown = [name for name in analyses if name not in ANALYSES]
+            if unknown:
+                raise HttpError(400, f"Unknown analyses: {', '.join(unknown)}")
+            if not analyses:
+                raise HttpError(400, "No analyses requested")
+            analyses = sorted(set(analyses), key=ANALYSES.index)
+            try:
+                body, source = await self.analyze(body, query.get("placeOrder", ""), query.get("transitionOrder", ""), analyses)
+            except BrokenProcessPool:
+                raise HttpError(500, "The worker process died during the analysis, the request can be retried")
+            except Exception as err:
+                raise HttpError(400, f"{type(err).__name__}: {err}")
+            return body, source
+
+        raise HttpError(404, f"Unknown path '{url.path}'")
+
+    async def writeResponse(self, writer, status, body, headers=None):
+        if not isinstance(body, bytes):
+            body = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        lines = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}", "Content-Type: application/json; charset=utf-8", f"Content-Length: {len(body)}"]
+        for name, value in (headers or dict()).items():
+            lines.append(f"{name}: {value}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def handleConnection(self, reader, writer):
+        try:
+            while True:
+                requestLine = await reader.readline()
+                if not requestLine.strip():
+                    break
+                method, target, version = requestLine.decode("latin-1").split()
+                headers = dict()
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, value = line.decode("latin-1").split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+
+                keepAlive = headers.get("connection", "keep-alive" if version == "HTTP/1.1" else "close").lower() != "close"
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_SIZE:
+                    await self.writeResponse(writer, 413, {"error": "Request body too large"})
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                extraHeaders = {"Connection": "keep-alive" if keepAlive else "close"}
+                try:
+                    result = await self.handleRequest(method, target, body)
+                    if isinstance(result, tuple):
+                        result, extraHeaders["X-Result-Source"] = result
+                    await self.writeResponse(writer, 200, result, extraHeaders)
+                except HttpError as err:
+                    await self.writeResponse(writer, err.status, {"error": str(err)}, extraHeaders)
+                except Exception as err:
+                    await self.writeResponse(writer, 500, {"error": f"{type(err).__name__}: {err}"}, extraHeaders)
+
+                if not keepAlive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        server = await asyncio.start_server(self.handleConnection, self.host, self.port)
+        print(f"Serving on http://{self.host}:{self.port} (POST a net to /analyze, GET /stats)")
+        async with server:
+            await server.serve_forever()
+
+    def run(self):
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.executor.shutdown(cancel_futures=True)
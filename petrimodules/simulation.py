@@ -0,0 +1,161 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+class SimulationResult:
+    # statistics of a batch of runs, results of independent batches can be merged
+    def __init__(self, placeCount, transitionCount, steps):
+        self.steps = steps
+        self.runs = 0
+        self.samples = 0
+        self.deadlockedRuns = 0
+        self.deadlockStepSum = 0
+        self.firingCounts = np.zeros(transitionCount, dtype=np.int64)
+        self.placeSum = np.zeros(placeCount, dtype=np.float64)
+        self.placeSquareSum = np.zeros(placeCount, dtype=np.float64)
+        self.placeMarkedCount = np.zeros(placeCount, dtype=np.int64)
+        self.placeMax = np.zeros(placeCount, dtype=np.int64)
+
+    def merge(self, other):
+        self.runs += other.runs
+        self.samples += other.samples
+        self.deadlockedRuns += other.deadlockedRuns
+        self.deadlockStepSum += other.deadlockStepSum
+        self.firingCounts += other.firingCounts
+        self.placeSum += other.placeSum
+        self.placeSquareSum += other.placeSquareSum
+        self.placeMarkedCount += other.placeMarkedCount
+        np.maximum(self.placeMax, other.placeMax, out=self.placeMax)
+        return self
+
+    def getDeadlockFrequency(self):
+        return self.deadlockedRuns / self.runs if self.runs else 0.0
+
+    def getMeanDeadlockStep(self):
+        return self.deadlockStepSum / self.deadlockedRuns if self.deadlockedRuns else None
+
+    def getPlaceMeans(self):
+        return self.placeSum / self.samples
+
+    def getPlaceStds(self):
+        means = self.getPlaceMeans()
+        return np.sqrt(np.maximum(self.placeSquareSum / self.samples - means * means, 0.0))
+
+    def getPlaceMarkedProbabilities(self):
+        return self.placeMarkedCount / self.samples
+
+    def getFiringsPerRun(self):
+        return self.firingCounts / self.runs
+
+
+class Simulator:
+    # advances many independent token games at once, the markings of all runs form one (runs x places) matrix
+    def __init__(self, inputMatrix, incidenceMatrix, initialMarking, weights=None):
+        self.inputMatrix = np.asarray(inputMatrix, dtype=np.int64)
+        self.incidenceMatrix = np.asarray(incidenceMatrix, dtype=np.int64)
+        self.initialMarking = np.asarray(initialMarking, dtype=np.int64)
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+        self.incidenceRows = np.ascontiguousarray(self.incidenceMatrix.T)
+        # only preset places are checked for enabledness
+        self.presets = [(np.flatnonzero(column), column[np.flatnonzero(column)]) for column in self.inputMatrix.T]
+
+    def getEnabled(self, markings):
+        enabled = np.ones((markings.shape[0], len(self.presets)), dtype=bool)
+        for transIndex, (places, required) in enumerate(self.presets):
+            if len(places) == 1:
+                enabled[:, transIndex] = markings[:, places[0]] >= required[0]
+            elif len(places) > 1:
+                enabled[:, transIndex] = (markings[:, places] >= required).all(axis=1)
+        return enabled
+
+    def chooseTransitions(self, enabled, rng):
+        # uniform (or weighted) choice among the enabled transitions of every run, weighted keys are
+        # log(u) / weight with u in (0, 1], the log of u ** (1 / weight) which underflows to 0 for small weights
+        if self.weights is None:
+            keys = rng.random(enabled.shape)
+            keys[~enabled] = -1.0
+        else:
+            keys = np.log1p(-rng.random(enabled.shape)) / self.weights
+            keys[~enabled] = -np.inf
+        return keys.argmax(axis=1)
+
+    def run(self, runs, steps, rng):
+        placeCount, transitionCount = self.inputMatrix.shape
+        result = SimulationResult(placeCount, transitionCount, steps)
+        markings = np.tile(self.initialMarking, (runs, 1))
+        alive = np.ones(runs, dtype=bool)
+
+        def collect(times=1):
+            result.samples += runs * times
+            result.placeSum += markings.sum(axis=0) * times
+            result.placeSquareSum += (markings.astype(np.float64) ** 2).sum(axis=0) * times
+            result.placeMarkedCount += (markings > 0).sum(axis=0) * times
+            np.maximum(result.placeMax, markings.max(axis=0), out=result.placeMax)
+
+        collect()
+        for step in range(steps):
+            enabled = self.getEnabled(markings)
+            stuck = alive & ~enabled.any(axis=1)
+            if stuck.any():
+                result.deadlockedRuns += int(stuck.sum())
+                result.deadlockStepSum += step * int(stuck.sum())
+                alive &= ~stuck
+
+            # deadlocked runs keep their final marking for the occupancy statistics
+            if not alive.any():
+                collect(steps - step)
+                break
+
+            chosen = self.chooseTransitions(enabled[alive], rng)
+            markings[alive] += self.incidenceRows[chosen]
+            result.firingCounts += np.bincount(chosen, minlength=transitionCount)
+            collect()
+        else:
+            # the last firing can deadlock a run too
+            stuck = alive & ~self.getEnabled(markings).any(axis=1)
+            result.deadlockedRuns += int(stuck.sum())
+            result.deadlockStepSum += steps * int(stuck.sum())
+
+        result.runs = runs
+        return result
+
+
+def simulateChunk(inputMatrix, incidenceMatrix, initialMarking, runs, steps, seedSequence, weights=None):
+    simulator = Simulator(inputMatrix, incidenceMatrix, initialMarking, weights)
+    return simulator.run(runs, steps, np.random.default_rng(seedSequence))
+
+
+def simulate(petri_net, runs=10000, steps=1000, seed=None, jobs=1, chunkSize=10000, weights=None):
+    # runs are split into chunks with independent random streams, so the result for a given seed
+    # and chunk size is the same no matter how many processes are used
+    chunks = [min(chunkSize, runs - start) for start in range(0, runs, chunkSize)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    args = (petri_net.inputMatrix, petri_net.incidenceMatrix, petri_net.getGraphState())
+
+    result = SimulationResult(len(petri_net.getPlaces()), len(petri_net.getTransitions()), steps)
+    if jobs == 1 or len(chunks) == 1:
+        for chunkRuns, seedSequence in zip(chunks, seeds):
+            result.merge(simulateChunk(*args, chunkRuns, steps, seedSequence, weights))
+    else:
+        with ProcessPoolExecutor(jobs) as executor:
+            futures = [executor.submit(simulateChunk, *args, chunkRuns, steps, seedSequence, weights) for chunkRuns, seedSequence in zip(chunks, seeds)]
+            for future in futures:
+                result.merge(future.result())
+    return result
+
+
+def printSimulationResult(petri_net, result):
+    print(f"\nSimulated {result.runs} runs of {result.steps} steps")
+    meanDeadlockStep = result.getMeanDeadlockStep()
+    print(f"Deadlock frequency: {result.getDeadlockFrequency():.4f}" + (f" (mean step {meanDeadlockStep:.1f})" if meanDeadlockStep is not None else ""))
+
+    print("\nPlace occupancy:")
+    print(f"{'place':<16}{'mean':>10}{'std':>10}{'max':>8}{'P(marked)':>11}")
+    for place, mean, std, maximum, marked in zip(petri_net.getPlaces(), result.getPlaceMeans(), result.getPlaceStds(), result.placeMax, result.getPlaceMarkedProbabilities()):
+        print(f"{place.getLabel():<16}{mean:>10.4f}{std:>10.4f}{maximum:>8}{marked:>11.4f}")
+
+    print("\nTransition firings:")
+    print(f"{'transition':<16}{'total':>12}{'per run':>12}")
+    for transition, count, perRun in zip(petri_net.getTransitions(), result.firingCounts, result.getFiringsPerRun()):
+        print(f"{transition.getLabel():<16}{count:>12}{perRun:>12.4f}")
@@ -0,0 +1,180 @@
+from array import array
+
+import numpy as np
+
+
+class StateGraphBuilder:
+    def __init__(self):
+        self.nodeCount = 0
+        self.sources = array("i")
+        self.targets = array("i")
+        self.transitions = array("i")
+
+    def addNode(self):
+        self.nodeCount += 1
+        return self.nodeCount - 1
+
+    def addEdge(self, source, target, transitionIndex):
+        self.nodeCount = max(self.nodeCount, source + 1, target + 1)
+        self.sources.append(source)
+        self.targets.append(target)
+        self.transitions.append(transitionIndex)
+
+    def getEdgeCount(self):
+        return len(self.sources)
+
+    def build(self, nodeCount=None):
+        if nodeCount is None:
+            nodeCount = self.nodeCount
+        sources = np.frombuffer(self.sources, dtype=np.int32) if len(self.sources) else np.zeros(0, dtype=np.int32)
+        targets = np.frombuffer(self.targets, dtype=np.int32) if len(self.targets) else np.zeros(0, dtype=np.int32)
+        transitions = np.frombuffer(self.transitions, dtype=np.int32) if len(self.transitions) else np.zeros(0, dtype=np.int32)
+        return StateGraph.fromEdges(nodeCount, sources, targets, transitions)
+
+
+class StateGraph:
+    # edges are stored in CSR order: all edges leaving node n are at offsets[n]:offsets[n + 1],
+    # in the order they were added
+    def __init__(self, nodeCount, offsets, sources, targets, transitions):
+        self.nodeCount = nodeCount
+        self.offsets = offsets
+        self.sources = sources
+        self.targets = targets
+        self.transitions = transitions
+        self.components = None
+        self.componentCount = None
+
+    @classmethod
+    def fromEdges(cls, nodeCount, sources, targets, transitions):
+        order = np.argsort(sources, kind="stable")
+        sources = np.ascontiguousarray(sources[order], dtype=np.int32)
+        targets = np.ascontiguousarray(targets[order], dtype=np.int32)
+        transitions = np.ascontiguousarray(transitions[order], dtype=np.int32)
+        offsets = np.zeros(nodeCount + 1, dtype=np.int32)
+        np.cumsum(np.bincount(sources, minlength=nodeCount), out=offsets[1:])
+        return cls(nodeCount, offsets, sources, targets, transitions)
+
+    def getNodeCount(self):
+        return self.nodeCount
+
+    def getEdgeCount(self):
+        return len(self.sources)
+
+    def getMemoryUsage(self):
+        return self.offsets.nbytes + self.sources.nbytes + self.targets.nbytes + self.transitions.nbytes
+
+    def getOutDegrees(self):
+        return np.diff(self.offsets)
+
+    def getInDegrees(self):
+        return np.bincount(self.targets, minlength=self.nodeCount)
+
+    def getSuccessors(self, node):
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def getOutgoingEdges(self, node):
+        start, end = self.offsets[node], self.offsets[node + 1]
+        return zip(self.targets[start:end].tolist(), self.transitions[start:end].tolist())
+
+    def iterEdges(self):
+        return zip(self.sources.tolist(), self.targets.tolist(), self.transitions.tolist())
+
+    def getDeadlockNodes(self):
+        return np.flatnonzero(self.getOutDegrees() == 0)
+
+    def getStronglyConnectedComponents(self):
+        # iterative Tarjan, components are numbered in reverse topological order (sink components first)
+        if self.components is not None:
+            return self.components, self.componentCount
+
+        n = self.nodeCount
+        offsets = self.offsets.tolist()
+        targets = self.targets.tolist()
+        index = [-1] * n
+        lowlink = [0] * n
+        onStack = [False] * n
+        components = [-1] * n
+        stack = []
+        nextIndex = 0
+        componentCount = 0
+
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            index[root] = lowlink[root] = nextIndex
+            nextIndex += 1
+            stack.append(root)
+            onStack[root] = True
+            callStack = [(root, offsets[root])]
+            while callStack:
+                node, edge = callStack[-1]
+                if edge < offsets[node + 1]:
+                    callStack[-1] = (node, edge + 1)
+                    succ = targets[edge]
+                    if index[succ] == -1:
+                        index[succ] = lowlink[succ] = nextIndex
+                        nextIndex += 1
+                        stack.append(succ)
+                        onStack[succ] = True
+                        callStack.append((succ, offsets[succ]))
+                    elif onStack[succ] and index[succ] < lowlink[node]:
+                        lowlink[node] = index[succ]
+                    continue
+
+                callStack.pop()
+                if callStack:
+                    parent = callStack[-1][0]
+                    if lowlink[node] < lowlink[parent]:
+                        lowlink[parent] = lowlink[node]
+                if lowlink[node] == index[node]:
+                    while True:
+                        member = stack.pop()
+                        onStack[member] = False
+                        components[member] = componentCount
+                        if member == node:
+                            break
+                    componentCount += 1
+
+        self.components = np.array(components, dtype=np.int32)
+        self.componentCount = componentCount
+        return self.components, self.componentCount
+
+    def getTerminalComponents(self):
+        # components without any edge leaving them (bottom SCCs)
+        components, componentCount = self.getStronglyConnectedComponents()
+        isTerminal = np.ones(componentCount, dtype=bool)
+        leaving = components[self.sources] != components[self.targets]
+        isTerminal[components[self.sources[leaving]]] = False
+        order = np.argsort(components, kind="stable")
+        bounds = np.searchsorted(components[order], np.arange(componentCount + 1))
+        return [order[bounds[c]:bounds[c + 1]] for c in np.flatnonzero(isTerminal)]
+
+    def getLiveTransitions(self, transitionCount):
+        # in a finite reachability graph a transition is live iff every terminal component contains an edge labelled by it
+        components, componentCount = self.getStronglyConnectedComponents()
+        isLive = np.ones(transitionCount, dtype=bool)
+        edgeComponents = components[self.sources]
+        for terminal in self.getTerminalComponents():
+            inside = edgeComponents == components[terminal[0]]
+            present = np.zeros(transitionCount, dtype=bool)
+            present[self.transitions[inside]] = True
+            isLive &= present
+        return isLive
+
+    def getDeadTransitions(self, transitionCount):
+        # transitions which never fire anywhere in the graph
+        fired = np.zeros(transitionCount, dtype=bool)
+        fired[self.transitions] = True
+        return ~fired
+
+    def toNetworkx(self, nodeNames=None, transitionLabels=None):
+        # optional export adapter, networkx is only needed when this is called
+        import networkx as nx
+
+        graph = nx.MultiDiGraph()
+        names = nodeNames if nodeNames is not None else list(range(self.nodeCount))
+        graph.add_nodes_from(names)
+        for source, target, transitionIndex in self.iterEdges():
+            label = transitionLabels[transitionIndex] if transitionLabels is not None else transitionIndex
+            graph.add_edge(names[source], names[target], label=label)
+        return graph
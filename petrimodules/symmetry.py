@@ -0,0 +1,442 @@
+import math
+import time
+from collections import Counter
+
+import numpy as np
+
+from petrimodules import builders
+from petrimodules import stategraph
+
+
+def compose(first, second):
+    # permutation x -> first[second[x]]
+    return tuple(first[point] for point in second)
+
+
+def invert(permutation):
+    inverse = [0] * len(permutation)
+    for point, image in enumerate(permutation):
+        inverse[image] = point
+    return tuple(inverse)
+
+
+class StabilizerChain:
+    # deterministic Schreier-Sims: base points b0, b1, ... and for every level the transversal of the orbit of bi
+    # under the pointwise stabilizer of b0..bi-1, transversals[i][a] maps bi to a, the group is never enumerated
+    def __init__(self, generators, pointCount):
+        self.identity = tuple(range(pointCount))
+        self.base = []
+        self.levelGenerators = []
+        self.transversals = []
+
+        generators = [tuple(int(image) for image in g) for g in generators]
+        generators = [g for g in dict.fromkeys(generators) if g != self.identity]
+        for g in generators:
+            if all(g[point] == point for point in self.base):
+                self.addBasePoint(g)
+        for level in range(len(self.base)):
+            self.levelGenerators[level] = [g for g in generators if all(g[point] == point for point in self.base[:level])]
+            self.transversals[level] = self.getOrbitTransversal(self.base[level], self.levelGenerators[level])
+
+        # every Schreier generator of a level has to sift through the levels below it
+        level = len(self.base) - 1
+        while level >= 0:
+            residue, failedLevel = self.findNewGenerator(level)
+            if residue is None:
+                level -= 1
+                continue
+            if failedLevel == len(self.base):
+                self.addBasePoint(residue)
+            for lower in range(level + 1, failedLevel + 1):
+                self.levelGenerators[lower].append(residue)
+                self.transversals[lower] = self.getOrbitTransversal(self.base[lower], self.levelGenerators[lower])
+            level = failedLevel
+
+    def addBasePoint(self, permutation):
+        self.base.append(next(point for point, image in enumerate(permutation) if image != point))
+        self.levelGenerators.append([])
+        self.transversals.append({self.base[-1]: self.identity})
+
+    def getOrbitTransversal(self, point, generators):
+        transversal = {point: self.identity}
+        queue = [point]
+        for current in queue:
+            for g in generators:
+                image = g[current]
+                if image not in transversal:
+                    transversal[image] = compose(g, transversal[current])
+                    queue.append(image)
+        return transversal
+
+    def sift(self, permutation, level=0):
+        # strips the permutation level by level, returns the residue and the level where it didn't fit
+        for current in range(level, len(self.base)):
+            image = permutation[self.base[current]]
+            if image not in self.transversals[current]:
+                return permutation, current
+            permutation = compose(invert(self.transversals[current][image]), permutation)
+        return permutation, len(self.base)
+
+    def findNewGenerator(self, level):
+        transversal = self.transversals[level]
+        for point, representative in transversal.items():
+            for g in self.levelGenerators[level]:
+                schreierGenerator = compose(invert(transversal[g[point]]), compose(g, representative))
+                if schreierGenerator == self.identity:
+                    continue
+                residue, failedLevel = self.sift(schreierGenerator, level + 1)
+                if residue != self.identity:
+                    return residue, failedLevel
+        return None, None
+
+    def getOrder(self):
+        order = 1
+        for transversal in self.transversals:
+            order *= len(transversal)
+        return order
+
+
+class NetSymmetry:
+    # automorphisms of the net: permutations of places and transitions which keep inputMatrix, outputMatrix
+    # and the initial marking, found by colour refinement and individualization of the place/transition graph,
+    # vertices 0..placeCount-1 are places, the following ones transitions
+    def __init__(self, petri_net):
+        self.net = petri_net
+        self.inputMatrix = np.asarray(petri_net.inputMatrix, dtype=np.int64)
+        self.outputMatrix = np.asarray(petri_net.outputMatrix, dtype=np.int64)
+        self.initialMarking = np.array([int(tokens) for tokens in petri_net.getGraphState()], dtype=np.int64)
+        self.placeCount = len(petri_net.getPlaces())
+        self.transitionCount = len(petri_net.getTransitions())
+        self.vertexCount = self.placeCount + self.transitionCount
+
+        # (arc label, neighbour), label 0 = arc from place to transition, 1 = arc from transition to place
+        self.adjacency = [[] for _ in range(self.vertexCount)]
+        for place in range(self.placeCount):
+            for transIndex in range(self.transitionCount):
+                vertex = self.placeCount + transIndex
+                if self.inputMatrix[place, transIndex]:
+                    label = (0, int(self.inputMatrix[place, transIndex]))
+                    self.adjacency[place].append((label, vertex))
+                    self.adjacency[vertex].append((label, place))
+                if self.outputMatrix[place, transIndex]:
+                    label = (1, int(self.outputMatrix[place, transIndex]))
+                    self.adjacency[place].append((label, vertex))
+                    self.adjacency[vertex].append((label, place))
+
+        # generators of the group (vertex permutations), the same restricted to the places
+        self.generators = None
+        self.placeGenerators = None
+        self.groupSize = None
+        # size of the group acting on the places, automorphisms which only swap parallel transitions don't count
+        self.placeGroupSize = None
+        # places of every family of interchangeable components, a list of blocks (tuples of places, one per component),
+        # None if the group isn't the full symmetric group of each family
+        self.componentFamilies = None
+        self.placeChain = None
+        self.buildTime = None
+
+    def getGroupSize(self):
+        return self.groupSize
+
+    def refine(self, colors):
+        # colour refinement until the partition is stable, the trace (signatures with their counts in every round)
+        # is the same for two branches of the search only if they can lead to matching leaves
+        trace = []
+        while True:
+            signatures = [(colors[v], tuple(sorted((label, colors[u]) for label, u in self.adjacency[v]))) for v in range(self.vertexCount)]
+            counts = sorted(Counter(signatures).items())
+            trace.append(counts)
+            index = {signature: i for i, (signature, count) in enumerate(counts)}
+            newColors = [index[signature] for signature in signatures]
+            if len(counts) == len(set(colors)):
+                return newColors, trace
+            colors = newColors
+
+    def individualize(self, colors, vertex):
+        colors = list(colors)
+        colors[vertex] = len(set(colors))
+        return colors
+
+    def isAutomorphism(self, permutation):
+        placePermutation = permutation[:self.placeCount]
+        transitionPermutation = permutation[self.placeCount:] - self.placeCount
+        mapping = np.ix_(placePermutation, transitionPermutation)
+        return (np.array_equal(self.inputMatrix[mapping], self.inputMatrix)
+                and np.array_equal(self.outputMatrix[mapping], self.outputMatrix)
+                and np.array_equal(self.initialMarking[placePermutation], self.initialMarking))
+
+    def getFirstCell(self, colors):
+        counts = Counter(colors)
+        cellColors = [color for color in sorted(counts) if counts[color] > 1]
+        return cellColors[0] if cellColors else None
+
+    def findAutomorphism(self, left, right):
+        # first automorphism in the subtree, the left branch always individualizes the smallest vertex
+        # of the first non-trivial cell, the right branch tries every vertex of the same cell
+        color = self.getFirstCell(left)
+        if color is None:
+            rightVertices = {color: vertex for vertex, color in enumerate(right)}
+            permutation = np.array([rightVertices[color] for color in left], dtype=np.int64)
+            return permutation if self.isAutomorphism(permutation) else None
+
+        leftColors, leftTrace = self.refine(self.individualize(left, left.index(color)))
+        for candidate in [v for v in range(self.vertexCount) if right[v] == color]:
+            rightColors, rightTrace = self.refine(self.individualize(right, candidate))
+            if rightTrace == leftTrace:
+                permutation = self.findAutomorphism(leftColors, rightColors)
+                if permutation is not None:
+                    return permutation
+        return None
+
+    def searchFirstPath(self, colors, base, generators):
+        # along the first path of the search tree only one automorphism is needed for every image of the next
+        # base point which the automorphisms found so far (fixing the earlier base points) can't reach yet,
+        # together they generate the whole group
+        color = self.getFirstCell(colors)
+        if color is None:
+            return
+        vertex = colors.index(color)
+        leftColors, leftTrace = self.refine(self.individualize(colors, vertex))
+        self.searchFirstPath(leftColors, base + [vertex], generators)
+
+        for candidate in [v for v in range(self.vertexCount) if colors[v] == color]:
+            stabilizer = [g for g in generators if all(g[point] == point for point in base)]
+            if candidate in self.getOrbit(stabilizer, vertex):
+                continue
+            rightColors, rightTrace = self.refine(self.individualize(colors, candidate))
+            if rightTrace == leftTrace:
+                permutation = self.findAutomorphism(leftColors, rightColors)
+                if permutation is not None:
+                    generators.append(permutation)
+
+    def getOrbit(self, generators, vertex):
+        orbit = {vertex}
+        stack = [vertex]
+        while stack:
+            current = stack.pop()
+            for g in generators:
+                image = int(g[current])
+                if image not in orbit:
+                    orbit.add(image)
+                    stack.append(image)
+        return orbit
+
+    def build(self):
+        start = time.perf_counter()
+        # places and transitions never map onto each other, places keep their initial tokens
+        initial = [(0, int(tokens)) for tokens in self.initialMarking] + [(1, 0)] * self.transitionCount
+        colorIndex = {color: i for i, color in enumerate(sorted(set(initial)))}
+        colors, trace = self.refine([colorIndex[color] for color in initial])
+        generators = []
+        self.searchFirstPath(colors, [], generators)
+
+        self.generators = generators
+        self.groupSize = StabilizerChain(generators, self.vertexCount).getOrder()
+        self.placeGenerators = [tuple(int(image) for image in g[:self.placeCount]) for g in generators]
+        self.placeChain = StabilizerChain(self.placeGenerators, self.placeCount)
+        self.placeGroupSize = self.placeChain.getOrder()
+        self.componentFamilies = self.findComponentFamilies()
+        self.buildTime = time.perf_counter() - start
+        return self
+
+    def findEquivariantMap(self, reference, orbit):
+        # bijection f from the reference orbit to the other one with g(f(p)) = f(g(p)) for every generator,
+        # the places p and f(p) then always move together and belong to the same component
+        for candidate in orbit:
+            mapping = {reference[0]: candidate}
+            queue = [reference[0]]
+            isConsistent = True
+            for current in queue:
+                for g in self.placeGenerators:
+                    image, mappedImage = g[current], g[mapping[current]]
+                    if image not in mapping:
+                        mapping[image] = mappedImage
+                        queue.append(image)
+                    elif mapping[image] != mappedImage:
+                        isConsistent = False
+                        break
+                if not isConsistent:
+                    break
+            if isConsistent and len(set(mapping.values())) == len(reference):
+                return mapping
+        return None
+
+    def findComponentFamilies(self):
+        # place orbits which move together form a family of components (one block of places per component),
+        # if the group is as large as all permutations of the components of every family, any permutation
+        # of the components is an automorphism and sorting them gives a canonical form
+        families = []
+        for orbit in self.getPlaceOrbits():
+            if len(orbit) == 1:
+                continue
+            for reference, blocks in families:
+                mapping = self.findEquivariantMap(reference, orbit) if len(reference) == len(orbit) else None
+                if mapping is not None:
+                    for block, place in zip(blocks, reference):
+                        block.append(mapping[place])
+                    break
+            else:
+                families.append((orbit, [[place] for place in orbit]))
+
+        permutationCount = 1
+        for reference, blocks in families:
+            permutationCount *= math.factorial(len(blocks))
+        if permutationCount != self.placeGroupSize:
+            return None
+        return [[tuple(block) for block in blocks] for reference, blocks in families]
+
+    def getOrbits(self, start, count):
+        orbits = []
+        seen = set()
+        for vertex in range(start, start + count):
+            if vertex not in seen:
+                orbit = sorted(int(image) for image in self.getOrbit(self.generators, vertex))
+                seen.update(orbit)
+                orbits.append([image - start for image in orbit])
+        return orbits
+
+    def getPlaceOrbits(self):
+        return self.getOrbits(0, self.placeCount)
+
+    def getTransitionOrbits(self):
+        return self.getOrbits(self.placeCount, self.transitionCount)
+
+
+class QuotientGraph:
+    # reachability graph over canonical representatives of the marking orbits, every edge is labelled
+    # with the transition fired from the representative
+    def __init__(self, petri_net, symmetry, maxStates=None):
+        self.net = petri_net
+        self.symmetry = symmetry
+        self.maxStates = maxStates
+        self.placeCount = len(petri_net.getPlaces())
+        self.successors = petri_net.getSuccessorKernel()
+
+        self.states = []
+        self.orbitSizes = []
+        self.graph = None
+        # True if the exploration stopped at maxStates, only the first expandedCount states have all their edges then
+        self.isTruncated = False
+        # True if a representative strictly covers one on its search tree path, the net is unbounded then
+        # (the firing sequence between them can be repeated through the automorphism which relates them)
+        self.isInfinite = False
+        self.expandedCount = 0
+        self.buildTime = None
+
+    def canonicalize(self, state):
+        # returns the representative of the orbit of the state and the orbit size
+        if self.symmetry.componentFamilies is not None:
+            return self.sortComponents(state)
+        return self.findSmallestImage(state)
+
+    def sortComponents(self, state):
+        # the components of every family are sorted by their tokens, the orbit size is the number
+        # of distinct orders of the components
+        canonical = list(state)
+        orbitSize = 1
+        for blocks in self.symmetry.componentFamilies:
+            values = sorted(tuple(state[place] for place in block) for block in blocks)
+            orbitSize *= math.factorial(len(values))
+            for count in Counter(values).values():
+                orbitSize //= math.factorial(count)
+            for block, value in zip(blocks, values):
+                for place, tokens in zip(block, value):
+                    canonical[place] = tokens
+        return tuple(canonical), orbitSize
+
+    def findSmallestImage(self, state):
+        # image state[g[p]] which is smallest at the base points of the stabilizer chain (then in all places),
+        # every candidate stands for a coset of the next stabilizer in the chain, those which can't give
+        # the smallest tokens at the next base point are dropped. candidates with the same image have the
+        # same continuations, so they are kept once as image -> number of cosets, which bounds the search
+        # by the orbit of the state instead of the group. at the end the count of the smallest image is
+        # the size of the stabilizer of the state
+        chain = self.symmetry.placeChain
+        candidates = {tuple(state): 1}
+        for transversal in chain.transversals:
+            smallest = min(image[point] for image in candidates for point in transversal)
+            extended = dict()
+            for image, count in candidates.items():
+                for point, representative in transversal.items():
+                    if image[point] == smallest:
+                        element = tuple(image[source] for source in representative)
+                        extended[element] = extended.get(element, 0) + count
+            candidates = extended
+
+        canonical = min(candidates)
+        return canonical, self.symmetry.placeGroupSize // candidates[canonical]
+
+    def build(self):
+        start = time.perf_counter()
+        edges = stategraph.StateGraphBuilder()
+        stateIndices = dict()
+        # parent in the search tree, as in builders.buildStateSpace
+        parents = []
+        block = builders.StateBlock(self.placeCount)
+
+        def addState(canonical, orbitSize, parent):
+            block.setState(len(self.states), canonical)
+            stateIndices[canonical] = len(self.states)
+            self.states.append(canonical)
+            self.orbitSizes.append(orbitSize)
+            parents.append(parent)
+
+        addState(*self.canonicalize(self.net.getGraphState()), -1)
+        current = 0
+        while current < len(self.states):
+            successors = []
+            path = None
+            for transIndex, newState in self.successors(self.states[current]):
+                canonical, orbitSize = self.canonicalize(newState)
+                if canonical not in stateIndices:
+                    if path is None:
+                        path = []
+                        ancestor = current
+                        while ancestor != -1:
+                            path.append(ancestor)
+                            ancestor = parents[ancestor]
+                    if builders.hasDominatedAncestor(block.states[path], canonical):
+                        self.isInfinite = True
+                        break
+                    # a state is only expanded if all its successors fit into the limit
+                    if self.maxStates is not None and len(self.states) >= self.maxStates:
+                        self.isTruncated = True
+                        break
+                    addState(canonical, orbitSize, current)
+                successors.append((stateIndices[canonical], transIndex))
+            if self.isTruncated or self.isInfinite:
+                break
+            for node, transIndex in successors:
+                edges.addEdge(current, node, transIndex)
+            current += 1
+        self.expandedCount = current
+
+        self.graph = edges.build(len(self.states))
+        self.buildTime = time.perf_counter() - start
+        return self
+
+    def getRepresentativeCount(self):
+        return len(self.states)
+
+    def getFullStateCount(self):
+        # number of states of the full reachability graph, a lower bound if the graph is truncated
+        return sum(self.orbitSizes)
+
+    def getDeadlockOrbits(self):
+        # the states which weren't expanded have no edges yet, they aren't deadlocks
+        return [int(node) for node in self.graph.getDeadlockNodes() if node < self.expandedCount]
+
+    def getPlaceOrbitBounds(self):
+        # largest token count of any place of the orbit in any reachable marking (found so far if truncated)
+        states = np.array(self.states, dtype=np.int64).reshape(-1, self.placeCount)
+        return [(orbit, int(states[:, orbit].max(initial=0))) for orbit in self.symmetry.getPlaceOrbits()]
+
+
+def findNetSymmetry(petri_net):
+    return NetSymmetry(petri_net).build()
+
+
+def buildQuotientGraph(petri_net, symmetry=None, maxStates=None):
+    if symmetry is None:
+        symmetry = findNetSymmetry(petri_net)
+    return QuotientGraph(petri_net, symmetry, maxStates).build()
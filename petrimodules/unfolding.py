@@ -0,0 +1,322 @@
+import heapq
+import time
+
+
+class NotSafeError(ValueError):
+    pass
+
+
+def iterBits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class Unfolding:
+    # complete finite prefix of the unfolding of a safe net (Esparza, Roemer, Vogler),
+    # conditions and events are numbered, sets of them are python ints used as bitsets
+    def __init__(self, petri_net, maxEvents=None):
+        self.net = petri_net
+        self.maxEvents = maxEvents
+        self.placeCount = len(petri_net.getPlaces())
+        self.transitionCount = len(petri_net.getTransitions())
+
+        self.presets = []
+        self.postsets = []
+        for transIndex in range(self.transitionCount):
+            inputColumn = [int(x) for x in petri_net.inputMatrix[:, transIndex]]
+            outputColumn = [int(x) for x in petri_net.outputMatrix[:, transIndex]]
+            if max(inputColumn + outputColumn, default=0) > 1:
+                raise NotSafeError("Unfoldings are only supported for nets with arc multiplicity 1")
+            # such a transition can fire again and again, so it always makes the net unbounded
+            if max(inputColumn, default=0) == 0 and max(outputColumn, default=0) > 0:
+                raise NotSafeError(f"The net is not safe, transition '{petri_net.getTransitions()[transIndex].getLabel()}' has no input places")
+            self.presets.append([p for p in range(self.placeCount) if inputColumn[p] > 0])
+            self.postsets.append([p for p in range(self.placeCount) if outputColumn[p] > 0])
+        # transitions which consume from each place
+        self.consumers = [[t for t in range(self.transitionCount) if p in self.presets[t]] for p in range(self.placeCount)]
+        self.initialMarking = tuple(int(tokens) for tokens in petri_net.getGraphState())
+        if max(self.initialMarking, default=0) > 1:
+            raise NotSafeError("The initial marking is not safe")
+
+        # conditions
+        self.conditionPlaces = []
+        self.conditionEvents = []
+        self.conditionCo = []
+        self.placeConditions = [0] * self.placeCount
+        self.usableConditions = 0
+        # events
+        self.eventTransitions = []
+        self.eventPresets = []
+        self.eventPostsets = []
+        self.eventConfigurations = []
+        self.eventDepths = []
+        self.eventMarkings = []
+        self.cutoffs = 0
+        self.cutoffCount = 0
+        # marking -> event whose local configuration reaches it first, -1 for the initial marking
+        self.markingEvents = dict()
+
+        self.extensionQueue = []
+        self.seenExtensions = set()
+        self.buildTime = None
+        self.isComplete = False
+
+    def getConditionCount(self):
+        return len(self.conditionPlaces)
+
+    def getEventCount(self):
+        return len(self.eventTransitions)
+
+    def getCutoffCount(self):
+        return self.cutoffCount
+
+    def isCutoff(self, event):
+        return bool(self.cutoffs >> event & 1)
+
+    def addCondition(self, place, event, co, usable):
+        condition = len(self.conditionPlaces)
+        self.conditionPlaces.append(place)
+        self.conditionEvents.append(event)
+        self.conditionCo.append(co)
+        if usable:
+            self.placeConditions[place] |= 1 << condition
+            self.usableConditions |= 1 << condition
+        return condition
+
+    def getConfigurationKey(self, configuration):
+        # ERV total adequate order: size, then Parikh vector, then Foata normal form
+        parikh = [0] * self.transitionCount
+        levels = dict()
+        for event in iterBits(configuration):
+            transIndex = self.eventTransitions[event]
+            parikh[transIndex] += 1
+            levels.setdefault(self.eventDepths[event], [0] * self.transitionCount)[transIndex] += 1
+        return parikh, levels
+
+    def getMarking(self, parikh):
+        marking = list(self.initialMarking)
+        for transIndex, count in enumerate(parikh):
+            if count:
+                for place in self.presets[transIndex]:
+                    marking[place] -= count
+                for place in self.postsets[transIndex]:
+                    marking[place] += count
+        return tuple(marking)
+
+    def pushExtension(self, transIndex, preset):
+        identity = (transIndex, preset)
+        if identity in self.seenExtensions:
+            return
+        self.seenExtensions.add(identity)
+
+        past = 0
+        depth = 1
+        for condition in preset:
+            event = self.conditionEvents[condition]
+            if event >= 0:
+                past |= self.eventConfigurations[event]
+                depth = max(depth, self.eventDepths[event] + 1)
+        parikh, levels = self.getConfigurationKey(past)
+        parikh[transIndex] += 1
+        levels.setdefault(depth, [0] * self.transitionCount)[transIndex] += 1
+        key = (bin(past).count("1") + 1, tuple(parikh), tuple(tuple(levels[level]) for level in sorted(levels)))
+        heapq.heappush(self.extensionQueue, (key, transIndex, preset, past, depth, tuple(parikh)))
+
+    def findExtensions(self, condition):
+        # possible extensions which use the new condition, the other preset conditions have to be pairwise concurrent
+        place = self.conditionPlaces[condition]
+        for transIndex in self.consumers[place]:
+            otherPlaces = [p for p in self.presets[transIndex] if p != place]
+
+            def search(index, chosen, candidates):
+                if index == len(otherPlaces):
+                    self.pushExtension(transIndex, tuple(sorted(chosen)))
+                    return
+                for other in iterBits(candidates & self.placeConditions[otherPlaces[index]]):
+                    search(index + 1, chosen + [other], candidates & self.conditionCo[other])
+
+            search(0, [condition], self.conditionCo[condition] & self.usableConditions)
+
+    def build(self):
+        start = time.perf_counter()
+
+        initialConditions = 0
+        for place, tokens in enumerate(self.initialMarking):
+            if tokens:
+                initialConditions |= 1 << self.addCondition(place, -1, 0, True)
+        for condition in iterBits(initialConditions):
+            self.conditionCo[condition] = initialConditions & ~(1 << condition)
+        self.markingEvents[self.initialMarking] = -1
+        for condition in iterBits(initialConditions):
+            self.findExtensions(condition)
+
+        while self.extensionQueue:
+            if self.maxEvents is not None and self.getEventCount() >= self.maxEvents:
+                self.buildTime = time.perf_counter() - start
+                return self
+            key, transIndex, preset, past, depth, parikh = heapq.heappop(self.extensionQueue)
+            self.addEvent(transIndex, preset, past, depth, parikh)
+
+        self.isComplete = True
+        self.buildTime = time.perf_counter() - start
+        return self
+
+    def addEvent(self, transIndex, preset, past, depth, parikh):
+        event = len(self.eventTransitions)
+        marking = self.getMarking(parikh)
+        # events are added in increasing adequate order, so an earlier event with the same marking is smaller
+        isCutoff = marking in self.markingEvents
+
+        co = -1
+        for condition in preset:
+            co &= self.conditionCo[condition]
+        co &= self.usableConditions
+        for place in self.postsets[transIndex]:
+            if co & self.placeConditions[place]:
+                raise NotSafeError(f"The net is not safe, place '{self.net.getPlaces()[place].getLabel()}' can hold more than one token")
+
+        self.eventTransitions.append(transIndex)
+        self.eventPresets.append(preset)
+        self.eventConfigurations.append(past | (1 << event))
+        self.eventDepths.append(depth)
+        self.eventMarkings.append(marking)
+
+        postset = []
+        for place in self.postsets[transIndex]:
+            postset.append(self.addCondition(place, event, co, not isCutoff))
+        self.eventPostsets.append(tuple(postset))
+
+        if isCutoff:
+            self.cutoffs |= 1 << event
+            self.cutoffCount += 1
+            return event
+
+        self.markingEvents[marking] = event
+        postsetMask = 0
+        for condition in postset:
+            postsetMask |= 1 << condition
+        for condition in postset:
+            self.conditionCo[condition] = co | (postsetMask & ~(1 << condition))
+        for condition in iterBits(co):
+            self.conditionCo[condition] |= postsetMask
+        for condition in postset:
+            self.findExtensions(condition)
+        return event
+
+    def getInitialCut(self):
+        initialCut = 0
+        for condition, event in enumerate(self.conditionEvents):
+            if event == -1:
+                initialCut |= 1 << condition
+        return initialCut
+
+    def getEventMasks(self):
+        eventPresetMasks = []
+        eventPostsetMasks = []
+        for event in range(self.getEventCount()):
+            presetMask = postsetMask = 0
+            for condition in self.eventPresets[event]:
+                presetMask |= 1 << condition
+            for condition in self.eventPostsets[event]:
+                postsetMask |= 1 << condition
+            eventPresetMasks.append(presetMask)
+            eventPostsetMasks.append(postsetMask)
+        return eventPresetMasks, eventPostsetMasks
+
+    def searchConfiguration(self, isGoal, canReachGoal):
+        # depth-first search over the configurations without cut-offs, events are decided one by one in their order
+        # (causes always have smaller numbers than their effects) and an event can only be added if its whole preset
+        # is in the current cut, canReachGoal prunes branches which can't lead to a goal anymore
+        eventPresetMasks, eventPostsetMasks = self.getEventMasks()
+        eventCount = self.getEventCount()
+        # conditions which are consumed and places which are marked by some event (not a cut-off) from the given event number on
+        consumable = [0] * (eventCount + 1)
+        producible = [0] * (eventCount + 1)
+        for event in range(eventCount - 1, -1, -1):
+            consumable[event] = consumable[event + 1]
+            producible[event] = producible[event + 1]
+            if not self.isCutoff(event):
+                consumable[event] |= eventPresetMasks[event]
+                for condition in self.eventPostsets[event]:
+                    producible[event] |= 1 << self.conditionPlaces[condition]
+
+        # (next event, cut, events of the configuration, presets of enabled events which were left out)
+        stack = [(0, self.getInitialCut(), [], ())]
+        while stack:
+            event, cut, events, leftOut = stack.pop()
+            if event == eventCount:
+                if isGoal(cut, leftOut):
+                    return events
+                continue
+            presetMask = eventPresetMasks[event]
+            if presetMask & cut != presetMask:
+                children = [(cut, events, leftOut)]
+            else:
+                children = [(cut, events, leftOut + (presetMask,))]
+                if not self.isCutoff(event):
+                    children.append(((cut & ~presetMask) | eventPostsetMasks[event], events + [event], leftOut))
+            for childCut, childEvents, childLeftOut in children:
+                if canReachGoal(childCut, childLeftOut, consumable[event + 1], producible[event + 1]):
+                    stack.append((event + 1, childCut, childEvents, childLeftOut))
+        return None
+
+    def getCutMarking(self, cut):
+        marking = [0] * self.placeCount
+        for condition in iterBits(cut):
+            marking[self.conditionPlaces[condition]] += 1
+        return tuple(marking)
+
+    def getFiringSequence(self, events):
+        return [self.net.getTransitions()[self.eventTransitions[event]].getLabel() for event in events]
+
+    def findDeadlock(self):
+        # returns a firing sequence leading to a dead marking, or None if the net is deadlock free,
+        # the prefix is complete, so a marking is dead exactly when no event of the prefix is enabled in its cut,
+        # every enabled event which was left out has to be disabled by a later event which consumes from its preset
+        if any(not preset for preset in self.presets):
+            return None
+
+        def isGoal(cut, leftOut):
+            return all(presetMask & cut != presetMask for presetMask in leftOut)
+
+        def canReachGoal(cut, leftOut, consumable, producible):
+            return all(presetMask & cut != presetMask or presetMask & consumable for presetMask in leftOut)
+
+        events = self.searchConfiguration(isGoal, canReachGoal)
+        return None if events is None else self.getFiringSequence(events)
+
+    def findMarking(self, marking):
+        # returns a firing sequence reaching the marking, or None if it isn't reachable,
+        # conditions of places which are unmarked in the marking have to be consumed by some later event
+        # and places which are marked in it need a condition in the cut or some later event which marks them
+        marking = tuple(marking)
+        if marking in self.markingEvents:
+            event = self.markingEvents[marking]
+            if event == -1:
+                return []
+            return self.getFiringSequence(list(iterBits(self.eventConfigurations[event])))
+
+        unmarkedConditions = 0
+        placeConditions = [0] * self.placeCount
+        for condition, place in enumerate(self.conditionPlaces):
+            placeConditions[place] |= 1 << condition
+            if not marking[place]:
+                unmarkedConditions |= 1 << condition
+        markedPlaces = [place for place in range(self.placeCount) if marking[place]]
+
+        def isGoal(cut, leftOut):
+            return self.getCutMarking(cut) == marking
+
+        def canReachGoal(cut, leftOut, consumable, producible):
+            if cut & unmarkedConditions & ~consumable:
+                return False
+            return all(cut & placeConditions[place] or producible >> place & 1 for place in markedPlaces)
+
+        events = self.searchConfiguration(isGoal, canReachGoal)
+        return None if events is None else self.getFiringSequence(events)
+
+
+def buildUnfolding(petri_net, maxEvents=None):
+    return Unfolding(petri_net, maxEvents).build()
@@ -1,854 +1,486 @@
 # PetriNetParser
 
 # you should have pip installed by default with Python, if not, use google
-# then, make sure you have the 'numpy', 'networkx' and 'pyvis' packages installed as they are required
-# cmd: pip install numpy; pip install networkx; pip install pyvis
+# then, make sure you have the 'numpy' and 'pyvis' packages installed as they are required
+# cmd: pip install numpy; pip install pyvis
+# 'networkx' is optional, it is only used when exporting graphs through StateGraph.toNetworkx
+
+# usage:
+#   petrinetparser.py FILE                    interactive mode (same as drag n' drop of the file onto the script)
+#   petrinetparser.py SUBCOMMAND FILE [...]   non-interactive mode, see petrinetparser.py --help
+# heavy packages (numpy, pyvis, networkx) are only imported when the chosen subcommand needs them
 
 
 # default packages
-import xml.etree.ElementTree as et
+import argparse
 import sys
 import os.path
 
-
-# custom packages
-try:
-    import numpy as np
-    import networkx as nx
-    from pyvis import network as pvnet
-except ModuleNotFoundError as err:
-    print("One or more packages could not be loaded.")
-    print("List of all required packages: numpy, networkx, pyvis")
-    input("Press ENTER to exit...")
-    sys.exit(-1)
-
-from petrimodules import petrigraph
+from petrimodules import petrinet
 
 
 # global stuff
-CONST_OMEGA_CHAR = "ω"
-NODECOLOR_FIRST = "#7FFF8C"
-NODECOLOR_GENERIC = "#8CCFFF"
-NODECOLOR_LAST = "#FFC97F"
+SUBCOMMANDS = ["matrices", "reachability", "coverability", "all", "simulate", "ctmc", "unfold", "reduce", "bitstate", "symmetry", "batch", "serve"]
+DEFAULT_SCREEN_W = 1920
+DEFAULT_SCREEN_H = 1080
 
 
 # functions
-def getPyvisOptions():
-    opts = '''
-        var options = {
-          "physics": {
-            "enabled": false
-          },
-          "interaction": {
-            "dragNodes": true,
-            "hideEdgesOnDrag": false,
-            "hideNodesOnDrag": false
-        },
-        "edges": {
-            "smooth": {
-                "enabled": true,
-                "type": "continuous"
-            }
-        }
-        }
-    '''
-    return opts
-
-
 def calcGraphResolution():
     # screen resolution (for html graph size)
     scrw_in = input("Your screen width (leave empty for default 1920): ")
     scrh_in = input("Your screen height (leave empty for default 1080): ")
-    SCR_W = 1920 if scrw_in == "" else int(scrw_in)
-    SCR_H = 1080 if scrh_in == "" else int(scrh_in)
+    SCR_W = DEFAULT_SCREEN_W if scrw_in == "" else int(scrw_in)
+    SCR_H = DEFAULT_SCREEN_H if scrh_in == "" else int(scrh_in)
     print(f"Screen resolution: {SCR_W}x{SCR_H}\n")
-    return SCR_W * 0.9875, SCR_H * 0.82
+    return SCR_W, SCR_H
 
 
-# classes
-class Place:
-    def __init__(self, id, label, tokens=0, static=False):
-        self.id = id
-        self.label = label
-        self.tokens = tokens
-        self.static = static
+def getGraphResolution(screenWidth, screenHeight):
+    return screenWidth * 0.9875, screenHeight * 0.82
 
-    def getId(self):
-        return self.id
 
-    def getLabel(self):
-        return self.label
+def applyOrdering(petri_net, sortPatternPlaces, sortPatternTransitions):
+    # empty (or missing) pattern means alphabetical order
+    if not sortPatternPlaces:
+        print("Sorting places alphabetically")
+        petri_net.sortPlaces()
+    else:
+        petri_net.sortPlacesByPattern(sortPatternPlaces)
 
-    def getTokens(self):
-        return self.tokens
+    if not sortPatternTransitions:
+        print("Sorting transitions alphabetically")
+        petri_net.sortTransitions()
+    else:
+        petri_net.sortTransitionsByPattern(sortPatternTransitions)
 
-    def isStatic(self):
-        return self.static
+    print("\nCurrent places/transitions order")
+    petri_net.printCurrentPlaceOrder()
+    petri_net.printCurrentTransitionOrder()
 
 
-class Transition:
-    def __init__(self, id, label):
-        self.id = id
-        self.label = label
+def runMatrices(petri_net):
+    petri_net.printMatrices()
 
-    def getId(self):
-        return self.id
+    # transition presets/postsets
+    petri_net.printAllTransitionsPresets()
+    petri_net.printAllTransitionsPostsets()
 
-    def getLabel(self):
-        return self.label
 
+def runReachability(petri_net, formats, width, height, outputDir):
+    from petrimodules import builders
 
-class Arc:
-    def __init__(self, id, sourceId, destinationId, multiplicity=1):
-        self.id = id
-        self.sourceId = sourceId
-        self.destinationId = destinationId
-        self.multiplicity = multiplicity
-        self.source = None
-        self.destination = None
-
-    def getId(self):
-        return self.id
-
-    def getSourceId(self):
-        return self.sourceId
-
-    def getDestinationId(self):
-        return self.destinationId
-
-    def getMultiplicity(self):
-        return self.multiplicity
-
-
-class Net:
-    def __init__(self):
-        self.places = []
-        self.transitions = []
-        self.arcs = []
-        self.inputMatrix = None
-        self.outputMatrix = None
-        self.incidenceMatrix = None
-
-    def addPlace(self, place):
-        self.places.append(place)
-
-    def addTransition(self, transition):
-        self.transitions.append(transition)
-
-    def setPlaces(self, places):
-        self.places = places
-
-    def setTransitions(self, transitions):
-        self.transitions = transitions
-
-    def addArc(self, arc):
-        self.arcs.append(arc)
-
-    def getPlaces(self):
-        return self.places
-
-    def getTransitions(self):
-        return self.transitions
-
-    def getArcs(self):
-        return self.arcs
-
-    def getPlaceById(self, id):
-        for obj in self.getPlaces():
-            if obj.getId() == id:
-                return obj
-        return None
-
-    def getTransitionById(self, id):
-        for obj in self.getTransitions():
-            if obj.getId() == id:
-                return obj
-        return None
-
-    def getPlaceByLabel(self, label):
-        for obj in self.getPlaces():
-            if obj.getLabel() == label:
-                return obj
-        return None
-
-    def getTransitionByLabel(self, label):
-        for obj in self.getTransitions():
-            if obj.getLabel() == label:
-                return obj
-        return None
-
-    def sortObjectsByLabel(self, arr):
-        n = len(arr)
-        for i in range(n - 1):
-            for j in range(0, n - i - 1):
-                if arr[j].getLabel() > arr[j + 1].getLabel():
-                    arr[j], arr[j + 1] = arr[j + 1], arr[j]
-
-    # def sortObjectsByLabel(self, arr):
-    #     arr = sorted(arr, key=lambda item: item.getLabel(), reverse=True)
-
-    def sortPlacesByPattern(self, pattern):
-        newObjects = []
-        places = list(self.getPlaces()) # deep copy
-        for label in pattern.split(" "):
-            try:
-                newObjects.append(places.pop(places.index(self.getPlaceByLabel(label))))
-            except ValueError:
-                print("Invalid place label specified, not sorting!")
-                return
-        if len(self.getPlaces()) != len(newObjects):
-            print("New place count does not match the old one, not sorting!")
-        else:
-            self.setPlaces(newObjects)
-
-    def sortTransitionsByPattern(self, pattern):
-        newObjects = []
-        transitions = list(self.getTransitions()) # deep copy
-        for label in pattern.split(" "):
-            try:
-                newObjects.append(transitions.pop(transitions.index(self.getTransitionByLabel(label))))
-            except ValueError:
-                print("Invalid transition label specified, not sorting!")
-                return
-        if len(self.getTransitions()) != len(newObjects):
-            print("New transition count does not match the old one, not sorting!")
-        else:
-            self.setTransitions(newObjects)
-
-    def sortPlaces(self):
-        self.sortObjectsByLabel(self.places)
+    reach_petrigraph, reach_stategraph = builders.buildReachabilityGraph(petri_net)
 
-    def sortTransitions(self):
-        self.sortObjectsByLabel(self.transitions)
+    # if the graph is infinite, we cant create it, otherwise we can
+    if reach_stategraph is None:
+        print("\nReachability graph is infinite, can't plot.")
+        return
 
-    def printOrderedPlacesTransitions(self):
-        print("   ", end="")
-        for transition in self.getTransitions():
-            print(transition.getLabel(), end=" ")
-        print()
-        for place in self.getPlaces():
-            print(place.getLabel())
+    print("\nReachability graph analysis:")
+    petri_net.printGraphAnalysis(reach_stategraph, reach_petrigraph)
 
-    def printCurrentPlaceOrder(self):
-        print("Current place order: ", end="")
-        for place in self.getPlaces():
-            print(place.getLabel(), end=" ")
-        print()
+    if "html" in formats:
+        from petrimodules import plotting
+        plotting.plotReachabilityGraphs(petri_net, reach_petrigraph, reach_stategraph, width, height, outputDir)
 
-    def printCurrentTransitionOrder(self):
-        print("Current transition order: ", end="")
-        for transition in self.getTransitions():
-            print(transition.getLabel(), end=" ")
-        print()
+    from petrimodules import export
+    export.exportGraph(petri_net, reach_petrigraph, reach_stategraph, "reachability_graph", formats, outputDir)
 
-    def getGraphState(self):
-        graphState = []
-        for p in self.getPlaces():
-            graphState.append(p.getTokens())
-        return graphState
-
-    def isTransitionRunnableFromState(self, transition, graphState):
-        transitionIndex = self.getTransitions().index(transition)
-        inputColumn = self.inputMatrix[:, transitionIndex]
-        curGraphState = graphState
-
-        isRunnable = True
-        for i in range(len(curGraphState)):
-            available = int(curGraphState[i])
-            required = int(inputColumn[i])
-            if available < required:
-                isRunnable = False
-                break
-        return isRunnable
-
-    def isTransitionRunnableFromState_Omega(self, transition, graphState):
-        transitionIndex = self.getTransitions().index(transition)
-        inputColumn = self.inputMatrix[:, transitionIndex]
-        curGraphState = graphState
-
-        isRunnable = True
-        for i in range(len(curGraphState)):
-            available_char = curGraphState[i]
-            required = int(inputColumn[i])
-
-            # only check runnability if it isnt omega, if its omega it counts as always runnable
-            if available_char != CONST_OMEGA_CHAR:
-                available = int(curGraphState[i])
-                if available < required:
-                    isRunnable = False
-                    break
-        return isRunnable
-
-    def isState2GreaterThan1(self, state1, state2):
-        # returns True if state2 is greater, otherwise returns False
-        if state1 == state2:
-            return False
-        for i in range(len(state1)):
-            if state1[i] > state2[i]:
-                return False
-        return True
-
-    def isState2GreaterThan1_Omega(self, state1, state2):
-        # returns True if state2 is greater, otherwise returns False
-        if state1 == state2:
-            return False
-        for i in range(len(state1)):
-            s1 = state1[i]
-            s2 = state2[i]
-            # if they are not omegas, do regular check
-            # if s1 is omega and s2 is not, s1 has to be greater
-            # otherwise s2 has to be greater
-            if s1 != CONST_OMEGA_CHAR and s2 != CONST_OMEGA_CHAR and s1 > s2:
-                return False
-            if s1 == CONST_OMEGA_CHAR and s2 != CONST_OMEGA_CHAR:
-                return False
-        return True
-
-    def transformState2ToOmega(self, state1, state2):
-        for i in range(len(state1)):
-            s1 = state1[i]
-            s2 = state2[i]
-
-            if s1 != CONST_OMEGA_CHAR and s2 != CONST_OMEGA_CHAR and s2 > s1:
-                state2[i] = CONST_OMEGA_CHAR
-        return state2
-
-    def runTransition(self, transition, graphState):
-        transitionIndex = self.getTransitions().index(transition)
-        incidenceColumn = self.incidenceMatrix[:, transitionIndex]
-
-        newGraphState = list(graphState)
-        for place in self.getPlaces():
-            placeIndex = self.getPlaces().index(place)
-            newGraphState[placeIndex] += int(incidenceColumn[placeIndex])
-        return newGraphState
-
-    def runTransition_Omega(self, transition, graphState):
-        transitionIndex = self.getTransitions().index(transition)
-        incidenceColumn = self.incidenceMatrix[:, transitionIndex]
-
-        newGraphState = list(graphState)
-        for place in self.getPlaces():
-            placeIndex = self.getPlaces().index(place)
-            # only change tokens if we arent omega
-            if newGraphState[placeIndex] != CONST_OMEGA_CHAR:
-                newGraphState[placeIndex] += int(incidenceColumn[placeIndex])
-        return newGraphState
-
-    def getWorkflowStateFromState(self, state):
-        newState = []
-        for place in self.getPlaces():
-            placeIndex = self.getPlaces().index(place)
-            if not place.isStatic():
-                tokens = state[placeIndex]
-                finalTokens = "" if tokens == 1 else str(tokens)
-                text = f"{finalTokens}{place.getLabel()}"
-                if tokens > 0:
-                    newState.append(text)
-        return " + ".join(newState)
-
-    def createEdgeDictFromGraph(self, graph):
-        edgeDict = dict()
-        for edge in graph.edges(data=True):
-            edgeLabel = edge[2]["label"]
-            entryName = edge[0] + " " + edge[1]
-            if entryName not in edgeDict.keys():
-                edgeDict[entryName] = edgeLabel
-            else:
-                edgeDict[entryName] = edgeDict[entryName] + ", " + edgeLabel
-        return edgeDict
-
-    def updateMultiEdgesForPyvisgraph(self, graph):
-        edgeDict = dict()
-        for edge in graph.get_edges():
-            edgeLabel = edge["label"]
-            entryName = edge["from"] + " " + edge["to"]
-            if entryName not in edgeDict.keys():
-                edgeDict[entryName] = edgeLabel
-            else:
-                edgeDict[entryName] = edgeDict[entryName] + ", " + edgeLabel
-        # delete old edges, add new ones
-        graph.edges = []
-        for key, value in edgeDict.items():
-            nodeData = key.split(" ")
-            nodeFrom = nodeData[0]
-            nodeTo = nodeData[1]
-            edgeLabel = value
-            graph.add_edge(nodeFrom, nodeTo, label=edgeLabel, color="black", title=edgeLabel)
-
-    def printTransitionPreset(self, transition):
-        transitionIndex = self.getTransitions().index(transition)
-        inputColumn = self.inputMatrix[:, transitionIndex]
-
-        placeList = []
-        for place in self.getPlaces():
-            placeIndex = self.getPlaces().index(place)
-            if inputColumn[placeIndex] > 0:
-                placeList.append(place.getLabel())
-        print("•", transition.getLabel(), end=" = {", sep="")
-        print(", ".join(placeList), end="}\n")
-
-    def printTransitionPostset(self, transition):
-        transitionIndex = self.getTransitions().index(transition)
-        inputColumn = self.outputMatrix[:, transitionIndex]
-
-        placeList = []
-        for place in self.getPlaces():
-            placeIndex = self.getPlaces().index(place)
-            if inputColumn[placeIndex] > 0:
-                placeList.append(place.getLabel())
-        print(transition.getLabel(), "•", end=" = {", sep="")
-        print(", ".join(placeList), end="}\n")
-
-    def printAllTransitionsPresets(self):
-        print("\nTransitions presets:")
-        for t in self.getTransitions():
-            self.printTransitionPreset(t)
-
-    def printAllTransitionsPostsets(self):
-        print("\nTransitions postsets:")
-        for t in self.getTransitions():
-            self.printTransitionPostset(t)
-
-    def getLeafNodesFromGraph(self, graph):
-        nodesWithoutSuccessors = []
-        for node in graph.nodes():
-            successorCount = 0
-            for _ in graph.successors(node):
-                successorCount += 1
-            if successorCount == 0:
-                nodesWithoutSuccessors.append(node)
-        return nodesWithoutSuccessors
-
-    def getGraphStatesOccurenceCount(self, graph, petrigraph):
-        nodeStates = dict()
-        for node in graph.nodes():
-            nodeData = petrigraph.getNodeWithName(node)
-            nodeState = str(nodeData.state)
-            if nodeState not in nodeStates:
-                nodeStates[nodeState] = 1
-            else:
-                nodeStates[nodeState] += 1
-        return nodeStates
 
+def runCoverability(petri_net, formats, width, height, outputDir):
+    from petrimodules import builders
 
-# program
+    cover_petritree_old, cover_stategraph_old = builders.buildCoverabilityTreeOld(petri_net)
+    cover_petritree, cover_stategraph = builders.buildCoverabilityTree(petri_net)
+    nodeMergeDict = builders.getCoverabilityGraphNodeMerges(petri_net, cover_petritree_old)
 
-file = ""
+    if "html" in formats:
+        from petrimodules import plotting
+        plotting.plotCoverabilityTree(petri_net, cover_petritree, cover_stategraph, width, height, outputDir)
+        plotting.plotCoverabilityGraph(petri_net, cover_petritree_old, cover_stategraph_old, nodeMergeDict, width, height, outputDir)
 
-tArgs = sys.argv
-if len(tArgs) == 2:
-    file = tArgs[1]
-else:
-    input("Error: No input file provided. Press ENTER to exit...")
-    sys.exit(-1)
+    if any(fmt != "html" for fmt in formats):
+        from petrimodules import export
+        cover_petrigraph, cover_graph = builders.buildCoverabilityGraph(cover_petritree_old, cover_stategraph_old, nodeMergeDict)
+        export.exportGraph(petri_net, cover_petritree, cover_stategraph, "coverability_tree", formats, outputDir)
+        export.exportGraph(petri_net, cover_petrigraph, cover_graph, "coverability_graph", formats, outputDir)
 
-if os.path.exists(file) and os.path.isfile(file):
-    print("Parsing file:", file)
-    print()
-else:
-    input("Error: Can't load file. Press ENTER to exit...")
-    sys.exit(-1)
 
-PYVISGRAPH_W, PYVISGRAPH_H = calcGraphResolution()
+def runCtmc(petri_net, transientTimes, tolerance, maxIterations):
+    from petrimodules import builders
+    from petrimodules import ctmc
 
-tree = et.parse(file)
-root = tree.getroot()
+    states, reach_stategraph = builders.buildStateSpace(petri_net)
+    if reach_stategraph is None:
+        print("\nReachability graph is infinite, can't build the Markov chain.")
+        return
 
-# check if file is xml or pflow (pflow has data encapsulated in extra subnet block, otherwise it's identical to xml)
-isPflowFormat = root.find("subnet") is not None
+    chain = ctmc.CTMC(petri_net, states, reach_stategraph)
+    print(f"\nMarkov chain: {chain.stateCount} states, {len(chain.sources)} transitions")
 
-prefix = "subnet/" if isPflowFormat else ""
+    distribution, iterations, converged = chain.getSteadyState(tolerance, maxIterations)
+    status = "converged" if converged else "did NOT converge"
+    ctmc.printDistributionSummary(chain, distribution, f"Steady state ({status}, {iterations} Jacobi iterations):")
 
-# filling the net with data
-petri_net = Net()
+    for time in transientTimes:
+        ctmc.printDistributionSummary(chain, chain.getTransient(time), f"Transient distribution at time {time:g}:")
 
-for type_tag in root.findall(prefix + "place"):
-    id = type_tag.find('id').text
-    label = type_tag.find('label').text
-    tokens = int(type_tag.find('tokens').text)
-    static = True if type_tag.find('static').text == "true" else False
-    petri_net.addPlace(Place(id, label, tokens, static))
 
-for type_tag in root.findall(prefix + "transition"):
-    id = type_tag.find('id').text
-    label = type_tag.find('label').text
-    petri_net.addTransition(Transition(id, label))
+def runUnfold(petri_net, maxEvents, reachPattern, compare):
+    import time
+    from petrimodules import unfolding
 
-for type_tag in root.findall(prefix + "arc"):
-    id = type_tag.find('id').text
-    sourceId = type_tag.find('sourceId').text
-    destinationId = type_tag.find('destinationId').text
-    multiplicity = type_tag.find('multiplicity').text
-    petri_net.addArc(Arc(id, sourceId, destinationId, multiplicity))
+    try:
+        prefix = unfolding.buildUnfolding(petri_net, maxEvents)
+    except unfolding.NotSafeError as err:
+        print(f"\nCan't unfold the net: {err}")
+        return -1
 
+    completeness = "complete" if prefix.isComplete else "INCOMPLETE, event limit reached"
+    print(f"\nUnfolding prefix ({completeness}): {prefix.getEventCount()} events ({prefix.getCutoffCount()} cut-offs), "
+          f"{prefix.getConditionCount()} conditions, built in {prefix.buildTime:.4f}s")
+
+    if compare:
+        from petrimodules import builders
+        start = time.perf_counter()
+        reach_petrigraph, reach_stategraph = builders.buildReachabilityGraph(petri_net)
+        buildTime = time.perf_counter() - start
+        if reach_stategraph is None:
+            print(f"Reachability graph: infinite, detected in {buildTime:.4f}s")
+        else:
+            print(f"Reachability graph: {reach_stategraph.getNodeCount()} nodes, {reach_stategraph.getEdgeCount()} edges, built in {buildTime:.4f}s")
+
+    if not prefix.isComplete:
+        return 0
+
+    deadlock = prefix.findDeadlock()
+    print("Deadlock:", "none" if deadlock is None else "reachable by " + (" ".join(deadlock) or "the empty sequence"))
+
+    if reachPattern is not None:
+        labels = reachPattern.split()
+        marking = [1 if place.getLabel() in labels else 0 for place in petri_net.getPlaces()]
+        sequence = prefix.findMarking(marking)
+        print(f"Marking {{{', '.join(labels)}}}:", "not reachable" if sequence is None else "reachable by " + (" ".join(sequence) or "the empty sequence"))
+    return 0
+
+
+def runSymmetry(petri_net, maxStates, compare):
+    import time
+    from petrimodules import symmetry
+
+    net_symmetry = symmetry.findNetSymmetry(petri_net)
+    print(f"\nSymmetry group: {net_symmetry.getGroupSize()} automorphisms ({net_symmetry.placeGroupSize} on the places), found in {net_symmetry.buildTime:.4f}s")
+    if net_symmetry.placeGroupSize == 1:
+        print("Canonical form: none, the symmetry group is trivial on the places (every marking is its own representative)")
+    elif net_symmetry.componentFamilies is not None:
+        print("Canonical form: sorted components,", ", ".join(f"{len(blocks)} of {len(blocks[0])} places" for blocks in net_symmetry.componentFamilies))
+    else:
+        print("Canonical form: smallest image over the stabilizer chain")
+    places = petri_net.getPlaces()
+    transitions = petri_net.getTransitions()
+    for orbit in net_symmetry.getPlaceOrbits():
+        if len(orbit) > 1:
+            print("Place orbit:", " ".join(places[place].getLabel() for place in orbit))
+    for orbit in net_symmetry.getTransitionOrbits():
+        if len(orbit) > 1:
+            print("Transition orbit:", " ".join(transitions[transIndex].getLabel() for transIndex in orbit))
+
+    quotient = symmetry.buildQuotientGraph(petri_net, net_symmetry, maxStates)
+    if quotient.isInfinite:
+        print(f"\nQuotient graph: infinite, detected after {quotient.getRepresentativeCount()} orbit representatives in {quotient.buildTime:.4f}s")
+    else:
+        truncation = f", INCOMPLETE, state limit reached after expanding {quotient.expandedCount}" if quotient.isTruncated else ""
+        print(f"\nQuotient graph: {quotient.getRepresentativeCount()} orbit representatives, {quotient.graph.getEdgeCount()} edges, built in {quotient.buildTime:.4f}s{truncation}")
+        # with a truncated graph the counts and bounds only cover the explored part of the state space
+        partial = " (partial, found so far)" if quotient.isTruncated else ""
+        if quotient.isTruncated:
+            print(f"States of the full reachability graph: at least {quotient.getFullStateCount()}")
+        else:
+            print(f"States of the full reachability graph: {quotient.getFullStateCount()}")
+
+        deadlocks = quotient.getDeadlockOrbits()
+        print(f"Deadlock orbits{partial}: {len(deadlocks)} ({sum(quotient.orbitSizes[node] for node in deadlocks)} states)")
+        for node in deadlocks:
+            print("-", quotient.states[node])
+        for orbit, bound in quotient.getPlaceOrbitBounds():
+            print(f"Bound of {' '.join(places[place].getLabel() for place in orbit)}{partial}: {bound}")
+
+    if compare:
+        from petrimodules import builders
+        start = time.perf_counter()
+        reach_petrigraph, reach_stategraph = builders.buildReachabilityGraph(petri_net)
+        buildTime = time.perf_counter() - start
+        if reach_stategraph is None:
+            print(f"\nReachability graph: infinite, detected in {buildTime:.4f}s")
+        else:
+            print(f"\nReachability graph: {reach_stategraph.getNodeCount()} nodes, {reach_stategraph.getEdgeCount()} edges, "
+                  f"{len(reach_stategraph.getDeadlockNodes())} deadlocks, built in {buildTime:.4f}s")
+    return 0
 
-# sort places and transitions for proper matrix format
-petri_net.printCurrentPlaceOrder()
-sortPatternPlaces = input("New place sort order (leave empty to sort alphabetically): ")
-if sortPatternPlaces == "":
-    print("Sorting places alphabetically")
+
+def getStateSpaceSize(petri_net):
+    from petrimodules import builders
+
+    reach_petrigraph, reach_stategraph = builders.buildReachabilityGraph(petri_net)
+    if reach_stategraph is not None:
+        return "reachability graph", reach_stategraph.getNodeCount(), reach_stategraph.getEdgeCount()
+    cover_petritree, cover_stategraph = builders.buildCoverabilityTree(petri_net)
+    return "coverability tree", cover_stategraph.getNodeCount(), cover_stategraph.getEdgeCount()
+
+
+def runReduce(petri_net, sortPatternPlaces, sortPatternTransitions):
+    from petrimodules import reduction
+
+    net_reduction = reduction.reduceNet(petri_net)
+    net_reduction.printSummary()
+    reduced_net = net_reduction.net
+
+    applyOrdering(reduced_net, sortPatternPlaces, sortPatternTransitions)
     petri_net.sortPlaces()
-else:
-    petri_net.sortPlacesByPattern(sortPatternPlaces)
-petri_net.printCurrentPlaceOrder()
-
-print()
-petri_net.printCurrentTransitionOrder()
-sortPatternTransitions = input("New transition sort order (leave empty to sort alphabetically): ")
-if sortPatternTransitions == "":
-    print("Sorting transitions alphabetically")
     petri_net.sortTransitions()
-else:
-    petri_net.sortTransitionsByPattern(sortPatternTransitions)
-petri_net.printCurrentTransitionOrder()
-
-# order recap
-print("\nCurrent places/transitions order")
-petri_net.printCurrentPlaceOrder()
-petri_net.printCurrentTransitionOrder()
-
-#  setup matrices
-nRows = len(petri_net.getPlaces())
-nColumns = len(petri_net.getTransitions())
-
-inputMatrix = np.array([[0 for i in range(nColumns)] for j in range(nRows)])
-outputMatrix = np.array([[0 for i in range(nColumns)] for j in range(nRows)])
-
-# fill each matrix with the proper data
-for arc in petri_net.getArcs():
-    sourceId = arc.getSourceId()
-    destinationId = arc.getDestinationId()
-
-    source = None
-    destination = None
-
-    if (petri_net.getPlaceById(sourceId) is not None) and (petri_net.getTransitionById(destinationId) is not None):
-        source = petri_net.getPlaceById(sourceId)
-        destination = petri_net.getTransitionById(destinationId)
-    elif (petri_net.getTransitionById(sourceId) is not None) and (petri_net.getPlaceById(destinationId) is not None):
-        source = petri_net.getTransitionById(sourceId)
-        destination = petri_net.getPlaceById(destinationId)
-
-    sourceIdInNetList = None
-    destinationIdInNetList = None
-
-    if type(source) == Place:
-        sourceIdInNetList = petri_net.getPlaces().index(source)
-        destinationIdInNetList = petri_net.getTransitions().index(destination)
-        inputMatrix[sourceIdInNetList, destinationIdInNetList] = arc.getMultiplicity()
-
-    if type(source) == Transition:
-        sourceIdInNetList = petri_net.getTransitions().index(source)
-        destinationIdInNetList = petri_net.getPlaces().index(destination)
-        outputMatrix[destinationIdInNetList, sourceIdInNetList] = arc.getMultiplicity()
-
-# calculate incidence matrix
-incidenceMatrix = outputMatrix - inputMatrix
-
-# set matrices attributes for the net itself
-petri_net.inputMatrix = inputMatrix
-petri_net.outputMatrix = outputMatrix
-petri_net.incidenceMatrix = incidenceMatrix
-
-# print info
-print("\nInput matrix I:")
-print(petri_net.inputMatrix)
-
-print("\nOutput matrix O:")
-print(petri_net.outputMatrix)
-
-print("\nIncidence matrix C = O - I:")
-print(petri_net.incidenceMatrix)
-
-# transition presets/postsets
-petri_net.printAllTransitionsPresets()
-petri_net.printAllTransitionsPostsets()
-
-# REACHABILITY GRAPH
-# build reachability graph
-reach_nxgraph = nx.MultiDiGraph()
-reach_petrigraph = petrigraph.Graph()
-
-# add first node manually
-baseNode = reach_petrigraph.addNode(petri_net.getGraphState())
-reach_nxgraph.add_node(baseNode.getName())
-
-# variable to check whether or not the reachability graph is infinite
-isInfinite = False
-while True:
-    allChecked = True
-    for curNode in reach_petrigraph.nodes:
-        if not curNode.isChecked:
-            allChecked = False
-            break
-
-    # if all nodes are checked or graph is infinite, stop
-    if allChecked or isInfinite:
-        break
-
-    for curNode in reach_petrigraph.nodes:
-        if isInfinite:
-            break
-        if not curNode.isChecked:
-            for trans in petri_net.getTransitions():
-                if petri_net.isTransitionRunnableFromState(trans, curNode.state):
-                    newState = petri_net.runTransition(trans, curNode.state)
-
-                    curNodePredcessors = (curNode.getAllPredcessorNames() + [curNode.getName()])
-                    for cycleNode in reach_petrigraph.nodes:
-                        # only check predcessors
-                        if cycleNode.getName() in curNodePredcessors:
-                            if petri_net.isState2GreaterThan1(cycleNode.state, newState):
-                                isInfinite = True
-                                break
-                    if isInfinite:
-                        break
-
-                    newNode = None
-                    if reach_petrigraph.hasNodeWithState(newState):
-                        newNode = reach_petrigraph.getNodeWithState(newState)
-                        if newNode != curNode:
-                            newNode.mergePredcessorNodesFrom(curNode)
-                    else:
-                        newNode = reach_petrigraph.addNode(newState, curNode)
-
-                    reach_nxgraph.add_edge(curNode.getName(), newNode.getName(), label=trans.getLabel())
-            curNode.isChecked = True
-
-
-# if the graph is infinite, we cant create it, otherwise we can
-if not isInfinite:
-    print("\nPlotting Reachability Graphs...")
-
-    reach_pyvisgraph = pvnet.Network(directed=True, width=PYVISGRAPH_W, height=PYVISGRAPH_H, heading="Reachability graph")
-    reach_pyvisgraph_workflow = pvnet.Network(directed=True, width=PYVISGRAPH_W, height=PYVISGRAPH_H, heading="Reachability graph (Workflow)")
-    for node in reach_nxgraph.nodes():
-        nodeData = reach_petrigraph.getNodeWithName(node)
-        nodeName = nodeData.getName()
-        nodeLabel = nodeData.getGraphLabel()
-        nodeColor = NODECOLOR_FIRST if node == list(reach_nxgraph.nodes())[0] else NODECOLOR_GENERIC
-        nodeColor = NODECOLOR_LAST if node == list(reach_nxgraph.nodes())[-1] else nodeColor
-        reach_pyvisgraph.add_node(nodeName, label=nodeLabel, shape="box", color=nodeColor, title=nodeName)
-        # label for workflow graph (place names (but no static places), and no predcessors to reduce visual clutter)
-        # predcessors are still available upon mouse hover over node
-        nodeLabelWorkflow = nodeData.getGraphLabelCustom(petri_net.getWorkflowStateFromState(nodeData.state), "")
-        nodeTitleWorkflow = "Predcessors: " + " ".join(nodeData.getAllPredcessorNames())
-        reach_pyvisgraph_workflow.add_node(nodeName, label=nodeLabelWorkflow, shape="box", color=nodeColor, title=nodeTitleWorkflow)
-
-    for nodeData, edgeLabel in petri_net.createEdgeDictFromGraph(reach_nxgraph).items():
-        nodes = nodeData.split(" ")
-        reach_pyvisgraph.add_edge(nodes[0], nodes[1], label=edgeLabel, color="black", title=edgeLabel)
-        reach_pyvisgraph_workflow.add_edge(nodes[0], nodes[1], label=edgeLabel, color="black", title=edgeLabel)
-
-    filename_reachgraph = "reachability_graph.html"
-    print(f"Saving the result to '{filename_reachgraph}'")
-    reach_pyvisgraph.set_options(getPyvisOptions())
-    reach_pyvisgraph.save_graph(filename_reachgraph)
-
-    filename_reachgraph_workflow = "workflow_reachability_graph.html"
-    print(f"Saving the result to '{filename_reachgraph_workflow}'")
-    reach_pyvisgraph_workflow.set_options(getPyvisOptions())
-    reach_pyvisgraph_workflow.save_graph(filename_reachgraph_workflow)
-else:
-    print("\nReachability graph is infinite, can't plot.")
-
-''' --------------------------------------------------------------
-------------------------------------------------------------------
-------------------------------------------------------------------
-------------------------------------------------------------------
-------------------------------------------------------------------
--------------------------------------------------------------- '''
-
-# COVERABILITY TREE (old one, needed for coverability graph) (refactor this some day :P)
-# build coverability tree (old)
-cover_nxtree_old = nx.MultiDiGraph()
-cover_petritree_old = petrigraph.Graph()
-
-# add first node manually
-baseNode = cover_petritree_old.addNode(petri_net.getGraphState())
-baseNode.designationChar = "v"
-cover_nxtree_old.add_node(baseNode.getName())
-
-while True:
-    allChecked = True
-    for curNode in cover_petritree_old.nodes:
-        if not curNode.isChecked:
-            allChecked = False
-            break
-
-    # if all nodes are checked, stop
-    if allChecked:
-        break
-
-    for curNode in cover_petritree_old.nodes:
-        if not curNode.isChecked:
-            for trans in petri_net.getTransitions():
-                if petri_net.isTransitionRunnableFromState_Omega(trans, curNode.state):
-                    shouldSkip = False
-                    newState = petri_net.runTransition_Omega(trans, curNode.state)
-
-                    newNode = None
-                    if cover_petritree_old.hasNodeWithState(newState):
-                        newNode = cover_petritree_old.addNode(newState, curNode)
-                        newNode.isChecked = True
-                        shouldSkip = True
-                    else:
-                        newNode = cover_petritree_old.addNode(newState, curNode)
-
-                    newNode.designationChar = "v"
-
-                    if not shouldSkip:
-                        curNodePredcessors = (curNode.getAllPredcessorNames() + [curNode.getName()])
-                        for cycleNode in cover_petritree_old.nodes:
-                            # only check predcessors
-                            if cycleNode.getName() in curNodePredcessors:
-                                if petri_net.isState2GreaterThan1_Omega(cycleNode.state, newState):
-                                    newState = petri_net.transformState2ToOmega(cycleNode.state, newState)
-                                    # break # dont stop at first valid node, check all
-
-                    cover_nxtree_old.add_edge(curNode.getName(), newNode.getName(), label=trans.getLabel())
-            curNode.isChecked = True
-
-
-# new coverability tree
-
-# COVERABILITY TREE (new, good)
-# build coverability tree
-cover_nxtree = nx.MultiDiGraph()
-cover_petritree = petrigraph.Graph()
-
-# add first node manually
-baseNode = cover_petritree.addNode(petri_net.getGraphState())
-baseNode.designationChar = "v"
-cover_nxtree.add_node(baseNode.getName())
-
-while True:
-    allChecked = True
-    for curNode in cover_petritree.nodes:
-        if not curNode.isChecked:
-            allChecked = False
-            break
-
-    # if all nodes are checked, stop
-    if allChecked:
-        break
-
-    for curNode in cover_petritree.nodes:
-        if not curNode.isChecked:
-            for trans in petri_net.getTransitions():
-                if petri_net.isTransitionRunnableFromState_Omega(trans, curNode.state):
-                    shouldSkip = False
-                    newState = petri_net.runTransition_Omega(trans, curNode.state)
-
-                    newNode = cover_petritree.addNode(newState, curNode)
-                    newNode.designationChar = "v"
-
-                    newNodePredcessors = newNode.getAllPredcessorNames()
-                    for cycleNode in cover_petritree.nodes:
-                        if cycleNode.getName() in newNodePredcessors:
-                            if cycleNode.state == newNode.state:
-                                newNode.isChecked = True
-                                shouldSkip = True
-                                break
-
-                    if not shouldSkip:
-                        curNodePredcessors = (curNode.getAllPredcessorNames() + [curNode.getName()])
-                        for cycleNode in cover_petritree.nodes:
-                            # only check predcessors
-                            if cycleNode.getName() in curNodePredcessors:
-                                # print(f"Node {curNode.getName()} with state {curNode.state}, transition {trans.getLabel()}, comparing new state {newState} with cyclestate {cycleNode.state}")
-                                if petri_net.isState2GreaterThan1_Omega(cycleNode.state, newState):
-                                    newState = petri_net.transformState2ToOmega(cycleNode.state, newState)
-                                    # print(f"New state is greater, transforming to {newState}")
-                                    # break # dont stop at first valid node, check all
-                        newNode.state = newState
-
-                    cover_nxtree.add_edge(curNode.getName(), newNode.getName(), label=trans.getLabel())
-            curNode.isChecked = True
-
-
-print("\nPlotting Coverability Tree...")
-cover_pyvistree = pvnet.Network(directed=True, width=PYVISGRAPH_W, height=PYVISGRAPH_H, heading="Coverability tree")
-for node in cover_nxtree.nodes():
-    nodeData = cover_petritree.getNodeWithName(node)
-    nodeName = nodeData.getName()
-    nodeLabel = nodeData.getGraphLabel()
-    nodeColor = NODECOLOR_FIRST if node == list(cover_nxtree.nodes())[0] else NODECOLOR_GENERIC
-    nodeColor = NODECOLOR_LAST if node == list(cover_nxtree.nodes())[-1] else nodeColor
-    cover_pyvistree.add_node(nodeName, label=nodeLabel, shape="box", color=nodeColor, title=nodeName)
-
-for nodeData, edgeLabel in petri_net.createEdgeDictFromGraph(cover_nxtree).items():
-    nodes = nodeData.split(" ")
-    cover_pyvistree.add_edge(nodes[0], nodes[1], label=edgeLabel, color="black", title=edgeLabel)
-
-filename_covertree = "coverability_tree.html"
-print(f"Saving the result to '{filename_covertree}'")
-cover_pyvistree.set_options(getPyvisOptions())
-cover_pyvistree.save_graph(filename_covertree)
-
-
-# COVERABILITY GRAPH
-print("\nPlotting Coverability Graph...")
-cover_pyvisgraph = pvnet.Network(directed=True, width=PYVISGRAPH_W, height=PYVISGRAPH_H, heading="Coverability graph")
-for node in cover_nxtree_old.nodes():
-    nodeData = cover_petritree_old.getNodeWithName(node)
-    nodeName = nodeData.getName()
-    nodeLabel = nodeData.getGraphLabel()
-    nodeColor = NODECOLOR_FIRST if node == list(cover_nxtree_old.nodes())[0] else NODECOLOR_GENERIC
-    nodeColor = NODECOLOR_LAST if node == list(cover_nxtree_old.nodes())[-1] else nodeColor
-    cover_pyvisgraph.add_node(nodeName, label=nodeLabel, shape="box", color=nodeColor, title=nodeName)
-
-for nodeData, edgeLabel in petri_net.createEdgeDictFromGraph(cover_nxtree_old).items():
-    nodes = nodeData.split(" ")
-    cover_pyvisgraph.add_edge(nodes[0], nodes[1], label=edgeLabel, color="black", title=edgeLabel)
-
-# edit old coverability tree to make coverability graph
-nodeStates = petri_net.getGraphStatesOccurenceCount(cover_nxtree_old, cover_petritree_old)
-nodeMergeDict = dict()
-# for node in reversed(petri_net.getLeafNodesFromGraph(cover_nxtree_old)):
-for node in reversed(list(cover_nxtree_old.nodes())): # traverse all nodes, not just leaf nodes :P
-    nodeData = cover_petritree_old.getNodeWithName(node)
-    nodeState = str(nodeData.state)
-    # if there is more than 1 node with this state, we will merge them
-    if nodeState in nodeStates.keys() and nodeStates[nodeState] > 1:
-        # take this node and find the first node in graph with the same state
-        for cycleNode in cover_nxtree_old.nodes():
-            cycleNodeData = cover_petritree_old.getNodeWithName(cycleNode)
-            cycleNodeState = str(cycleNodeData.state)
-            # if we found a node with same state, but only if it isn't the same node (aka don't merge to itself)
-            # if it's the same node, break and move on without doing anything
-            if cycleNodeState == nodeState and cycleNode == node:
-                break
-            if cycleNodeState == nodeState:
-                nodeMergeDict[node] = cycleNode
-                break
-
-# reroute the edges from old nodes to new nodes
-nodesToRemove = []
-for oldNode, newNode in nodeMergeDict.items():
-    for edge in cover_pyvisgraph.get_edges():
-        nodeTo = edge["to"]
-        if oldNode == nodeTo:
-            edge["to"] = newNode
-            nodesToRemove.append(nodeTo)
-
-# remove the old nodes
-newNodes = []
-for node in cover_pyvisgraph.nodes:
-    if node["id"] not in nodesToRemove:
-        nodeLabel = node["label"].split("\n")[1]
-        nodeLabel = "\n"+nodeLabel+"\n"
-        node["label"] = nodeLabel
-        node["title"] = nodeLabel
-        newNodes.append(node)
-cover_pyvisgraph.nodes = newNodes
-
-petri_net.updateMultiEdgesForPyvisgraph(cover_pyvisgraph)
-
-filename_covergraph = "coverability_graph.html"
-print(f"Saving the result to '{filename_covergraph}'")
-cover_pyvisgraph.set_options(getPyvisOptions())
-cover_pyvisgraph.save_graph(filename_covergraph)
-
-input("\nFinished, press ENTER to exit...")
+    petri_net.buildMatrices()
+    reduced_net.buildMatrices()
+
+    originalKind, originalNodes, originalEdges = getStateSpaceSize(petri_net)
+    reducedKind, reducedNodes, reducedEdges = getStateSpaceSize(reduced_net)
+    print(f"\nOriginal net {originalKind}: {originalNodes} nodes, {originalEdges} edges")
+    print(f"Reduced net {reducedKind}: {reducedNodes} nodes, {reducedEdges} edges")
+    if originalKind == reducedKind:
+        print(f"State space shrank by {100 * (1 - reducedNodes / originalNodes):.1f}% ({originalNodes / reducedNodes:.2f}x fewer nodes)")
+    return 0
+
+
+def runBitstate(petri_net, args):
+    from petrimodules import bitstate
+
+    if args.iterative and args.max_depth is None:
+        # every search of an unbounded net is cut by its depth limit, so the limit would be doubled forever
+        print("Error: --iterative needs --max-depth")
+        return -1
+    search = bitstate.BitstateSearch(petri_net, args.hash_bits, args.hash_count, args.max_deadlocks, args.first_deadlock)
+    print(f"\nBitstate search: 2^{args.hash_bits} bits ({(1 << args.hash_bits) / 8 / 1024 / 1024:.1f} MiB), {args.hash_count} hash functions")
+    if args.iterative:
+        runs = search.iterativeDeepening(args.initial_depth, args.max_depth)
+    else:
+        runs = [search.search(args.max_depth)]
+    for run in runs:
+        bitstate.printBitstateRun(petri_net, run)
+    return 0
+
+
+def runInteractive(file):
+    # the original drag n' drop mode, asks for everything on the console
+    try:
+        import numpy
+        import pyvis
+    except ModuleNotFoundError as err:
+        print("One or more packages could not be loaded.")
+        print("List of all required packages: numpy, pyvis")
+        input("Press ENTER to exit...")
+        sys.exit(-1)
+
+    if os.path.exists(file) and os.path.isfile(file):
+        print("Parsing file:", file)
+        print()
+    else:
+        input("Error: Can't load file. Press ENTER to exit...")
+        sys.exit(-1)
+
+    width, height = getGraphResolution(*calcGraphResolution())
+
+    petri_net = petrinet.loadNet(file)
+
+    # sort places and transitions for proper matrix format
+    petri_net.printCurrentPlaceOrder()
+    sortPatternPlaces = input("New place sort order (leave empty to sort alphabetically): ")
+    if sortPatternPlaces == "":
+        print("Sorting places alphabetically")
+        petri_net.sortPlaces()
+    else:
+        petri_net.sortPlacesByPattern(sortPatternPlaces)
+    petri_net.printCurrentPlaceOrder()
+
+    print()
+    petri_net.printCurrentTransitionOrder()
+    sortPatternTransitions = input("New transition sort order (leave empty to sort alphabetically): ")
+    if sortPatternTransitions == "":
+        print("Sorting transitions alphabetically")
+        petri_net.sortTransitions()
+    else:
+        petri_net.sortTransitionsByPattern(sortPatternTransitions)
+    petri_net.printCurrentTransitionOrder()
+
+    # order recap
+    print("\nCurrent places/transitions order")
+    petri_net.printCurrentPlaceOrder()
+    petri_net.printCurrentTransitionOrder()
+
+    petri_net.buildMatrices()
+    runMatrices(petri_net)
+    runReachability(petri_net, ["html"], width, height, "")
+    runCoverability(petri_net, ["html"], width, height, "")
+
+    input("\nFinished, press ENTER to exit...")
+
+
+def createArgumentParser():
+    parser = argparse.ArgumentParser(prog="petrinetparser.py", description="Compute various Petri Net related things from PetriFlow (.xml/.pflow) files.")
+    subparsers = parser.add_subparsers(dest="command", metavar="SUBCOMMAND")
+
+    netParser = argparse.ArgumentParser(add_help=False)
+    netParser.add_argument("file", help="PetriFlow .xml or .pflow file")
+    netParser.add_argument("--place-order", default="", metavar="PATTERN", help="place order such as 'IN p1 p2 OUT' (default: alphabetical)")
+    netParser.add_argument("--transition-order", default="", metavar="PATTERN", help="transition order such as 't1 t2 t3' (default: alphabetical)")
+    netParser.add_argument("--reduce", action="store_true", help="apply behaviour preserving reduction rules before the analysis (orders then refer to the reduced labels)")
+
+    outputParser = argparse.ArgumentParser(add_help=False)
+    outputParser.add_argument("--format", nargs="+", default=["html"], choices=["html", "json", "dot", "graphml"], help="output formats (default: html)")
+    outputParser.add_argument("--output-dir", default=".", help="directory for the output files (default: current directory)")
+    outputParser.add_argument("--width", type=int, default=DEFAULT_SCREEN_W, help="screen width used for html graph size")
+    outputParser.add_argument("--height", type=int, default=DEFAULT_SCREEN_H, help="screen height used for html graph size")
+
+    subparsers.add_parser("matrices", parents=[netParser], help="input, output and incidence matrices, presets and postsets")
+    subparsers.add_parser("reachability", parents=[netParser, outputParser], help="reachability graph and its analysis")
+    subparsers.add_parser("coverability", parents=[netParser, outputParser], help="coverability tree and coverability graph")
+    subparsers.add_parser("all", parents=[netParser, outputParser], help="everything above")
+
+    simulateParser = subparsers.add_parser("simulate", parents=[netParser], help="Monte Carlo token game simulation of many runs at once")
+    simulateParser.add_argument("--runs", type=int, default=10000, help="number of independent runs (default: 10000)")
+    simulateParser.add_argument("--steps", type=int, default=1000, help="maximum number of firings per run (default: 1000)")
+    simulateParser.add_argument("--seed", type=int, default=None, help="random seed for reproducible results")
+    simulateParser.add_argument("--jobs", type=int, default=1, help="number of worker processes (default: 1)")
+    simulateParser.add_argument("--chunk-size", type=int, default=10000, help="runs simulated together in one chunk (default: 10000)")
+
+    ctmcParser = subparsers.add_parser("ctmc", parents=[netParser], help="stochastic Petri net analysis, steady state and transient distributions")
+    ctmcParser.add_argument("--transient", type=float, nargs="+", default=[], metavar="TIME", help="also compute the distribution at these times")
+    ctmcParser.add_argument("--tolerance", type=float, default=1e-10, help="convergence tolerance of the steady state solver (default: 1e-10)")
+    ctmcParser.add_argument("--max-iterations", type=int, default=1000000, help="Jacobi iteration limit of the steady state solver (default: 1000000)")
+
+    unfoldParser = subparsers.add_parser("unfold", parents=[netParser], help="complete finite prefix of the unfolding of a safe net")
+    unfoldParser.add_argument("--max-events", type=int, default=None, help="stop after this many events (the prefix is then incomplete)")
+    unfoldParser.add_argument("--reach", default=None, metavar="PLACES", help="check whether the marking with tokens exactly in these places (such as 'p1 p3') is reachable")
+    unfoldParser.add_argument("--no-compare", action="store_true", help="don't build the reachability graph for comparison")
+
+    subparsers.add_parser("reduce", parents=[netParser], help="apply the reduction rules and compare the state spaces of the original and reduced net")
+
+    bitstateParser = subparsers.add_parser("bitstate", parents=[netParser], help="approximate reachability search with a fixed size bit array (supertrace), for deadlock hunting in huge nets")
+    bitstateParser.add_argument("--hash-bits", type=int, default=27, metavar="BITS", help="the bit array has 2^BITS bits (default: 27, 16 MiB)")
+    bitstateParser.add_argument("--hash-count", type=int, default=3, help="number of hash functions (default: 3)")
+    bitstateParser.add_argument("--max-depth", type=int, default=None, help="depth limit of the search, or the last depth limit of iterative deepening (default: none, needed for unbounded nets)")
+    bitstateParser.add_argument("--iterative", action="store_true", help="iterative deepening, repeat the search with doubled depth limits up to --max-depth")
+    bitstateParser.add_argument("--initial-depth", type=int, default=16, help="first depth limit of iterative deepening (default: 16)")
+    bitstateParser.add_argument("--first-deadlock", action="store_true", help="stop as soon as a deadlock is found")
+    bitstateParser.add_argument("--max-deadlocks", type=int, default=10, help="number of deadlocks reported with their firing sequence (default: 10)")
+
+    symmetryParser = subparsers.add_parser("symmetry", parents=[netParser], help="reachability graph reduced by the symmetries of the net (replicated components)")
+    symmetryParser.add_argument("--max-states", type=int, default=None, help="stop after this many orbit representatives")
+    symmetryParser.add_argument("--no-compare", action="store_true", help="don't build the full reachability graph for comparison")
+
+    batchParser = subparsers.add_parser("batch", help="analyze many nets in parallel, results are written as JSON lines")
+    batchParser.add_argument("paths", nargs="+", help="directories (searched recursively for .xml/.pflow files) or glob patterns")
+    batchParser.add_argument("--jobs", type=int, default=None, help="number of worker processes (default: CPU count)")
+    batchParser.add_argument("--time-limit", type=float, default=60.0, metavar="SECONDS", help="time limit per net, 0 for none (default: 60)")
+    batchParser.add_argument("--memory-limit", type=int, default=1024, metavar="MB", help="memory limit per net, 0 for none (default: 1024)")
+    batchParser.add_argument("--output", default="-", help="JSON lines summary file (default: stdout)")
+
+    serveParser = subparsers.add_parser("serve", help="run a local HTTP/JSON analysis server with a result cache")
+    serveParser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    serveParser.add_argument("--port", type=int, default=8765, help="port to listen on (default: 8765)")
+    serveParser.add_argument("--jobs", type=int, default=None, help="number of worker processes (default: CPU count)")
+    serveParser.add_argument("--cache-size", type=int, default=256, metavar="MB", help="memory used for cached results (default: 256)")
+    return parser
+
+
+def runBatchCommand(args):
+    from petrimodules import batch
+
+    if args.output == "-":
+        batch.runBatch(args.paths, sys.stdout, args.jobs, args.time_limit, args.memory_limit)
+    else:
+        with open(args.output, "w", encoding="utf-8") as output:
+            batch.runBatch(args.paths, output, args.jobs, args.time_limit, args.memory_limit)
+    return 0
+
+
+def runCommand(args):
+    if not os.path.isfile(args.file):
+        print(f"Error: Can't load file '{args.file}'")
+        return -1
+
+    print("Parsing file:", args.file)
+    petri_net = petrinet.loadNet(args.file)
+    if args.command == "reduce":
+        return runReduce(petri_net, args.place_order, args.transition_order)
+    if args.reduce and args.command in ("simulate", "ctmc"):
+        # a fused series transition stands for two exponential delays in a row, which no single rate can express
+        print(f"Error: --reduce changes the timing of the net, it can't be used with '{args.command}'")
+        return -1
+    if args.reduce:
+        from petrimodules import reduction
+        net_reduction = reduction.reduceNet(petri_net)
+        net_reduction.printSummary()
+        petri_net = net_reduction.net
+    applyOrdering(petri_net, args.place_order, args.transition_order)
+    petri_net.buildMatrices()
+
+    if args.command in ("matrices", "all"):
+        runMatrices(petri_net)
+
+    if args.command == "simulate":
+        from petrimodules import simulation
+        # transitions are chosen with probabilities proportional to their rates
+        weights = [t.getRate() for t in petri_net.getTransitions()]
+        result = simulation.simulate(petri_net, args.runs, args.steps, args.seed, args.jobs, args.chunk_size, weights)
+        simulation.printSimulationResult(petri_net, result)
+
+    if args.command == "ctmc":
+        runCtmc(petri_net, args.transient, args.tolerance, args.max_iterations)
+
+    if args.command == "bitstate":
+        return runBitstate(petri_net, args)
+
+    if args.command == "symmetry":
+        return runSymmetry(petri_net, args.max_states, not args.no_compare)
+
+    if args.command == "unfold":
+        return runUnfold(petri_net, args.max_events, args.reach, not args.no_compare)
+
+    if args.command in ("reachability", "coverability", "all"):
+        os.makedirs(args.output_dir, exist_ok=True)
+        width, height = getGraphResolution(args.width, args.height)
+        if args.command in ("reachability", "all"):
+            runReachability(petri_net, args.format, width, height, args.output_dir)
+        if args.command in ("coverability", "all"):
+            runCoverability(petri_net, args.format, width, height, args.output_dir)
+    return 0
+
+
+def main(argv):
+    # a single file argument (drag n' drop) keeps the interactive mode
+    if len(argv) == 1 and argv[0] not in SUBCOMMANDS and not argv[0].startswith("-"):
+        runInteractive(argv[0])
+        return 0
+
+    parser = createArgumentParser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return -1
+
+    try:
+        if args.command == "batch":
+            return runBatchCommand(args)
+        if args.command == "serve":
+            from petrimodules import server
+            server.AnalysisServer(args.host, args.port, args.jobs, args.cache_size).run()
+            return 0
+        return runCommand(args)
+    except ModuleNotFoundError as err:
+        print(f"Package '{err.name}' could not be loaded, it is required for the '{args.command}' subcommand.")
+        return -1
+
+
+# program
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
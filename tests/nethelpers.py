@@ -0,0 +1,56 @@
+import random
+
+from petrimodules.petrinet import Arc, Net, Place, Transition
+
+
+def createNet(marking, transitions, rates=None):
+    # marking: {place: tokens}, transitions: {transition: ({place: weight}, {place: weight})}
+    net = Net()
+    for place, tokens in marking.items():
+        net.addPlace(Place(place, place, tokens))
+    arcCount = 0
+    for transition, (preset, postset) in transitions.items():
+        rate = 1.0 if rates is None else rates.get(transition, 1.0)
+        net.addTransition(Transition(transition, transition, rate))
+        for place, weight in preset.items():
+            net.addArc(Arc(f"a{arcCount}", place, transition, str(weight)))
+            arcCount += 1
+        for place, weight in postset.items():
+            net.addArc(Arc(f"a{arcCount}", transition, place, str(weight)))
+            arcCount += 1
+    net.sortPlaces()
+    net.sortTransitions()
+    net.buildMatrices()
+    return net
+
+
+def createRandomNet(rng, maxPlaces=5, maxTransitions=5, maxTokens=2, maxWeight=2):
+    places = [f"p{i}" for i in range(rng.randint(2, maxPlaces))]
+    marking = {place: rng.randint(0, maxTokens) for place in places}
+    transitions = dict()
+    for j in range(rng.randint(1, maxTransitions)):
+        preset, postset = dict(), dict()
+        for place in places:
+            r = rng.random()
+            if r < 0.3:
+                preset[place] = rng.randint(1, maxWeight)
+            elif r < 0.6:
+                postset[place] = rng.randint(1, maxWeight)
+        transitions[f"t{j}"] = (preset, postset)
+    return createNet(marking, transitions)
+
+
+def getRandomNets(seed, count, **kwargs):
+    rng = random.Random(seed)
+    return [createRandomNet(rng, **kwargs) for _ in range(count)]
+
+
+def fireSequence(net, labels):
+    # replays a firing sequence, returns None if some transition isn't enabled
+    state = net.getGraphState()
+    for label in labels:
+        transition = net.getTransitionByLabel(label)
+        if not net.isTransitionRunnableFromState(transition, state):
+            return None
+        state = net.runTransition(transition, state)
+    return state
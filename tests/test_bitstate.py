@@ -0,0 +1,103 @@
+import pytest
+
+from nethelpers import createNet, fireSequence, getRandomNets
+from petrimodules import bitstate
+from petrimodules import builders
+
+
+def createCounterNet():
+    # every firing adds a token, the n-th state is reached by n firings
+    return createNet({"p": 1, "count": 0}, {"t": ({"p": 1}, {"p": 1, "count": 1})})
+
+
+def createGridNet(size):
+    # two independent counters up to size, (size + 1)^2 states and one deadlock
+    return createNet({"x": size, "y": size, "doneX": 0, "doneY": 0},
+                     {"moveX": ({"x": 1}, {"doneX": 1}), "moveY": ({"y": 1}, {"doneY": 1})})
+
+
+def test_large_table_finds_every_state():
+    for net in getRandomNets(34, 300):
+        reach_petrigraph, reach_stategraph = builders.buildReachabilityGraph(net)
+        if reach_stategraph is None:
+            continue
+        run = bitstate.BitstateSearch(net, bits=20).search()
+        assert run.getStateCount() == reach_stategraph.getNodeCount()
+        assert run.deadlockCount == len(reach_stategraph.getDeadlockNodes())
+        assert not run.isTruncated
+        assert run.table.getOmissionProbability() < 1e-6
+        assert run.table.getEstimatedCoverage() > 0.999
+
+
+def test_deadlock_sequence_reaches_the_deadlock():
+    net = createGridNet(5)
+    run = bitstate.BitstateSearch(net, bits=16, stopAtDeadlock=True).search()
+    assert run.deadlockCount == 1
+    state, sequence = run.deadlocks[0]
+    assert sorted(sequence) == ["moveX"] * 5 + ["moveY"] * 5
+    assert list(fireSequence(net, sequence)) == state
+
+
+def test_tiny_table_estimates_its_losses():
+    net = createGridNet(30)
+    stateCount = 31 * 31
+    run = bitstate.BitstateSearch(net, bits=8, hashCount=2).search()
+    table = run.table
+    assert run.getStateCount() < stateCount
+    assert table.setBits <= table.size
+    assert 0.5 < table.getFillRatio() <= 1.0
+    assert table.getOmissionProbability() > 0.25
+    assert table.getHashFactor() < 100
+
+    # omitted states hide their successors too, so with real losses the estimate is above the real coverage,
+    # a larger table loses fewer states
+    estimates = []
+    for bits in (8, 10, 12):
+        run = bitstate.BitstateSearch(net, bits=bits, hashCount=2).search()
+        assert run.getStateCount() / stateCount <= run.table.getEstimatedCoverage() < 1.0
+        estimates.append(run.table.getEstimatedCoverage())
+    run = bitstate.BitstateSearch(net, bits=16, hashCount=2).search()
+    estimates.append(run.table.getEstimatedCoverage())
+    assert estimates == sorted(estimates)
+    assert estimates[0] < 0.9 and estimates[-1] > 0.999
+
+
+def test_depth_limit():
+    net = createCounterNet()
+    search = bitstate.BitstateSearch(net, bits=16)
+    for depthLimit in (1, 5, 17):
+        run = search.search(depthLimit)
+        assert run.isTruncated
+        assert run.maxDepthReached == depthLimit
+        assert run.getStateCount() == depthLimit + 1
+
+    # a bounded net which ends before the limit isn't truncated
+    run = bitstate.BitstateSearch(createGridNet(3), bits=16).search(6)
+    assert not run.isTruncated
+    assert run.maxDepthReached == 6
+    run = bitstate.BitstateSearch(createGridNet(3), bits=16).search(5)
+    assert run.isTruncated
+    assert run.deadlockCount == 0
+
+
+def test_iterative_deepening():
+    search = bitstate.BitstateSearch(createCounterNet(), bits=16)
+    runs = search.iterativeDeepening(4, 40)
+    assert [run.depthLimit for run in runs] == [4, 8, 16, 32, 40]
+    assert [run.maxDepthReached for run in runs] == [4, 8, 16, 32, 40]
+    assert all(run.isTruncated for run in runs)
+
+    # stops as soon as a search isn't cut by its limit
+    runs = bitstate.BitstateSearch(createGridNet(3), bits=16).iterativeDeepening(2, 100)
+    assert [run.depthLimit for run in runs] == [2, 4, 8]
+    assert runs[-1].deadlockCount == 1
+
+    # stops at the first deadlock if wanted
+    runs = bitstate.BitstateSearch(createGridNet(3), bits=16, stopAtDeadlock=True).iterativeDeepening(2, 100)
+    assert [run.depthLimit for run in runs] == [2, 4, 8]
+    assert runs[-1].deadlocks
+
+    with pytest.raises(ValueError):
+        search.iterativeDeepening(16, None)
+    with pytest.raises(ValueError):
+        search.iterativeDeepening(0, 10)
@@ -0,0 +1,112 @@
+import random
+
+from nethelpers import getRandomNets
+from petrimodules import builders
+from petrimodules import petrigraph
+from petrimodules import stategraph
+from petrimodules.petrinet import CONST_OMEGA_CHAR
+
+
+# reference builders, the same search as the graph builders but with the generic firing code of Net
+# and one ancestor at a time, as the builders were written before the batched ancestor checks
+
+def getStates(graph, names):
+    return [node.state for node in graph.nodes if node.getName() in names]
+
+
+def referenceReachabilityGraph(net):
+    edges = stategraph.StateGraphBuilder()
+    graph = petrigraph.Graph()
+    graph.addNode(net.getGraphState())
+    for curNode in graph.nodes:
+        for transIndex, trans in enumerate(net.getTransitions()):
+            if not net.isTransitionRunnableFromState(trans, curNode.state):
+                continue
+            newState = net.runTransition(trans, curNode.state)
+            ancestors = getStates(graph, curNode.getAllPredcessorNames() + [curNode.getName()])
+            if any(net.isState2GreaterThan1(state, newState) for state in ancestors):
+                curNode.isChecked = True
+                return graph, None
+            if graph.hasNodeWithState(newState):
+                newNode = graph.getNodeWithState(newState)
+                if newNode != curNode:
+                    newNode.mergePredcessorNodesFrom(curNode)
+            else:
+                newNode = graph.addNode(newState, curNode)
+            edges.addEdge(curNode.id, newNode.id, transIndex)
+        curNode.isChecked = True
+    return graph, edges.build(graph.nodeCount)
+
+
+def referenceCoverabilityTree(net, old):
+    # old: a node whose state is anywhere in the tree already is a leaf,
+    # otherwise: a node whose state is on its own path is a leaf
+    edges = stategraph.StateGraphBuilder()
+    tree = petrigraph.Graph()
+    tree.addNode(net.getGraphState()).designationChar = "v"
+    for curNode in tree.nodes:
+        if curNode.isChecked:
+            continue
+        for transIndex, trans in enumerate(net.getTransitions()):
+            if not net.isTransitionRunnableFromState_Omega(trans, curNode.state):
+                continue
+            newState = net.runTransition_Omega(trans, curNode.state)
+            isLeaf = tree.hasNodeWithState(newState) if old else False
+            newNode = tree.addNode(newState, curNode)
+            newNode.designationChar = "v"
+            if not old:
+                isLeaf = newState in getStates(tree, newNode.getAllPredcessorNames())
+            if isLeaf:
+                newNode.isChecked = True
+            else:
+                for state in getStates(tree, curNode.getAllPredcessorNames() + [curNode.getName()]):
+                    if net.isState2GreaterThan1_Omega(state, newState):
+                        newState = net.transformState2ToOmega(state, list(newState))
+                newNode.state = newState
+            edges.addEdge(curNode.id, newNode.id, transIndex)
+        curNode.isChecked = True
+    return tree, edges.build(tree.nodeCount)
+
+
+def dump(graph, edges):
+    nodes = [(node.getName(), list(node.state), node.getAllPredcessorNames(), node.isChecked) for node in graph.nodes]
+    return nodes, None if edges is None else list(edges.iterEdges())
+
+
+def test_builders_match_reference():
+    # at most 4 transitions and 1 token per place keep the coverability trees small
+    omegaCount = 0
+    for net in getRandomNets(35, 600, maxTransitions=4, maxTokens=1):
+        assert dump(*builders.buildReachabilityGraph(net)) == dump(*referenceReachabilityGraph(net))
+        tree = dump(*builders.buildCoverabilityTreeOld(net))
+        assert tree == dump(*referenceCoverabilityTree(net, True))
+        assert dump(*builders.buildCoverabilityTree(net)) == dump(*referenceCoverabilityTree(net, False))
+        omegaCount += any(CONST_OMEGA_CHAR in state for name, state, predcessors, isChecked in tree[0])
+    assert omegaCount > 100
+
+
+def test_ancestor_checks_match_net_methods():
+    net = getRandomNets(36, 1, maxPlaces=4)[0]
+    placeCount = len(net.getPlaces())
+    rng = random.Random(36)
+
+    def getState(omega):
+        return [CONST_OMEGA_CHAR if omega and rng.random() < 0.2 else rng.randint(0, 2) for _ in range(placeCount)]
+
+    for _ in range(2000):
+        omega = rng.random() < 0.5
+        states = [getState(omega) for _ in range(rng.randint(1, 6))]
+        block = builders.StateBlock(placeCount)
+        for nodeId, state in enumerate(states):
+            block.setState(nodeId, state)
+        ancestors = block.states[:len(states)]
+        state = getState(omega)
+
+        assert builders.hasEqualAncestor(ancestors, state) == (state in states)
+        if not omega:
+            assert builders.hasDominatedAncestor(ancestors, state) == any(net.isState2GreaterThan1(other, state) for other in states)
+        expected = list(state)
+        for other in states:
+            if net.isState2GreaterThan1_Omega(other, expected):
+                expected = net.transformState2ToOmega(other, list(expected))
+        assert builders.accelerateToOmega(ancestors, state) == expected
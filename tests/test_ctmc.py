@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from nethelpers import createNet, getRandomNets
+from petrimodules import builders
+from petrimodules import ctmc
+from petrimodules import petrinet
+
+
+def createChain(net):
+    states, graph = builders.buildStateSpace(net)
+    return ctmc.CTMC(net, states, graph)
+
+
+def test_state_space_matches_reachability_graph():
+    for net in getRandomNets(31, 300):
+        reach_petrigraph, reach_stategraph = builders.buildReachabilityGraph(net)
+        states, graph = builders.buildStateSpace(net)
+        assert (graph is None) == (reach_stategraph is None)
+        if graph is None:
+            continue
+        assert sorted(states) == sorted(node.state for node in reach_petrigraph.nodes)
+        edges = {(tuple(states[source]), tuple(states[target]), transIndex) for source, target, transIndex in graph.iterEdges()}
+        reachEdges = {(tuple(reach_petrigraph.nodes[source].state), tuple(reach_petrigraph.nodes[target].state), transIndex)
+                      for source, target, transIndex in reach_stategraph.iterEdges()}
+        assert edges == reachEdges
+
+
+def test_steady_state_of_finite_queue():
+    # M/M/1/K queue: pi_n is proportional to (arrival / service)^n
+    capacity, arrival, service = 6, 2.0, 3.0
+    net = createNet({"free": capacity, "queue": 0}, {"arrive": ({"free": 1}, {"queue": 1}), "serve": ({"queue": 1}, {"free": 1})},
+                    {"arrive": arrival, "serve": service})
+    chain = createChain(net)
+    weights = (arrival / service) ** np.arange(capacity + 1)
+    expected = weights / weights.sum()
+    queuePlace = [place.getLabel() for place in net.getPlaces()].index("queue")
+
+    for denseLimit in (500, 0):
+        distribution, iterations, converged = chain.getSteadyState(1e-12, 100000, denseLimit)
+        assert converged
+        byLength = np.bincount(chain.markings[:, queuePlace], weights=distribution)
+        assert np.allclose(byLength, expected, atol=1e-9)
+        assert np.isclose(chain.getThroughputs(distribution)[[t.getLabel() for t in net.getTransitions()].index("serve")],
+                          service * (1 - expected[0]))
+
+
+def test_steady_state_of_stiff_chain():
+    # two independent cycles with very different rates, every state has probability 1/4
+    net = createNet({"a": 1, "b": 0, "c": 1, "d": 0},
+                    {"slow1": ({"a": 1}, {"b": 1}), "slow2": ({"b": 1}, {"a": 1}), "fast1": ({"c": 1}, {"d": 1}), "fast2": ({"d": 1}, {"c": 1})},
+                    {"slow1": 1e-9, "slow2": 1e-9, "fast1": 1e3, "fast2": 1e3})
+    chain = createChain(net)
+    for denseLimit in (500, 0):
+        distribution, iterations, converged = chain.getSteadyState(1e-12, 100000, denseLimit)
+        assert converged
+        assert np.allclose(distribution, 0.25)
+
+
+def test_steady_state_of_reducible_chain():
+    # the token goes left with rate 1 and right with rate 3, both sides are closed classes
+    net = createNet({"start": 1, "left": 0, "right": 0, "back": 0},
+                    {"goLeft": ({"start": 1}, {"left": 1}), "goRight": ({"start": 1}, {"right": 1}),
+                     "loop1": ({"right": 1}, {"back": 1}), "loop2": ({"back": 1}, {"right": 1})},
+                    {"goLeft": 1.0, "goRight": 3.0, "loop1": 1.0, "loop2": 2.0})
+    chain = createChain(net)
+    labels = [place.getLabel() for place in net.getPlaces()]
+    for denseLimit in (500, 0):
+        distribution, iterations, converged = chain.getSteadyState(1e-12, 100000, denseLimit)
+        assert converged
+        expected = {"start": 0.0, "left": 0.25, "right": 0.75 * 2 / 3, "back": 0.75 / 3}
+        assert np.allclose(chain.getExpectedTokens(distribution), [expected[label] for label in labels])
+
+
+def test_iterative_solver_matches_direct_solver():
+    # closed tandem of three queues, the jump chain of a queue is periodic
+    capacity = 8
+    net = createNet({"free": capacity, "q1": 0, "q2": 0, "q3": 0},
+                    {"arrive": ({"free": 1}, {"q1": 1}), "serve1": ({"q1": 1}, {"q2": 1}),
+                     "serve2": ({"q2": 1}, {"q3": 1}), "serve3": ({"q3": 1}, {"free": 1})},
+                    {"arrive": 1.0, "serve1": 2.0, "serve2": 1.5, "serve3": 3.0})
+    chain = createChain(net)
+    direct, iterations, converged = chain.getSteadyState(1e-12, 100000, 500)
+    assert iterations == 0
+    distribution, iterations, converged = chain.getSteadyState(1e-12, 100000, 0)
+    assert converged and iterations > 0
+    assert np.allclose(distribution, direct, atol=1e-9)
+
+
+def test_invalid_rates_are_rejected(tmp_path):
+    for rate in ("0", "-1", "nan", "inf", "-inf"):
+        path = tmp_path / "net.xml"
+        path.write_text(f"""<?xml version="1.0" encoding="UTF-8"?>
+<document>
+<place><id>1</id><label>p</label><tokens>1</tokens><static>false</static></place>
+<transition><id>2</id><label>t</label><rate>{rate}</rate></transition>
+</document>
+""")
+        with pytest.raises(ValueError):
+            petrinet.loadNet(str(path))
+    path.write_text(path.read_text().replace("-inf", "0.5"))
+    assert petrinet.loadNet(str(path)).getTransitions()[0].getRate() == 0.5
@@ -0,0 +1,20 @@
+import re
+
+from nethelpers import createNet
+from petrimodules import builders
+from petrimodules import export
+
+
+def test_dot_labels_are_escaped(tmp_path):
+    label = 'say "hi" C:\\path\\'
+    net = createNet({"p": 1, "q": 0}, {label: ({"p": 1}, {"q": 1})})
+    reach_petrigraph, reach_stategraph = builders.buildReachabilityGraph(net)
+    path = tmp_path / "graph.dot"
+    export.writeDot(net, reach_petrigraph, reach_stategraph, str(path))
+    lines = path.read_text(encoding="utf-8").splitlines()
+
+    quoted = r'"(?:[^"\\]|\\.)*"'
+    edges = [line for line in lines if "->" in line]
+    assert edges == ['  "m0" -> "m1" [label="say \\"hi\\" C:\\\\path\\\\"];']
+    for line in lines[1:-1]:
+        assert re.fullmatch(rf'  {quoted}( -> {quoted})? \[(shape=box, )?label={quoted}\];', line)
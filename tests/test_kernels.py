@@ -0,0 +1,36 @@
+import pickle
+import random
+
+from nethelpers import createNet, getRandomNets
+from petrimodules.petrinet import CONST_OMEGA_CHAR
+
+
+def getGenericSuccessors(net, state, omega):
+    if omega:
+        return [(i, net.runTransition_Omega(t, state)) for i, t in enumerate(net.getTransitions()) if net.isTransitionRunnableFromState_Omega(t, state)]
+    return [(i, net.runTransition(t, state)) for i, t in enumerate(net.getTransitions()) if net.isTransitionRunnableFromState(t, state)]
+
+
+def test_kernels_match_generic_firing():
+    rng = random.Random(37)
+    for net in getRandomNets(37, 300, maxWeight=3):
+        placeCount = len(net.getPlaces())
+        for omega in (False, True):
+            successors = net.getSuccessorKernel(omega)
+            for _ in range(20):
+                state = [rng.randint(0, 4) for _ in range(placeCount)]
+                if omega:
+                    state = [CONST_OMEGA_CHAR if rng.random() < 0.25 else tokens for tokens in state]
+                assert successors(state) == getGenericSuccessors(net, state, omega)
+
+
+def test_kernels_follow_the_matrices():
+    net = createNet({"p0": 1, "p1": 0}, {"t0": ({"p0": 1}, {"p1": 1}), "t1": ({"p1": 1}, {"p0": 1})})
+    assert net.getSuccessorKernel()([1, 0]) == [(0, [0, 1])]
+    # a new order gives new matrices, the kernel has to be compiled again
+    net.sortTransitionsByPattern("t1 t0")
+    net.buildMatrices()
+    assert net.getSuccessorKernel()([1, 0]) == [(1, [0, 1])]
+
+    copy = pickle.loads(pickle.dumps(net))
+    assert copy.getSuccessorKernel()([0, 1]) == [(0, [1, 0])]
@@ -0,0 +1,48 @@
+from nethelpers import createNet, getRandomNets
+from petrimodules import builders
+from petrimodules import reduction
+
+
+def getBehaviour(net):
+    # (bounded, has a deadlock) of the net
+    reach_petrigraph, reach_stategraph = builders.buildReachabilityGraph(net)
+    if reach_stategraph is None:
+        return False, None
+    return True, len(reach_stategraph.getDeadlockNodes()) > 0
+
+
+def getReducedNet(net):
+    reduced_net = reduction.reduceNet(net).net
+    reduced_net.sortPlaces()
+    reduced_net.sortTransitions()
+    reduced_net.buildMatrices()
+    return reduced_net
+
+
+def test_consumer_without_outputs_is_not_fused():
+    # t1 keeps filling p and t2 only empties it, the net is unbounded and fusing them would give a bounded self loop
+    net = createNet({"a": 1, "p": 0}, {"t1": ({"a": 1}, {"a": 1, "p": 1}), "t2": ({"p": 1}, {})})
+    assert getBehaviour(net) == (False, None)
+    assert getBehaviour(getReducedNet(net)) == (False, None)
+
+
+def test_reduction_keeps_boundedness_and_deadlocks():
+    reduced = 0
+    for net in getRandomNets(33, 400, maxTokens=1):
+        reduced_net = getReducedNet(net)
+        bounded, deadlock = getBehaviour(net)
+        reducedBounded, reducedDeadlock = getBehaviour(reduced_net)
+        assert reducedBounded == bounded
+        if bounded:
+            assert reducedDeadlock == deadlock
+        if len(reduced_net.getTransitions()) < len(net.getTransitions()):
+            reduced += 1
+    assert reduced > 50
+
+
+def test_parallel_transitions_add_their_rates():
+    net = createNet({"a": 1, "b": 0}, {"t1": ({"a": 1}, {"b": 1}), "t2": ({"a": 1}, {"b": 1}), "back": ({"b": 1}, {"a": 1})},
+                    {"t1": 2.0, "t2": 3.0, "back": 1.0})
+    reduced_net = reduction.reduceNet(net).net
+    rates = {transition.getLabel(): transition.getRate() for transition in reduced_net.getTransitions()}
+    assert rates["t1|t2"] == 5.0
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from petrimodules import server
+
+
+NET = b"""<?xml version="1.0" encoding="UTF-8"?>
+<document>
+<place><id>1</id><label>free</label><tokens>2</tokens><static>false</static></place>
+<place><id>2</id><label>queue</label><tokens>0</tokens><static>false</static></place>
+<transition><id>3</id><label>arrive</label></transition>
+<transition><id>4</id><label>serve</label></transition>
+<arc><id>a0</id><sourceId>1</sourceId><destinationId>3</destinationId><multiplicity>1</multiplicity></arc>
+<arc><id>a1</id><sourceId>3</sourceId><destinationId>2</destinationId><multiplicity>1</multiplicity></arc>
+<arc><id>a2</id><sourceId>2</sourceId><destinationId>4</destinationId><multiplicity>1</multiplicity></arc>
+<arc><id>a3</id><sourceId>4</sourceId><destinationId>1</destinationId><multiplicity>1</multiplicity></arc>
+</document>
+"""
+
+
+def crashWorker(*args):
+    os._exit(1)
+
+
+@pytest.fixture
+def analysisServer():
+    analysisServer = server.AnalysisServer(jobs=1)
+    yield analysisServer
+    analysisServer.executor.shutdown(cancel_futures=True)
+
+
+def test_invalid_order_is_rejected(analysisServer):
+    for target in ("/analyze?placeOrder=queue%20nothing", "/analyze?placeOrder=queue", "/analyze?transitionOrder=serve%20serve"):
+        with pytest.raises(server.HttpError) as error:
+            asyncio.run(analysisServer.handleRequest("POST", target, NET))
+        assert error.value.status == 400
+    assert analysisServer.cache.getStats()["entries"] == 0
+
+    body, source = asyncio.run(analysisServer.handleRequest("POST", "/analyze?placeOrder=queue%20free&analyses=matrices", NET))
+    assert json.loads(body)["places"] == ["queue", "free"]
+
+
+def test_broken_worker_pool_is_replaced(analysisServer, monkeypatch):
+    monkeypatch.setattr(server, "computeAnalysis", crashWorker)
+    with pytest.raises(server.HttpError) as error:
+        asyncio.run(analysisServer.handleRequest("POST", "/analyze?analyses=matrices", NET))
+    assert error.value.status == 500
+
+    monkeypatch.undo()
+    body, source = asyncio.run(analysisServer.handleRequest("POST", "/analyze?analyses=matrices", NET))
+    assert source == "computed"
+    assert json.loads(body)["matrices"]["incidence"] == [[-1, 1], [1, -1]]
+
+
+def test_analyses_are_cached_one_by_one(analysisServer):
+    body, source = asyncio.run(analysisServer.handleRequest("POST", "/analyze?analyses=matrices", NET))
+    assert source == "computed"
+    assert list(json.loads(body)) == ["places", "transitions", "matrices", "times"]
+
+    # only the reachability graph is new
+    body, source = asyncio.run(analysisServer.handleRequest("POST", "/analyze?analyses=reachability,matrices", NET))
+    assert source == "computed"
+    data = json.loads(body)
+    assert list(data) == ["places", "transitions", "matrices", "reachability", "times"]
+    assert len(data["reachability"]["nodes"]) == 3
+    assert list(data["times"]) == ["reachability"]
+    stats = analysisServer.cache.getStats()
+    assert (stats["entries"], stats["hits"], stats["misses"], analysisServer.computations) == (2, 1, 2, 2)
+
+    body, source = asyncio.run(analysisServer.handleRequest("POST", "/analyze?analyses=reachability", NET))
+    assert source == "cached"
+    assert json.loads(body)["reachability"] == data["reachability"]
+
+    # another order is another result
+    body, source = asyncio.run(analysisServer.handleRequest("POST", "/analyze?analyses=reachability&placeOrder=queue%20free", NET))
+    assert source == "computed"
+
+    with pytest.raises(server.HttpError) as error:
+        asyncio.run(analysisServer.handleRequest("POST", "/analyze?analyses=,", NET))
+    assert error.value.status == 400
+
+
+def test_coalesced_requests_are_not_misses(analysisServer):
+    async def sendRequests():
+        return await asyncio.gather(*[analysisServer.handleRequest("POST", "/analyze?analyses=matrices,coverability", NET) for i in range(3)])
+
+    results = asyncio.run(sendRequests())
+    assert sorted(source for body, source in results) == ["coalesced", "coalesced", "computed"]
+    assert len({body for body, source in results}) == 1
+    stats = analysisServer.cache.getStats()
+    assert (stats["hits"], stats["misses"], analysisServer.computations, analysisServer.coalesced) == (0, 2, 2, 4)
@@ -0,0 +1,74 @@
+import numpy as np
+
+from nethelpers import createNet
+from petrimodules import simulation
+
+
+def createChoiceNet():
+    # one token which is moved back and forth by one of two competing transitions
+    return createNet({"a": 1, "b": 0}, {"first": ({"a": 1}, {"b": 1}), "second": ({"a": 1}, {"b": 1}), "back": ({"b": 1}, {"a": 1})})
+
+
+def test_weighted_choice_frequencies():
+    # ties of underflowing keys would pick the first transition, the second one has the larger rate
+    net = createChoiceNet()
+    transitions = [transition.getLabel() for transition in net.getTransitions()]
+    for firstRate, secondRate in ((1.0, 3.0), (1e-5, 1e-3), (1e-32, 1e-30)):
+        rates = {"first": firstRate, "second": secondRate, "back": 1.0}
+        weights = [rates[label] for label in transitions]
+        result = simulation.simulate(net, runs=20000, steps=2, seed=7, weights=weights)
+        first = result.firingCounts[transitions.index("first")]
+        second = result.firingCounts[transitions.index("second")]
+        assert first + second == 20000
+        assert abs(second / 20000 - secondRate / (firstRate + secondRate)) < 0.01
+
+
+def test_uniform_choice_frequencies():
+    net = createChoiceNet()
+    transitions = [transition.getLabel() for transition in net.getTransitions()]
+    result = simulation.simulate(net, runs=20000, steps=1, seed=3)
+    assert abs(result.firingCounts[transitions.index("first")] / 20000 - 0.5) < 0.01
+
+
+def test_deadlock_on_the_last_step():
+    # a one-shot net is dead right after its only firing
+    net = createNet({"a": 1, "b": 0}, {"t": ({"a": 1}, {"b": 1})})
+    for steps in (1, 2, 10):
+        result = simulation.simulate(net, runs=100, steps=steps, seed=1)
+        assert result.getDeadlockFrequency() == 1.0
+        assert result.getMeanDeadlockStep() == 1.0
+    result = simulation.simulate(net, runs=100, steps=0, seed=1)
+    assert result.getDeadlockFrequency() == 0.0
+
+    dead = createNet({"a": 0, "b": 0}, {"t": ({"a": 1}, {"b": 1})})
+    result = simulation.simulate(dead, runs=100, steps=5, seed=1)
+    assert result.getDeadlockFrequency() == 1.0
+    assert result.getMeanDeadlockStep() == 0.0
+
+
+def test_bookkeeping():
+    net = createChoiceNet()
+    result = simulation.simulate(net, runs=250, steps=40, seed=5, chunkSize=100)
+    assert result.runs == 250
+    assert result.steps == 40
+    # the initial marking and one sample after every step
+    assert result.samples == 250 * 41
+    assert result.firingCounts.sum() == 250 * 40
+    assert result.getDeadlockFrequency() == 0.0
+    assert np.allclose(result.getPlaceMeans(), [0.5, 0.5], atol=0.02)
+    assert result.placeMax.tolist() == [1, 1]
+
+    # deadlocked runs keep sampling their final marking
+    oneShot = createNet({"a": 1, "b": 0}, {"t": ({"a": 1}, {"b": 1})})
+    result = simulation.simulate(oneShot, runs=10, steps=5, seed=1)
+    assert result.samples == 10 * 6
+    assert result.firingCounts.tolist() == [10]
+    assert np.allclose(result.getPlaceMeans(), [1 / 6, 5 / 6])
+
+
+def test_same_result_for_any_number_of_jobs():
+    net = createChoiceNet()
+    single = simulation.simulate(net, runs=300, steps=20, seed=11, chunkSize=100)
+    parallel = simulation.simulate(net, runs=300, steps=20, seed=11, chunkSize=100, jobs=2)
+    assert single.firingCounts.tolist() == parallel.firingCounts.tolist()
+    assert np.array_equal(single.placeSum, parallel.placeSum)
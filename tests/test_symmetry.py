@@ -0,0 +1,129 @@
+from nethelpers import createNet
+from petrimodules import builders
+from petrimodules import symmetry
+
+
+def createMutexNet(processes):
+    # every process asks for the lock, works in its critical section and gives the lock back
+    marking = {"lock": 1}
+    transitions = dict()
+    for i in range(processes):
+        marking.update({f"idle{i}": 1, f"wait{i}": 0, f"crit{i}": 0})
+        transitions[f"ask{i}"] = ({f"idle{i}": 1}, {f"wait{i}": 1})
+        transitions[f"enter{i}"] = ({f"wait{i}": 1, "lock": 1}, {f"crit{i}": 1})
+        transitions[f"leave{i}"] = ({f"crit{i}": 1}, {f"idle{i}": 1, "lock": 1})
+    return createNet(marking, transitions)
+
+
+def test_quotient_matches_reachability_graph():
+    net = createMutexNet(6)
+    reach_petrigraph, reach_stategraph = builders.buildReachabilityGraph(net)
+    net_symmetry = symmetry.findNetSymmetry(net)
+    assert net_symmetry.getGroupSize() == 720
+    quotient = symmetry.buildQuotientGraph(net, net_symmetry)
+    assert not quotient.isTruncated
+    assert quotient.getFullStateCount() == reach_stategraph.getNodeCount()
+    assert quotient.getDeadlockOrbits() == []
+
+    # a limit equal to the number of representatives doesn't cut anything
+    limited = symmetry.buildQuotientGraph(net, net_symmetry, quotient.getRepresentativeCount())
+    assert not limited.isTruncated
+    assert limited.getFullStateCount() == reach_stategraph.getNodeCount()
+
+
+def test_truncated_quotient_has_no_false_deadlocks():
+    net = createMutexNet(6)
+    reach_petrigraph, reach_stategraph = builders.buildReachabilityGraph(net)
+    for maxStates in range(1, 8):
+        quotient = symmetry.buildQuotientGraph(net, symmetry.findNetSymmetry(net), maxStates)
+        assert quotient.isTruncated
+        assert quotient.getRepresentativeCount() <= maxStates
+        assert quotient.getDeadlockOrbits() == []
+        assert quotient.getFullStateCount() < reach_stategraph.getNodeCount()
+
+
+def createRingNet(processes):
+    # dining philosophers, only the rotations of the ring are automorphisms
+    marking = dict()
+    transitions = dict()
+    for i in range(processes):
+        marking.update({f"fork{i}": 1, f"think{i}": 1, f"hasLeft{i}": 0, f"eat{i}": 0})
+        right = f"fork{(i + 1) % processes}"
+        transitions[f"takeLeft{i}"] = ({f"think{i}": 1, f"fork{i}": 1}, {f"hasLeft{i}": 1})
+        transitions[f"takeRight{i}"] = ({f"hasLeft{i}": 1, right: 1}, {f"eat{i}": 1})
+        transitions[f"release{i}"] = ({f"eat{i}": 1}, {f"think{i}": 1, f"fork{i}": 1, right: 1})
+    return createNet(marking, transitions)
+
+
+def test_canonical_form_is_the_same_for_the_whole_orbit():
+    for net in (createMutexNet(4), createRingNet(5)):
+        net_symmetry = symmetry.findNetSymmetry(net)
+        quotient = symmetry.QuotientGraph(net, net_symmetry)
+        reach_petrigraph, reach_stategraph = builders.buildReachabilityGraph(net)
+        for node in reach_petrigraph.nodes:
+            canonical, orbitSize = quotient.canonicalize(node.state)
+            images = set()
+            for g in net_symmetry.placeGenerators:
+                image = [node.state[place] for place in g]
+                assert quotient.canonicalize(image) == (canonical, orbitSize)
+                images.add(tuple(image))
+            assert reach_petrigraph.hasNodeWithState(list(canonical))
+            assert len(images) <= orbitSize
+
+
+def test_ring_uses_the_stabilizer_chain():
+    net = createRingNet(5)
+    net_symmetry = symmetry.findNetSymmetry(net)
+    assert net_symmetry.componentFamilies is None
+    assert net_symmetry.getGroupSize() == 5
+    reach_petrigraph, reach_stategraph = builders.buildReachabilityGraph(net)
+    quotient = symmetry.buildQuotientGraph(net, net_symmetry)
+    assert quotient.getFullStateCount() == reach_stategraph.getNodeCount()
+    assert sum(quotient.orbitSizes[node] for node in quotient.getDeadlockOrbits()) == len(reach_stategraph.getDeadlockNodes())
+
+
+def test_many_replicas_without_enumerating_the_group():
+    # 12! automorphisms, the quotient only has the numbers of waiting and working processes
+    net = createMutexNet(12)
+    net_symmetry = symmetry.findNetSymmetry(net)
+    assert net_symmetry.getGroupSize() == 479001600
+    quotient = symmetry.buildQuotientGraph(net, net_symmetry)
+    assert quotient.getRepresentativeCount() == 13 + 12
+    assert quotient.getFullStateCount() == 2 ** 12 + 12 * 2 ** 11
+
+
+def createChoiceNet(components):
+    # every component moves its token to one of two interchangeable places and back,
+    # the automorphisms are the wreath product of S2 and S(components)
+    marking = dict()
+    transitions = dict()
+    for i in range(components):
+        marking.update({f"home{i}": 1, f"left{i}": 0, f"right{i}": 0})
+        for side in ("left", "right"):
+            transitions[f"go{side}{i}"] = ({f"home{i}": 1}, {f"{side}{i}": 1})
+            transitions[f"back{side}{i}"] = ({f"{side}{i}": 1}, {f"home{i}": 1})
+    return createNet(marking, transitions)
+
+
+def test_wreath_product_stays_small():
+    net = createChoiceNet(7)
+    net_symmetry = symmetry.findNetSymmetry(net)
+    assert net_symmetry.componentFamilies is None
+    assert net_symmetry.getGroupSize() == 2 ** 7 * 5040
+    quotient = symmetry.buildQuotientGraph(net, net_symmetry)
+    assert quotient.getRepresentativeCount() == 8
+    assert quotient.getFullStateCount() == 3 ** 7
+
+
+def test_unbounded_net_is_detected():
+    # every producer can fill its buffer forever
+    marking = dict()
+    transitions = dict()
+    for i in range(4):
+        marking.update({f"producer{i}": 1, f"buffer{i}": 0})
+        transitions[f"produce{i}"] = ({f"producer{i}": 1}, {f"producer{i}": 1, f"buffer{i}": 1})
+    net = createNet(marking, transitions)
+    quotient = symmetry.buildQuotientGraph(net)
+    assert quotient.isInfinite
+    assert not quotient.isTruncated
+    assert not symmetry.buildQuotientGraph(createChoiceNet(3)).isInfinite
@@ -0,0 +1,70 @@
+import pytest
+
+from nethelpers import createNet, fireSequence, getRandomNets
+from petrimodules import builders
+from petrimodules import unfolding
+
+
+def test_empty_preset_transition_is_rejected():
+    net = createNet({"p0": 1, "p1": 0}, {"t0": ({"p0": 1}, {"p1": 1}), "t1": ({}, {"p0": 1})})
+    with pytest.raises(unfolding.NotSafeError):
+        unfolding.buildUnfolding(net)
+
+
+def test_queries_match_reachability_graph():
+    checked = 0
+    for net in getRandomNets(32, 400, maxTokens=1, maxWeight=1):
+        reach_petrigraph, reach_stategraph = builders.buildReachabilityGraph(net)
+        try:
+            prefix = unfolding.buildUnfolding(net)
+        except unfolding.NotSafeError:
+            # unsafe nets are rejected, every safe net must be unfolded
+            assert reach_stategraph is None or any(max(node.state) > 1 for node in reach_petrigraph.nodes)
+            continue
+        assert reach_stategraph is not None
+        checked += 1
+
+        deadlock = prefix.findDeadlock()
+        assert (deadlock is not None) == (len(reach_stategraph.getDeadlockNodes()) > 0)
+        if deadlock is not None:
+            state = fireSequence(net, deadlock)
+            assert state is not None and reach_petrigraph.getNodeWithState(state).id in reach_stategraph.getDeadlockNodes()
+
+        reachable = [node.state for node in reach_petrigraph.nodes]
+        for state in reachable:
+            assert fireSequence(net, prefix.findMarking(state)) == state
+        for bits in range(1 << len(net.getPlaces())):
+            marking = [bits >> place & 1 for place in range(len(net.getPlaces()))]
+            if marking not in reachable:
+                assert prefix.findMarking(marking) is None
+    assert checked > 100
+
+
+def test_queries_on_concurrent_cycles():
+    # the prefix has 2 events per cycle, but the interleavings of the cycles give 2^20 markings,
+    # a search over all configurations would not finish
+    marking = dict()
+    transitions = dict()
+    for i in range(20):
+        marking.update({f"a{i:02}": 1, f"b{i:02}": 0})
+        transitions[f"t{i:02}"] = ({f"a{i:02}": 1}, {f"b{i:02}": 1})
+        transitions[f"u{i:02}"] = ({f"b{i:02}": 1}, {f"a{i:02}": 1})
+    prefix = unfolding.buildUnfolding(createNet(marking, transitions))
+    assert prefix.getEventCount() == 40
+    assert prefix.findDeadlock() is None
+
+    target = [int(label[0] == "b") == i % 2 for i, label in enumerate(sorted(marking))]
+    net = createNet(marking, transitions)
+    assert fireSequence(net, prefix.findMarking(target)) == target
+    assert prefix.findMarking([1] * len(target)) is None
+
+    # every cycle but the last one can stop, once the last one can stop too the net has a deadlock
+    for i in range(19):
+        transitions[f"s{i:02}"] = ({f"b{i:02}": 1}, {})
+    prefix = unfolding.buildUnfolding(createNet(marking, transitions))
+    assert prefix.findDeadlock() is None
+    transitions["s19"] = ({"b19": 1}, {})
+    net = createNet(marking, transitions)
+    prefix = unfolding.buildUnfolding(net)
+    state = fireSequence(net, prefix.findDeadlock())
+    assert state == [0] * len(marking)